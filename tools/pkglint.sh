@@ -21,12 +21,49 @@
 #
 
 #
-# Copyright (c) 2013, 2021, Oracle and/or its affiliates.
+# Copyright (c) 2013, 2026, Oracle and/or its affiliates.
 #
 IFS=
 
 SLEEPTIME=60
 
+# With --incremental, the Userland pkglint extension only checks manifests
+# which changed since the last run (or deliver changed proto area files) and
+# replays findings of the others. This needs a pkglint cache directory (-c)
+# or PKGLINT_CACHE_DIR.
+#
+# With --shards N (or PKGLINT_SHARDS set), the manifests are linted by N
+# pkglint processes in parallel, sharing one copy of the reference paths;
+# see python/pkglint/sharded.py. Duplicate actions delivered by manifests
+# of different shards are not reported then.
+#
+# With PKGLINT_DAEMON naming a socket a pkglint daemon listens on (started
+# by "PYTHONPATH=<this directory>/python python3 -m pkglint.daemon --serve
+# <socket>"), pkglint runs in the daemon, which keeps pkg(7) modules and
+# the reference paths loaded between runs; see python/pkglint/daemon.py.
+#
+# With --verify-payload, files in the proto area are compared with the
+# payload digests recorded in published manifests being linted.
+while : ; do
+	case "$1" in
+	--incremental)
+		shift
+		export PKGLINT_INCREMENTAL=1
+		;;
+	--verify-payload)
+		shift
+		export PKGLINT_VERIFY_PAYLOAD=1
+		;;
+	--shards)
+		export PKGLINT_SHARDS="$2"
+		shift 2
+		;;
+	*)
+		break
+		;;
+	esac
+done
+
 LOCKDIR=WS_TOP_XXX/pkglint.lock
 
 # Only one mkdir can succeed, others will fail as the directory already exists.
@@ -36,7 +73,13 @@ while ! mkdir "$LOCKDIR" ; do
 	sleep $SLEEPTIME
 done
 
-/usr/bin/pkglint $*
+if [[ -S "${PKGLINT_DAEMON}" ]] ; then
+	PYTHONPATH="${0%/*}/python" /usr/bin/python3 -m pkglint.daemon $*
+elif [[ "${PKGLINT_SHARDS:-1}" -gt 1 ]] ; then
+	PYTHONPATH="${0%/*}/python" /usr/bin/python3 -m pkglint.sharded $*
+else
+	/usr/bin/pkglint $*
+fi
 
 pls=$?
 
@@ -0,0 +1,152 @@
+#
+# CDDL HEADER START
+#
+# The contents of this file are subject to the terms of the
+# Common Development and Distribution License (the "License").
+# You may not use this file except in compliance with the License.
+#
+# You can obtain a copy of the license at usr/src/OPENSOLARIS.LICENSE
+# or http://www.opensolaris.org/os/licensing.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+#
+# When distributing Covered Code, include this CDDL HEADER in each
+# file and include the License file at usr/src/OPENSOLARIS.LICENSE.
+# If applicable, add the following below this CDDL HEADER, with the
+# fields enclosed by brackets "[]" replaced with your own identifying
+# information: Portions Copyright [yyyy] [name of copyright owner]
+#
+# CDDL HEADER END
+#
+
+#
+# Copyright (c) 2026, Oracle and/or its affiliates.
+#
+
+
+# Paths delivered in conflicting ways by several packages.
+#
+# pkg(1) refuses to install packages delivering one path by actions of
+# different types, the same file (unless one of them overlays the other),
+# directories with different attributes or links with different targets.
+# find_conflicts() finds such paths among those delivered by the linted
+# packages in one pass over the merged reference paths, so that they are
+# found by pkglint rather than when installing the packages.
+
+from pkglint.pathtable import ENTRY_ATTRS
+
+# attributes of directories which have to match, see _conflicting()
+_DIR_ATTRS = ENTRY_ATTRS.index("group") + 1
+_OVERLAY = ENTRY_ATTRS.index("overlay")
+
+
+def _stem(fmri):
+    """Returns package name of given FMRI string."""
+    if fmri.startswith("pkg://"):
+        fmri = fmri[6:].partition("/")[2]
+    elif fmri.startswith("pkg:/"):
+        fmri = fmri[5:]
+    return fmri.partition("@")[0]
+
+
+def _conflicting(first, second):
+    """Returns True if actions of given PathEntry objects cannot both be
+    installed."""
+    if first.name != second.name:
+        return True
+    if first.name == "file":
+        return {first.attrs[_OVERLAY], second.attrs[_OVERLAY]} != {"allow", "true"}
+    if first.name == "dir":
+        return first.attrs[:_DIR_ATTRS] != second.attrs[:_DIR_ATTRS]
+    return first.target != second.target
+
+
+def _signature(entry):
+    """Returns what decides whether an action of given PathEntry conflicts
+    with another one, see _conflicting()."""
+    if entry.name == "file":
+        return (entry.name, entry.attrs[_OVERLAY])
+    if entry.name == "dir":
+        return (entry.name, entry.attrs[:_DIR_ATTRS])
+    return (entry.name, entry.target)
+
+
+def _describe(entry, fmri):
+    """Returns description of a PathEntry delivered by package fmri."""
+    if entry.target is not None:
+        return f"{entry.name} to {entry.target} in {fmri}"
+    attrs = " ".join(f"{name}={value}" for name, value in
+                     zip(ENTRY_ATTRS[:_DIR_ATTRS], entry.attrs) if value is not None)
+    if attrs:
+        return f"{entry.name} ({attrs}) in {fmri}"
+    return f"{entry.name} in {fmri}"
+
+
+def _involved(group, other, stems, linted):
+    """Generates indexes of entries in group which conflict with an entry
+    in other (both lists of indexes of conflicting and installable
+    entries): those with a different package name, where at least one of
+    the two packages is linted."""
+    other_stems = {stems[j] for j in other}
+    linted_stems = {stems[j] for j in other if linted[j]}
+    for i in group:
+        stem = stems[i]
+        if linted[i] and (len(other_stems) > 1 or stem not in other_stems) or \
+                len(linted_stems) > 1 or (linted_stems and stem not in linted_stems):
+            yield i
+
+
+def find_conflicts(table, lint_paths):
+    """Returns { path: description of the conflicting actions } of paths
+    delivered by packages in lint_paths (PathTable) in a way conflicting
+    with another package in table, the reference paths merged with
+    lint_paths (PathTable or MappedPathTable).
+
+    Only actions of different packages which can be installed in the same
+    variants conflict; conflicts between reference packages alone are not
+    reported.
+
+    A path may be delivered by thousands of packages (e.g. directories),
+    but mostly in a few different ways. Actions of each path are grouped
+    by their signature and variants, and only pairs of these groups are
+    compared."""
+    bits = table.variant_bits
+    conflicts = {}
+    for path, lint_entries in lint_paths.items():
+        entries = table.get(path)
+        if len(entries) < 2:
+            continue
+
+        # signature -> variants -> indexes of entries
+        buckets = {}
+        for i, entry in enumerate(entries):
+            buckets.setdefault(_signature(entry), {}).setdefault(
+                entry.variants, []).append(i)
+        samples = [entries[next(iter(groups.values()))[0]] for groups in buckets.values()]
+        pairs = [(x, y) for x in range(len(samples)) for y in range(x, len(samples))
+                 if _conflicting(samples[x], samples[y])]
+        if not pairs:
+            continue
+
+        lint_fmris = {str(lint_paths.fmris[entry.fmri]) for entry in lint_entries}
+        fmris = [str(table.fmris[entry.fmri]) for entry in entries]
+        stems = [_stem(fmri) for fmri in fmris]
+        linted = [fmri in lint_fmris for fmri in fmris]
+        groups = [list(variants.items()) for variants in buckets.values()]
+        involved = set()
+        for x, y in pairs:
+            for first_variants, first_group in groups[x]:
+                for second_variants, second_group in groups[y]:
+                    if not bits.compatible(bits.encode(first_variants),
+                                           bits.encode(second_variants)):
+                        continue
+                    involved.update(_involved(first_group, second_group, stems, linted))
+                    involved.update(_involved(second_group, first_group, stems, linted))
+
+        if involved:
+            conflicts[path] = ", ".join(
+                _describe(entries[i], fmris[i]) for i in sorted(involved))
+
+    return conflicts
+
+# vim: expandtab sw=4 ts=4
@@ -0,0 +1,244 @@
+#
+# CDDL HEADER START
+#
+# The contents of this file are subject to the terms of the
+# Common Development and Distribution License (the "License").
+# You may not use this file except in compliance with the License.
+#
+# You can obtain a copy of the license at usr/src/OPENSOLARIS.LICENSE
+# or http://www.opensolaris.org/os/licensing.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+#
+# When distributing Covered Code, include this CDDL HEADER in each
+# file and include the License file at usr/src/OPENSOLARIS.LICENSE.
+# If applicable, add the following below this CDDL HEADER, with the
+# fields enclosed by brackets "[]" replaced with your own identifying
+# information: Portions Copyright [yyyy] [name of copyright owner]
+#
+# CDDL HEADER END
+#
+
+#
+# Copyright (c) 2026, Oracle and/or its affiliates.
+#
+
+
+# pkglint daemon: runs pkglint repeatedly in one process, so that pkg(7)
+# modules and pkglint extensions are loaded only once, and the Userland
+# extension keeps reference paths it seeded in memory (see WarmPaths in
+# pathtable.py) until the reference catalog changes.
+#
+# Usage: python3 -m pkglint.daemon --serve SOCKET
+#        python3 -m pkglint.daemon --stop
+#        python3 -m pkglint.daemon <pkglint arguments>
+#
+# The daemon listens on a UNIX socket, accessible by its owner only. Each
+# request is a pkglint command line, which is run with the working
+# directory and environment of the client; requests are served one at a
+# time. Without --serve, the command line is sent to the daemon listening
+# on the socket named by PKGLINT_DAEMON and its output and exit code are
+# passed on; when there is no such daemon, pkglint is run directly.
+
+import json
+import logging
+import os
+import runpy
+import socket
+import subprocess
+import sys
+import tempfile
+import traceback
+
+from pkglint import instrument
+from pkglint.pathtable import WarmPaths
+from pkglint.protoarea import ProtoIndex
+
+PKGLINT = "/usr/bin/pkglint"
+
+
+def _logging_state():
+    loggers = [logging.getLogger()] + [
+        logger for logger in logging.Logger.manager.loggerDict.values()
+        if isinstance(logger, logging.Logger)]
+    return {logger: (list(logger.handlers), logger.level) for logger in loggers}
+
+
+def _restore_logging(state):
+    for logger in [logging.getLogger()] + [
+            logger for logger in logging.Logger.manager.loggerDict.values()
+            if isinstance(logger, logging.Logger)]:
+        handlers, level = state.get(logger, ([], logging.NOTSET))
+        for handler in logger.handlers:
+            if handler not in handlers:
+                handler.close()
+        logger.handlers = handlers
+        logger.setLevel(level)
+
+
+def run_pkglint(args, cwd, env):
+    """Runs pkglint with given arguments, working directory and environment
+    in this process; returns exit code, standard output and error output.
+
+    Everything pkglint changes globally (environment, working directory,
+    sys.argv, sys.path, logging handlers) is restored afterwards, and the
+    profile of the run is written (see instrument.py); output is captured
+    on the file descriptor level, so that handlers holding the original
+    streams are captured as well.
+    """
+    saved_environ = dict(os.environ)
+    saved_cwd = os.getcwd()
+    saved_argv = list(sys.argv)
+    saved_path = list(sys.path)
+    saved_streams = (sys.stdout, sys.stderr)
+    saved_logging = _logging_state()
+
+    # proto area files may have changed since the last run
+    ProtoIndex.reset()
+    # checks are timed in runs with PKGLINT_PROFILE set, see instrument.py
+    instrument.persistent = True
+
+    with tempfile.TemporaryFile("w+") as out, tempfile.TemporaryFile("w+") as err:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        saved_fds = (os.dup(1), os.dup(2))
+        os.dup2(out.fileno(), 1)
+        os.dup2(err.fileno(), 2)
+
+        os.environ.clear()
+        os.environ.update(env)
+        sys.argv = [PKGLINT] + args
+        instrument.start()
+        try:
+            os.chdir(cwd)
+            runpy.run_path(PKGLINT, run_name="__main__")
+            ret = 0
+        except SystemExit as exc:
+            if exc.code is None or isinstance(exc.code, int):
+                ret = exc.code or 0
+            else:
+                ret = 1
+        except Exception:
+            traceback.print_exc()
+            ret = 1
+        finally:
+            instrument.finish()
+            sys.stdout.flush()
+            sys.stderr.flush()
+            sys.stdout, sys.stderr = saved_streams
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.dup2(saved_fds[0], 1)
+            os.dup2(saved_fds[1], 2)
+            os.close(saved_fds[0])
+            os.close(saved_fds[1])
+
+            _restore_logging(saved_logging)
+            os.environ.clear()
+            os.environ.update(saved_environ)
+            os.chdir(saved_cwd)
+            sys.argv = saved_argv
+            sys.path[:] = saved_path
+
+        out.seek(0)
+        err.seek(0)
+        return ret, out.read(), err.read()
+
+
+def _send(conn, message):
+    conn.sendall(json.dumps(message).encode() + b"\n")
+
+
+def _receive(conn):
+    with conn.makefile("rb") as ifile:
+        line = ifile.readline()
+    return json.loads(line) if line else None
+
+
+def serve(path, runner=run_pkglint):
+    """Serves requests on UNIX socket at path until asked to stop; runner
+    is called with arguments, working directory and environment of each
+    request."""
+    WarmPaths.enabled = True
+    if os.path.exists(path):
+        os.unlink(path)
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    umask = os.umask(0o077)
+    try:
+        server.bind(path)
+    finally:
+        os.umask(umask)
+    server.listen()
+    try:
+        while True:
+            conn, _ = server.accept()
+            with conn:
+                try:
+                    request = _receive(conn)
+                except ValueError:
+                    continue
+                if request is None:
+                    continue
+                if request.get("stop"):
+                    _send(conn, {"status": 0, "stdout": "", "stderr": ""})
+                    break
+                status, stdout, stderr = runner(
+                    request["args"], request["cwd"], request["env"])
+                try:
+                    _send(conn, {"status": status, "stdout": stdout, "stderr": stderr})
+                except OSError:
+                    # the client is gone
+                    pass
+    finally:
+        server.close()
+        os.unlink(path)
+        WarmPaths.enabled = False
+        WarmPaths.reset()
+
+
+def request(path, message):
+    """Sends message to the daemon listening at path; returns its reply.
+    OSError is raised when there is no daemon."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.connect(path)
+        _send(conn, message)
+        conn.shutdown(socket.SHUT_WR)
+        reply = _receive(conn)
+    if reply is None:
+        raise ConnectionError(f"{path}: no reply from pkglint daemon")
+    return reply
+
+
+def main(args):
+    if args[:1] == ["--serve"] and len(args) == 2:
+        serve(args[1])
+        return 0
+
+    path = os.getenv("PKGLINT_DAEMON")
+    if args == ["--stop"]:
+        message = {"stop": True}
+    else:
+        message = {"args": args, "cwd": os.getcwd(), "env": dict(os.environ)}
+
+    try:
+        if not path:
+            raise FileNotFoundError("PKGLINT_DAEMON is not set")
+        reply = request(path, message)
+    except OSError as err:
+        if message.get("stop"):
+            sys.stderr.write(f"pkglint: no daemon to stop: {err}\n")
+            return 1
+        return subprocess.call([PKGLINT] + args)
+
+    sys.stdout.write(reply["stdout"])
+    sys.stdout.flush()
+    sys.stderr.write(reply["stderr"])
+    sys.stderr.flush()
+    return reply["status"]
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
+
+# vim: expandtab sw=4 ts=4
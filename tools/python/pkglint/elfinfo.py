@@ -0,0 +1,276 @@
+#
+# CDDL HEADER START
+#
+# The contents of this file are subject to the terms of the
+# Common Development and Distribution License (the "License").
+# You may not use this file except in compliance with the License.
+#
+# You can obtain a copy of the license at usr/src/OPENSOLARIS.LICENSE
+# or http://www.opensolaris.org/os/licensing.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+#
+# When distributing Covered Code, include this CDDL HEADER in each
+# file and include the License file at usr/src/OPENSOLARIS.LICENSE.
+# If applicable, add the following below this CDDL HEADER, with the
+# fields enclosed by brackets "[]" replaced with your own identifying
+# information: Portions Copyright [yyyy] [name of copyright owner]
+#
+# CDDL HEADER END
+#
+
+#
+# Copyright (c) 2026, Oracle and/or its affiliates.
+#
+
+# ELF metadata of proto area files used by the Userland pkglint extension.
+
+import collections
+import concurrent.futures
+import mmap
+import os
+import struct
+
+from pkglint.persist import StatCache
+
+# Everything the ELF checks need to know about a single ELF object:
+#   bits     32 or 64
+#   type     "exe", "pie", "so", "rel" or "core"
+#   runpath  RUNPATH (or RPATH) string, empty if there is none
+#   aslr     True/False if tagged with ASLR enabled/disabled, None if
+#            not tagged at all (only checked for executables)
+#   pie      True for position independent executables
+#   needed   tuple of libraries it depends on (DT_NEEDED entries)
+ElfRecord = collections.namedtuple(
+    "ElfRecord", ["bits", "type", "runpath", "aslr", "pie", "needed"],
+    defaults=[()])
+
+
+class ElfError(Exception):
+    """Raised by read_elf() when a file cannot be parsed."""
+
+
+# ELF constants (see <sys/elf.h> and <sys/link.h>)
+_ELFMAG = b"\x7fELF"
+_ELFCLASS32 = 1
+_ELFCLASS64 = 2
+_ELFDATA2LSB = 1
+_ELFDATA2MSB = 2
+
+_ELF_TYPES = {1: "rel", 2: "exe", 3: "so", 4: "core"}
+
+_PT_LOAD = 1
+_PT_DYNAMIC = 2
+_SHT_DYNAMIC = 6
+
+_DT_NULL = 0
+_DT_NEEDED = 1
+_DT_STRTAB = 5
+_DT_RPATH = 15
+_DT_RUNPATH = 29
+_DT_SUNW_ASLR = 0x60000023
+_DT_FLAGS_1 = 0x6ffffffb
+_DF_1_PIE = 0x08000000
+
+# struct formats of ELF header fields following e_ident (e_type .. e_shstrndx),
+# program header, section header and dynamic entry for each class
+_LAYOUT = {
+    _ELFCLASS32: {
+        "ehdr": "HHIIIIIHHHHHH",
+        "phdr": "IIIIIIII",     # type offset vaddr paddr filesz memsz flags align
+        "shdr": "IIIIIIIIII",   # name type flags addr offset size link ...
+        "dyn": "iI",
+    },
+    _ELFCLASS64: {
+        "ehdr": "HHIQQQIHHHHHH",
+        "phdr": "IIQQQQQQ",     # type flags offset vaddr paddr filesz ...
+        "shdr": "IIQQQQIIQQ",   # name type flags addr offset size link ...
+        "dyn": "qQ",
+    },
+}
+
+
+def read_elf(path):
+    """Returns ElfRecord of given file by reading its headers and dynamic
+    section directly, or None if it is not an ELF object.
+
+    ElfError is raised for ELF objects which cannot be parsed.
+    """
+    with open(path, "rb") as ifile:
+        if ifile.read(4) != _ELFMAG:
+            return None
+        try:
+            data = mmap.mmap(ifile.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as err:
+            raise ElfError(f"{path}: {err}") from None
+
+    with data:
+        try:
+            return _parse_elf(data)
+        except struct.error as err:
+            raise ElfError(f"{path}: truncated ELF object ({err})") from None
+
+
+def _parse_elf(data):
+    """Parses ELF object in given buffer into an ElfRecord."""
+    elfclass, encoding = data[4], data[5]
+    if elfclass not in _LAYOUT:
+        raise ElfError(f"unknown ELF class {elfclass}")
+    if encoding == _ELFDATA2LSB:
+        order = "<"
+    elif encoding == _ELFDATA2MSB:
+        order = ">"
+    else:
+        raise ElfError(f"unknown ELF data encoding {encoding}")
+
+    layout = _LAYOUT[elfclass]
+    (e_type, _, _, _, e_phoff, e_shoff, _, _, e_phentsize, e_phnum,
+     e_shentsize, e_shnum, _) = struct.unpack_from(order + layout["ehdr"], data, 16)
+
+    def unpack_table(fmt, offset, entsize, count):
+        for i in range(count):
+            yield struct.unpack_from(order + fmt, data, offset + i * entsize)
+
+    # Locate the dynamic section and its string table. Section headers
+    # give file offsets of both directly; without them, the string table
+    # address has to be translated through the loadable segments.
+    dynamic = None
+    strtab = None
+    sections = list(unpack_table(layout["shdr"], e_shoff, e_shentsize, e_shnum)) \
+        if e_shoff else []
+    for shdr in sections:
+        if shdr[1] == _SHT_DYNAMIC:
+            dynamic = (shdr[4], shdr[5])
+            if shdr[6] < len(sections):
+                strtab = sections[shdr[6]][4]
+            break
+
+    segments = []
+    if e_phoff:
+        for phdr in unpack_table(layout["phdr"], e_phoff, e_phentsize, e_phnum):
+            if elfclass == _ELFCLASS32:
+                p_type, p_offset, p_vaddr, _, p_filesz = phdr[:5]
+            else:
+                p_type, _, p_offset, p_vaddr, _, p_filesz = phdr[:6]
+            if p_type == _PT_LOAD:
+                segments.append((p_vaddr, p_offset, p_filesz))
+            elif p_type == _PT_DYNAMIC and dynamic is None:
+                dynamic = (p_offset, p_filesz)
+
+    tags = {}
+    needed = []
+    if dynamic is not None:
+        offset, size = dynamic
+        entsize = struct.calcsize(order + layout["dyn"])
+        for d_tag, d_val in unpack_table(layout["dyn"], offset, entsize, size // entsize):
+            if d_tag == _DT_NULL:
+                break
+            if d_tag == _DT_NEEDED:
+                needed.append(d_val)
+            # only the first occurrence of each tag we care about matters
+            tags.setdefault(d_tag, d_val)
+
+    if strtab is None and _DT_STRTAB in tags:
+        for vaddr, offset, filesz in segments:
+            if vaddr <= tags[_DT_STRTAB] < vaddr + filesz:
+                strtab = tags[_DT_STRTAB] - vaddr + offset
+                break
+
+    def string(offset):
+        if strtab is None:
+            raise ElfError("dynamic string table not found")
+        start = strtab + offset
+        end = data.find(b"\0", start)
+        if end < 0:
+            raise ElfError("unterminated dynamic string")
+        return data[start:end].decode("utf-8", errors="replace")
+
+    runpath = ""
+    if _DT_RUNPATH in tags:
+        runpath = string(tags[_DT_RUNPATH])
+    elif _DT_RPATH in tags:
+        runpath = string(tags[_DT_RPATH])
+
+    # position independent executables are shared objects with a flag
+    elftype = _ELF_TYPES.get(e_type, "unknown")
+    if elftype == "so" and tags.get(_DT_FLAGS_1, 0) & _DF_1_PIE:
+        elftype = "pie"
+
+    aslr = None
+    if _DT_SUNW_ASLR in tags:
+        aslr = tags[_DT_SUNW_ASLR] != 0
+
+    return ElfRecord(bits=32 if elfclass == _ELFCLASS32 else 64, type=elftype,
+                     runpath=runpath, aslr=aslr, pie=elftype == "pie",
+                     needed=tuple(string(offset) for offset in needed))
+
+
+def _read_elf_or_error(path):
+    """Wrapper of read_elf() for worker processes, returning either
+    (True, record) or (False, None) when the file cannot be parsed."""
+    try:
+        return True, read_elf(path)
+    except (ElfError, OSError):
+        return False, None
+
+
+class ElfCache(StatCache):
+    """Persistent cache of ElfRecords of proto area files, so that objects
+    which were not rebuilt since the last pkglint run are not inspected
+    again."""
+
+    VERSION = 2
+
+    # marks files not inspected yet, None means "not an ELF object"
+    _missing = object()
+
+    def __init__(self, path, inspect):
+        """Create cache stored in path (or not stored at all if path is
+        None). The inspect function is called with a file path to get
+        its ElfRecord, or None if it is not an ELF object."""
+        super().__init__(path, self.VERSION)
+        self.inspect = inspect
+
+    def get(self, path, st=None):
+        """Returns ElfRecord of given file, or None if it is not an ELF
+        object."""
+        if st is None:
+            st = os.stat(path)
+
+        record = self.lookup(st, self._missing)
+        if record is self._missing:
+            record = self.inspect(path)
+            self.store(st, record)
+        return record
+
+    # below this number of files, worker processes are not worth it
+    prefetch_min = 32
+
+    def prefetch(self, files, jobs=1):
+        """Inspects all given files not in the cache yet, in a pool of
+        jobs worker processes, so that get() doesn't have to.
+
+        Files are given as (path, stat) tuples. Workers use read_elf(),
+        files it cannot parse are left to the inspect function.
+        """
+        pending = {}
+        for path, st in files:
+            if st not in self:
+                pending.setdefault(self.signature(st), (path, st))
+        if not pending:
+            return
+
+        paths = [path for path, _ in pending.values()]
+        if jobs > 1 and len(paths) >= self.prefetch_min:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+                results = list(pool.map(_read_elf_or_error, paths,
+                                        chunksize=max(1, len(paths) // (jobs * 4))))
+        else:
+            results = [_read_elf_or_error(path) for path in paths]
+
+        for (path, st), (ok, record) in zip(pending.values(), results):
+            if not ok:
+                record = self.inspect(path)
+            self.store(st, record)
+
+# vim: expandtab sw=4 ts=4
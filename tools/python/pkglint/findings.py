@@ -0,0 +1,171 @@
+#
+# CDDL HEADER START
+#
+# The contents of this file are subject to the terms of the
+# Common Development and Distribution License (the "License").
+# You may not use this file except in compliance with the License.
+#
+# You can obtain a copy of the license at usr/src/OPENSOLARIS.LICENSE
+# or http://www.opensolaris.org/os/licensing.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+#
+# When distributing Covered Code, include this CDDL HEADER in each
+# file and include the License file at usr/src/OPENSOLARIS.LICENSE.
+# If applicable, add the following below this CDDL HEADER, with the
+# fields enclosed by brackets "[]" replaced with your own identifying
+# information: Portions Copyright [yyyy] [name of copyright owner]
+#
+# CDDL HEADER END
+#
+
+#
+# Copyright (c) 2026, Oracle and/or its affiliates.
+#
+
+# Findings of the Userland pkglint checks kept between pkglint runs, for
+# the incremental mode (PKGLINT_INCREMENTAL).
+#
+# Every linted manifest gets a key, which is a digest of everything its
+# findings depend on: manifest content, proto area files it delivers and
+# the state of the whole run (see UserlandActionChecker.startup()). When
+# findings of a manifest with the same key are stored, checks are not run
+# again and the findings are replayed instead.
+
+from pkglint import persist
+
+
+class FindingStore(persist.Cache):
+    """Findings of Userland checkers, for each manifest key a dictionary of
+    { checker name: { slot: [(level, message, msgid, kwargs), ..] } }."""
+
+    VERSION = 1
+    limit = 20000
+
+    # store shared by all checkers, see shared()
+    _shared = None
+
+    def __init__(self, path):
+        super().__init__(path, self.VERSION)
+        # fmri -> key of manifests linted in this run
+        self.keys = {}
+
+    @classmethod
+    def shared(cls, path=None):
+        """Returns store shared by all checkers, which is created when
+        path is given, or None when the incremental mode is off."""
+        if path is not None and (cls._shared is None or cls._shared.path != path):
+            cls._shared = cls(path)
+        return cls._shared
+
+    @classmethod
+    def reset(cls):
+        """Drops the shared store, turning the incremental mode off."""
+        cls._shared = None
+
+    def key(self, manifest):
+        """Returns key of given manifest, or None when it is not known."""
+        return self.keys.get(str(manifest.fmri))
+
+    def findings(self, manifest, checker):
+        """Returns findings of given checker stored for given manifest, or
+        None if there are none."""
+        key = self.key(manifest)
+        if key is None:
+            return None
+        return self.lookup(key, {}).get(checker)
+
+    def record(self, manifest, checker, findings):
+        """Stores findings of given checker for given manifest."""
+        key = self.key(manifest)
+        entry = dict(self.lookup(key, {}))
+        entry[checker] = findings
+        self.store(key, entry)
+
+
+class Recorder:
+    """Engine proxy recording all findings reported through it."""
+
+    levels = ("critical", "error", "warning", "info")
+
+    def __init__(self, engine):
+        self._engine = engine
+        self.findings = []
+
+    def __getattr__(self, name):
+        method = getattr(self._engine, name)
+        if name not in self.levels:
+            return method
+
+        def report(message, msgid=None, **kwargs):
+            self.findings.append((name, message, msgid, kwargs))
+            return method(message, msgid=msgid, **kwargs)
+        return report
+
+
+def replay(engine, findings):
+    """Reports findings recorded by Recorder again."""
+    for level, message, msgid, kwargs in findings:
+        getattr(engine, level)(message, msgid=msgid, **kwargs)
+
+
+class Session:
+    """Runs checks of one checker, manifest by manifest, replaying stored
+    findings of manifests whose key didn't change and recording findings
+    of the others.
+
+    Checks of one manifest are numbered in the order they are run (the
+    engine checks actions in manifest order), and findings are replayed
+    at the same point where they were reported originally.
+    """
+
+    def __init__(self, store, checker):
+        self.store = store
+        self.checker = checker
+        self.manifest = None
+        self.slot = 0
+        self.cached = None
+        self.recorded = None
+
+    def __start(self, manifest):
+        self.manifest = manifest
+        self.slot = 0
+        self.cached = self.store.findings(manifest, self.checker)
+        if self.cached is None and self.store.key(manifest) is not None:
+            self.recorded = {}
+
+    def run(self, manifest, engine, check):
+        """Runs check (a function taking the engine) on given manifest."""
+        if manifest is not self.manifest:
+            self.finish()
+            self.__start(manifest)
+
+        slot = self.slot
+        self.slot += 1
+
+        if self.cached is not None:
+            replay(engine, self.cached.get(slot, ()))
+            return
+        if self.recorded is None:
+            check(engine)
+            return
+
+        recorder = Recorder(engine)
+        try:
+            check(recorder)
+        except BaseException:
+            # findings are incomplete, don't store them
+            self.recorded = None
+            raise
+        if recorder.findings:
+            self.recorded[slot] = recorder.findings
+
+    def finish(self):
+        """Stores findings recorded for the current manifest."""
+        if self.recorded is not None:
+            self.store.record(self.manifest, self.checker, self.recorded)
+        self.manifest = None
+        self.cached = None
+        self.recorded = None
+
+# vim: expandtab sw=4 ts=4
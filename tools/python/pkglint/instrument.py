@@ -0,0 +1,213 @@
+#
+# CDDL HEADER START
+#
+# The contents of this file are subject to the terms of the
+# Common Development and Distribution License (the "License").
+# You may not use this file except in compliance with the License.
+#
+# You can obtain a copy of the license at usr/src/OPENSOLARIS.LICENSE
+# or http://www.opensolaris.org/os/licensing.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+#
+# When distributing Covered Code, include this CDDL HEADER in each
+# file and include the License file at usr/src/OPENSOLARIS.LICENSE.
+# If applicable, add the following below this CDDL HEADER, with the
+# fields enclosed by brackets "[]" replaced with your own identifying
+# information: Portions Copyright [yyyy] [name of copyright owner]
+#
+# CDDL HEADER END
+#
+
+#
+# Copyright (c) 2026, Oracle and/or its affiliates.
+#
+
+# Opt-in timing of pkglint checks done by the Userland pkglint extensions.
+#
+# When PKGLINT_PROFILE is set, every check method (any method with the
+# pkglint_id argument) and the startup() and shutdown() methods of the
+# instrumented checker classes are timed, as well as phases marked with
+# phase(). At exit, a JSON summary is written to the file named by
+# PKGLINT_PROFILE ("-" is standard error); when it names a directory, a new
+# file is created there for every pkglint run.
+#
+# Processes running pkglint repeatedly (see daemon.py) set persistent, and
+# call start() and finish() around every run instead, so that each run is
+# profiled according to its own PKGLINT_PROFILE.
+#
+# For each check and phase, the summary contains number of calls, their
+# cumulative and maximum wall time and the CPU time of subprocesses which
+# finished in the meantime (all times in seconds).
+
+import atexit
+import contextlib
+import functools
+import inspect
+import json
+import os
+import sys
+import time
+
+# where the profile of the current pkglint run goes, see start()
+_output = None
+# whether check methods are timed even if the current run is not profiled,
+# as later runs in this process may be
+persistent = False
+# timed check name -> its pkglint_id
+_ids = {}
+
+
+class Stats:
+    """Cumulative statistics of one timed check or phase."""
+
+    __slots__ = ("calls", "total", "max", "subprocess")
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.subprocess = 0.0
+
+    def add(self, elapsed, subprocess):
+        self.calls += 1
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+        self.subprocess += subprocess
+
+    def summary(self):
+        return {"calls": self.calls, "total": round(self.total, 6),
+                "max": round(self.max, 6), "subprocess": round(self.subprocess, 6)}
+
+
+class Profile:
+    """Statistics of all checks and phases of this pkglint run."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.checks = {}
+        self.phases = {}
+
+    @staticmethod
+    def _children():
+        times = os.times()
+        return times.children_user + times.children_system
+
+    @contextlib.contextmanager
+    def timed(self, table, name):
+        start = time.monotonic()
+        children = self._children()
+        try:
+            yield
+        finally:
+            stats = table.get(name)
+            if stats is None:
+                stats = table[name] = Stats()
+            stats.add(time.monotonic() - start, self._children() - children)
+
+    def summary(self):
+        return {
+            "component": os.getcwd(),
+            "argv": sys.argv,
+            "pid": os.getpid(),
+            "wall": round(time.monotonic() - self.started, 6),
+            "checks": {name: dict(stats.summary(), pkglint_id=_ids.get(name))
+                       for name, stats in sorted(self.checks.items())},
+            "phases": {name: stats.summary()
+                       for name, stats in sorted(self.phases.items())},
+        }
+
+    def write(self, output):
+        text = json.dumps(self.summary(), indent=2) + "\n"
+        if output == "-":
+            sys.stderr.write(text)
+            return
+        if os.path.isdir(output):
+            output = os.path.join(
+                output, f"pkglint-{time.strftime('%Y%m%d%H%M%S')}-{os.getpid()}.json")
+        with open(output, "w") as ofile:
+            ofile.write(text)
+
+
+_profile = None
+
+
+def _get_profile():
+    global _profile
+    if _profile is None:
+        _profile = Profile()
+    return _profile
+
+
+def _report():
+    if _output is None or _profile is None:
+        return
+    try:
+        _profile.write(_output)
+    except OSError as err:
+        sys.stderr.write(f"pkglint: cannot write profile {_output}: {err}\n")
+
+
+def start():
+    """Starts a pkglint run, which is profiled if PKGLINT_PROFILE is set."""
+    global _output, _profile
+    _output = os.getenv("PKGLINT_PROFILE") or None
+    _profile = None
+
+
+def finish():
+    """Writes the profile of the pkglint run started by start()."""
+    global _output, _profile
+    _report()
+    _output = _profile = None
+
+
+def phase(name):
+    """Returns context manager timing the enclosed block as the given phase,
+    or one doing nothing when profiling is disabled."""
+    if _output is None:
+        return contextlib.nullcontext()
+    profile = _get_profile()
+    return profile.timed(profile.phases, name)
+
+
+def _timed_method(cls, func):
+    name = f"{cls.name}.{func.__name__}"
+    signature = inspect.signature(func)
+    default = signature.parameters.get("pkglint_id")
+    if default is not None:
+        _ids[name] = f"{cls.name}{default.default}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _output is None:
+            return func(*args, **kwargs)
+        profile = _get_profile()
+        with profile.timed(profile.checks, name):
+            return func(*args, **kwargs)
+
+    # pkglint finds check methods and their pkglint_id by introspection
+    wrapper.__signature__ = signature
+    return wrapper
+
+
+def instrument(*classes):
+    """Times all check methods of given checker classes, when profiling
+    is enabled (or the process is persistent)."""
+    if _output is None and not persistent:
+        return
+
+    for cls in classes:
+        for attr, func in list(vars(cls).items()):
+            if not inspect.isfunction(func):
+                continue
+            if attr in ("startup", "shutdown") or \
+                    "pkglint_id" in inspect.signature(func).parameters:
+                setattr(cls, attr, _timed_method(cls, func))
+
+
+# a single pkglint run, unless this is a persistent process
+start()
+atexit.register(_report)
+
+# vim: expandtab sw=4 ts=4
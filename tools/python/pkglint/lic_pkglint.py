@@ -1,7 +1,7 @@
 #!/usr/bin/python3.9
 
 #
-# Copyright (c) 2012, 2022, Oracle and/or its affiliates.
+# Copyright (c) 2012, 2026, Oracle and/or its affiliates.
 #
 
 # OSNet-specific pkglint(1) checks, called as part of pkglint commands in
@@ -11,8 +11,11 @@
 import os
 import pkg.lint.base as base
 
+from pkglint import instrument
+from pkglint.router import RoutedActionChecker, handles
 
-class OSNetActionChecker(base.ActionChecker):
+
+class OSNetActionChecker(RoutedActionChecker, base.ActionChecker):
     """An osnet-specific class to check actions."""
 
     name = "osnet.action"
@@ -22,6 +25,7 @@ class OSNetActionChecker(base.ActionChecker):
             "checks OS Net packages for common action errors")
         super(OSNetActionChecker, self).__init__(config)
 
+    @handles(prefixes=["var/.migrate"])
     def varmigrate(self, action, manifest, engine, pkglint_id="001"):
         """Check that we only deliver directories to /var/.migrate.
 
@@ -39,13 +43,8 @@ class OSNetActionChecker(base.ActionChecker):
         in particular)
         """
 
-        if "path" not in action.attrs:
-            return
         path = action.attrs["path"]
 
-        if not path.startswith("var/.migrate"):
-            return
-
         seen_preserve = action.attrs.get("preserve")
 
         if action.name != "dir" and (action.name != "file" or
@@ -72,6 +71,7 @@ class OSNetActionChecker(base.ActionChecker):
     varmigrate.pkglint_desc = _(
         "Only directories should be delivered to /var/.migrate")
 
+    @handles(prefixes=["var/share/"])
     def varshare(self, action, manifest, engine, pkglint_id="002"):
         """Ensure that we deliver nothing underneath /var/share.
 
@@ -85,8 +85,6 @@ class OSNetActionChecker(base.ActionChecker):
         /var/share.
         """
 
-        if "path" not in action.attrs:
-            return
         path = action.attrs["path"]
 
         if path.rstrip("/").startswith("var/share/"):
@@ -324,3 +322,6 @@ class ExtractLicense(base.ManifestChecker):
                                 msgid=lint_id)
 
     licensing.pkglint_desc = _("A series of license checks for Solaris RE")
+
+
+instrument.instrument(OSNetActionChecker, OSNetManifestChecker, ExtractLicense)
@@ -0,0 +1,99 @@
+#
+# CDDL HEADER START
+#
+# The contents of this file are subject to the terms of the
+# Common Development and Distribution License (the "License").
+# You may not use this file except in compliance with the License.
+#
+# You can obtain a copy of the license at usr/src/OPENSOLARIS.LICENSE
+# or http://www.opensolaris.org/os/licensing.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+#
+# When distributing Covered Code, include this CDDL HEADER in each
+# file and include the License file at usr/src/OPENSOLARIS.LICENSE.
+# If applicable, add the following below this CDDL HEADER, with the
+# fields enclosed by brackets "[]" replaced with your own identifying
+# information: Portions Copyright [yyyy] [name of copyright owner]
+#
+# CDDL HEADER END
+#
+
+#
+# Copyright (c) 2026, Oracle and/or its affiliates.
+#
+
+
+# Pipelined loading of manifests by the Userland pkglint extension.
+#
+# Retrieving manifests from a repository (engine.gen_manifests()) is mostly
+# waiting for I/O, while turning them into path fragments is not. Instead
+# of doing one after another for each manifest, manifests are retrieved by
+# a separate thread ahead of the caller, which processes them meanwhile.
+#
+# Processing manifests is pure Python holding the GIL, so it is not spread
+# over a pool of threads: on the startup benchmark (benchmark.py startup
+# --packages 4000), a pool of 4 threads took 19.2s against 18.2s with
+# PKGLINT_JOBS=1. A pool of processes would have to pickle every manifest
+# and fragment, which costs about as much as extracting the fragments.
+
+import queue
+import threading
+
+# how many manifests can be retrieved ahead of the caller
+DEPTH = 64
+
+_DONE = object()
+_ERROR = object()
+
+
+def pipelined(items, func, jobs):
+    """Yields (item, func(item)) for each item of iterable items, in the
+    order of items.
+
+    Items are taken from items by a separate thread (which is the only one
+    using the iterable), while func is called in the calling thread. When
+    jobs is 1, items are taken in the calling thread too.
+    """
+    if jobs <= 1:
+        for item in items:
+            yield item, func(item)
+        return
+
+    retrieved = queue.Queue(maxsize=DEPTH)
+    stop = threading.Event()
+
+    def put(entry):
+        while not stop.is_set():
+            try:
+                retrieved.put(entry, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def produce():
+        try:
+            for item in items:
+                if stop.is_set():
+                    return
+                put((item, None))
+        except BaseException as err:
+            put((_ERROR, err))
+        finally:
+            put((_DONE, None))
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    try:
+        while True:
+            item, err = retrieved.get()
+            if item is _DONE:
+                break
+            if item is _ERROR:
+                raise err
+            yield item, func(item)
+    finally:
+        stop.set()
+        producer.join()
+
+# vim: expandtab sw=4 ts=4
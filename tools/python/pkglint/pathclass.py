@@ -0,0 +1,111 @@
+#
+# CDDL HEADER START
+#
+# The contents of this file are subject to the terms of the
+# Common Development and Distribution License (the "License").
+# You may not use this file except in compliance with the License.
+#
+# You can obtain a copy of the license at usr/src/OPENSOLARIS.LICENSE
+# or http://www.opensolaris.org/os/licensing.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+#
+# When distributing Covered Code, include this CDDL HEADER in each
+# file and include the License file at usr/src/OPENSOLARIS.LICENSE.
+# If applicable, add the following below this CDDL HEADER, with the
+# fields enclosed by brackets "[]" replaced with your own identifying
+# information: Portions Copyright [yyyy] [name of copyright owner]
+#
+# CDDL HEADER END
+#
+
+#
+# Copyright (c) 2026, Oracle and/or its affiliates.
+#
+
+# Classification of delivered paths for the Userland pkglint extension.
+
+import collections
+import os
+import re
+
+# Result of PathClassifier.classify():
+#   allowed       path is in one of the known delivery locations
+#   init_script   path is a SVR4 startup script (or its directory)
+#   smf_manifest  path is a SMF manifest
+#   path32        closest 32/64-bit specific directory is a 32-bit one
+#   path64        closest 32/64-bit specific directory is a 64-bit one
+#   dirparts      list of directory path elements
+PathClass = collections.namedtuple(
+    "PathClass",
+    ["allowed", "init_script", "smf_manifest", "path32", "path64", "dirparts"])
+
+
+class PathClassifier:
+    """Classifies delivered paths according to all path based rules at once.
+
+    All regular expressions are combined into a single one, which is matched
+    once per path. Directory based properties are computed once for each
+    directory and shared by all paths within it.
+    """
+
+    def __init__(self, allowed_paths, initscript_re, smf_manifest_re,
+                 pathlist32, pathlist64):
+        # Each rule is an optional lookahead with a named group, so that a
+        # single match finds out which of the rules matched.
+        rules = [("init_script", initscript_re), ("smf_manifest", smf_manifest_re)]
+        rules += [(f"allowed{i}", expr) for i, expr in enumerate(allowed_paths)]
+        self._matcher = re.compile("".join(
+            f"(?:(?=(?P<{name}>{expr.pattern})))?" for name, expr in rules))
+        self._allowed = [name for name, _ in rules if name.startswith("allowed")]
+
+        self.pathlist32 = set(pathlist32)
+        self.pathlist64 = set(pathlist64)
+
+        self._dirs = {}
+        self._paths = {}
+
+    def __classify_dir(self, dirname):
+        parts = dirname.split("/")
+
+        path32 = False
+        path64 = False
+
+        # Walk through the path elements backward and at the first
+        # 32/64 bit specific element, flag it and break.
+        for part in reversed(parts):
+            if part in self.pathlist32:
+                path32 = True
+                break
+            if part in self.pathlist64:
+                path64 = True
+                break
+
+        # The Xorg module directory is a hybrid case - everything
+        # but the dri subdirectory is 64-bit
+        if dirname.startswith("usr/lib/xorg/modules") and \
+                dirname != "usr/lib/xorg/modules/dri":
+            path64 = True
+
+        return path32, path64, parts
+
+    def classify(self, path):
+        """Returns PathClass of given delivered path."""
+        result = self._paths.get(path)
+        if result is not None:
+            return result
+
+        dirname = os.path.dirname(path)
+        dirclass = self._dirs.get(dirname)
+        if dirclass is None:
+            dirclass = self._dirs[dirname] = self.__classify_dir(dirname)
+
+        match = self._matcher.match(path)
+        result = self._paths[path] = PathClass(
+            allowed=any(match.group(name) is not None for name in self._allowed),
+            init_script=match.group("init_script") is not None,
+            smf_manifest=match.group("smf_manifest") is not None,
+            path32=dirclass[0], path64=dirclass[1], dirparts=dirclass[2])
+        return result
+
+# vim: expandtab sw=4 ts=4
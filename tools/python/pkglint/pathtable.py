@@ -0,0 +1,362 @@
+#
+# CDDL HEADER START
+#
+# The contents of this file are subject to the terms of the
+# Common Development and Distribution License (the "License").
+# You may not use this file except in compliance with the License.
+#
+# You can obtain a copy of the license at usr/src/OPENSOLARIS.LICENSE
+# or http://www.opensolaris.org/os/licensing.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+#
+# When distributing Covered Code, include this CDDL HEADER in each
+# file and include the License file at usr/src/OPENSOLARIS.LICENSE.
+# If applicable, add the following below this CDDL HEADER, with the
+# fields enclosed by brackets "[]" replaced with your own identifying
+# information: Portions Copyright [yyyy] [name of copyright owner]
+#
+# CDDL HEADER END
+#
+
+#
+# Copyright (c) 2026, Oracle and/or its affiliates.
+#
+
+# Compact storage of the action path dictionaries (lint_paths, ref_paths)
+# of the Userland pkglint extension.
+#
+# A full reference repository delivers millions of paths; instead of keeping
+# (fmri, action) tuples with complete action objects for each of them, only
+# the few attributes the checks need are kept in small records, and package
+# FMRIs are stored once and referred to by their index.
+#
+# Paths may be delivered by different actions in different variants (e.g.
+# for each variant.arch); select() returns only actions which can be
+# installed in a given variant combination, which is decided on bitsets
+# encoding the combinations (see VariantBits).
+
+# attributes of actions kept in PathEntry.attrs, as the conflicting
+# deliveries of a path are decided on them (see conflicts.py)
+ENTRY_ATTRS = ("mode", "owner", "group", "overlay")
+_NO_ATTRS = (None,) * len(ENTRY_ATTRS)
+
+
+def variant_key(attrs):
+    """Returns variants in given action attributes as a sorted tuple of
+    (name, value) pairs, with multiple values being a sorted tuple."""
+    return tuple(sorted(
+        (k, tuple(sorted(v)) if isinstance(v, (list, set)) else v)
+        for k, v in attrs.items() if k.startswith("variant.")))
+
+
+class VariantBits:
+    """Encodes variant combinations (see variant_key()) as a pair of
+    bitsets: one with a bit for every variant the combination restricts
+    and one with a bit for every variant value it allows. Variants which
+    are not restricted allow any value."""
+
+    def __init__(self):
+        # variant name -> its bit
+        self._names = {}
+        # variant name bit -> bits of all its values
+        self._masks = {}
+        # (variant name, value) -> its bit
+        self._values = {}
+        self._encoded = {}
+
+    def __name(self, name):
+        bit = self._names.get(name)
+        if bit is None:
+            bit = self._names[name] = 1 << len(self._names)
+            self._masks[bit] = 0
+        return bit
+
+    def __value(self, name_bit, name, value):
+        bit = self._values.get((name, value))
+        if bit is None:
+            bit = self._values[name, value] = 1 << len(self._values)
+            self._masks[name_bit] |= bit
+        return bit
+
+    def encode(self, variants):
+        """Returns (names, values) bitsets of given variant combination."""
+        encoded = self._encoded.get(variants)
+        if encoded is None:
+            names = values = 0
+            for name, value in variants:
+                name_bit = self.__name(name)
+                names |= name_bit
+                for item in value if isinstance(value, tuple) else (value,):
+                    values |= self.__value(name_bit, name, item)
+            encoded = self._encoded[variants] = (names, values)
+        return encoded
+
+    def compatible(self, first, second):
+        """Returns True if encoded combinations first and second have a
+        value in common for every variant restricted by both of them."""
+        names = first[0] & second[0]
+        if not names:
+            return True
+        common = first[1] & second[1]
+        for name_bit, mask in self._masks.items():
+            if names & name_bit and not common & mask:
+                return False
+        return True
+
+
+class VariantSelect:
+    """Mixin of path tables (having get() and variant_bits) selecting
+    actions by variants."""
+
+    def select(self, path, variants):
+        """Returns entries of given path which can be installed along with
+        an action with given variants (see variant_key())."""
+        entries = self.get(path)
+        if not entries or not variants:
+            return entries
+
+        bits = self.variant_bits
+        query = bits.encode(variants)
+        return tuple(
+            entry for entry in entries
+            if not entry.variants or bits.compatible(bits.encode(entry.variants), query))
+
+
+class FmriTable:
+    """Interned package FMRIs, referred to by their index."""
+
+    def __init__(self):
+        self._fmris = []
+        self._ids = {}
+
+    def copy(self):
+        """Returns a copy of the table, with the same indexes."""
+        table = FmriTable()
+        table._fmris = list(self._fmris)
+        table._ids = dict(self._ids)
+        return table
+
+    def __len__(self):
+        return len(self._fmris)
+
+    def __getitem__(self, fmri_id):
+        return self._fmris[fmri_id]
+
+    def intern(self, fmri):
+        """Returns index of given FMRI, adding it to the table if needed."""
+        fmri_id = self._ids.get(fmri)
+        if fmri_id is None:
+            fmri_id = self._ids[fmri] = len(self._fmris)
+            self._fmris.append(fmri)
+        return fmri_id
+
+
+class PathEntry:
+    """Action delivering a path: index of its package FMRI, action name,
+    link target (None for other actions), variants as a tuple of
+    (name, value) pairs and values of ENTRY_ATTRS (None where missing)."""
+
+    __slots__ = ("fmri", "name", "target", "variants", "attrs")
+
+    def __init__(self, fmri, name, target, variants, attrs=_NO_ATTRS):
+        self.fmri = fmri
+        self.name = name
+        self.target = target
+        self.variants = variants
+        self.attrs = attrs
+
+    def __repr__(self):
+        return f"<PathEntry {self.name} {self.fmri}>"
+
+
+class PathTable(VariantSelect):
+    """Dictionary of { path: (PathEntry, ..) } with FMRIs kept in a
+    FmriTable, which can be shared by several tables.
+
+    Actions added by add() and seed() to paths which already have some
+    are collected in lists, which are turned into tuples by freeze(), at
+    the latest when the table is read.
+    """
+
+    def __init__(self, fmris=None):
+        self.fmris = fmris if fmris is not None else FmriTable()
+        self._paths = {}
+        # paths with a list of entries, see freeze()
+        self._growing = set()
+        # the same variant combinations and attributes are shared by all
+        # entries
+        self._variants = {}
+        self._attrs = {}
+        self.variant_bits = VariantBits()
+
+    def __len__(self):
+        if self._growing:
+            self.freeze()
+        return len(self._paths)
+
+    def __contains__(self, path):
+        if self._growing:
+            self.freeze()
+        return path in self._paths
+
+    def __iter__(self):
+        if self._growing:
+            self.freeze()
+        return iter(self._paths)
+
+    def __getitem__(self, path):
+        if self._growing:
+            self.freeze()
+        return self._paths[path]
+
+    def __setitem__(self, path, entries):
+        if self._growing:
+            self.freeze()
+        self._paths[path] = tuple(entries)
+
+    def get(self, path, default=()):
+        if self._growing:
+            self.freeze()
+        return self._paths.get(path, default)
+
+    def items(self):
+        if self._growing:
+            self.freeze()
+        return self._paths.items()
+
+    def freeze(self):
+        """Turns lists of entries built by add() into tuples."""
+        paths = self._paths
+        for path in self._growing:
+            paths[path] = tuple(paths[path])
+        self._growing = set()
+
+    def __intern_variants(self, attrs):
+        variants = variant_key(attrs)
+        return self._variants.setdefault(variants, variants)
+
+    def __intern_attrs(self, attrs):
+        values = tuple(attrs.get(name) for name in ENTRY_ATTRS)
+        return self._attrs.setdefault(values, values)
+
+    def add(self, path, fmri, name, attrs):
+        """Adds action with given name and attributes delivered by package
+        fmri (FMRI or its index in fmris)."""
+        if not isinstance(fmri, int):
+            fmri = self.fmris.intern(fmri)
+        entry = PathEntry(fmri, name, attrs.get("target"),
+                          self.__intern_variants(attrs), self.__intern_attrs(attrs))
+        entries = self._paths.get(path)
+        if entries is None:
+            self._paths[path] = (entry,)
+        elif path in self._growing:
+            entries.append(entry)
+        else:
+            self._paths[path] = [*entries, entry]
+            self._growing.add(path)
+
+    def seed(self, fmri, fragment):
+        """Adds all actions of a RefPathCache fragment delivered by fmri."""
+        fmri_id = self.fmris.intern(fmri)
+        for path, name, attrs in fragment:
+            self.add(path, fmri_id, name, attrs)
+
+    def copy(self):
+        """Returns a copy of the table sharing entries with it; FMRIs and
+        interned variants and attributes are copied, so that they can be
+        added to either table."""
+        if self._growing:
+            self.freeze()
+        table = PathTable(self.fmris.copy())
+        table._paths = dict(self._paths)
+        table._variants = dict(self._variants)
+        table._attrs = dict(self._attrs)
+        return table
+
+    def discard(self, path, fmri):
+        """Removes actions delivered by package fmri (its index in fmris)
+        from given path."""
+        if self._growing:
+            self.freeze()
+        entries = tuple(entry for entry in self._paths.get(path, ())
+                        if entry.fmri != fmri)
+        if entries:
+            self._paths[path] = entries
+        else:
+            self._paths.pop(path, None)
+
+
+class WarmPaths:
+    """Reference paths seeded from all packages of one reference catalog
+    state, kept in memory by processes running pkglint repeatedly (see
+    daemon.py) as long as the catalog doesn't change.
+
+    Every pkglint run gets a copy of them, without packages it lints newer
+    versions of."""
+
+    # set by processes running pkglint repeatedly
+    enabled = False
+    _shared = None
+
+    def __init__(self, state, fmris, fragments):
+        """Seeds paths from RefPathCache fragments, given with FMRIs of
+        their packages as { FMRI string: fragment } and { FMRI string:
+        FMRI }. Fragments are removed from the dictionary once seeded."""
+        self.state = state
+        self.fmris = fmris
+        # FMRI string -> paths delivered by the package
+        self.paths = {}
+        self.table = PathTable()
+        for key in list(fragments):
+            fragment = fragments.pop(key)
+            self.table.seed(fmris[key], fragment)
+            self.paths[key] = tuple(path for path, _, _ in fragment)
+        self.table.freeze()
+        # indexes of the table, see index()
+        self._indexes = {}
+
+    @classmethod
+    def shared(cls, state):
+        """Returns the kept paths if they were seeded from given catalog
+        state, None otherwise."""
+        warm = cls._shared
+        if warm is not None and warm.state == state:
+            return warm
+        return None
+
+    @classmethod
+    def keep(cls, state, fmris, fragments):
+        """Replaces the kept paths with paths of given fragments (see
+        __init__, which releases them), which were seeded from given
+        catalog state."""
+        # the old paths are not needed while seeding the new ones
+        cls._shared = None
+        cls._shared = cls(state, fmris, fragments)
+        return cls._shared
+
+    @classmethod
+    def reset(cls):
+        """Drops the kept paths."""
+        cls._shared = None
+
+    def index(self, build):
+        """Returns build(table) for the kept paths, which is called only
+        once (e.g. PrefixIndex or LibraryIndex)."""
+        index = self._indexes.get(build)
+        if index is None:
+            index = self._indexes[build] = build(self.table)
+        return index
+
+    def copy(self, excluded=()):
+        """Returns PathTable with the kept paths, except those of packages
+        given by their FMRI strings. Nothing added to the copy changes the
+        kept paths."""
+        table = self.table.copy()
+        for key in excluded:
+            fmri_id = table.fmris.intern(self.fmris[key])
+            for path in self.paths[key]:
+                table.discard(path, fmri_id)
+        return table
+
+# vim: expandtab sw=4 ts=4
@@ -0,0 +1,150 @@
+#
+# CDDL HEADER START
+#
+# The contents of this file are subject to the terms of the
+# Common Development and Distribution License (the "License").
+# You may not use this file except in compliance with the License.
+#
+# You can obtain a copy of the license at usr/src/OPENSOLARIS.LICENSE
+# or http://www.opensolaris.org/os/licensing.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+#
+# When distributing Covered Code, include this CDDL HEADER in each
+# file and include the License file at usr/src/OPENSOLARIS.LICENSE.
+# If applicable, add the following below this CDDL HEADER, with the
+# fields enclosed by brackets "[]" replaced with your own identifying
+# information: Portions Copyright [yyyy] [name of copyright owner]
+#
+# CDDL HEADER END
+#
+
+#
+# Copyright (c) 2026, Oracle and/or its affiliates.
+#
+
+
+# Digests of proto area files, to be compared with the digests of the
+# payload published manifests record (see payload_check in userland.py).
+#
+# Files are mapped into memory and hashed by several threads at once
+# (hashlib releases the GIL while hashing large buffers). Digests are kept
+# in a StatCache, so that files which didn't change since the last run are
+# not read at all.
+
+import concurrent.futures
+import hashlib
+import mmap
+import re
+
+from pkglint.persist import StatCache
+
+# pkg(7) names of hash algorithms -> hashlib names of those available
+ALGORITHMS = {name: algorithm for name, algorithm in [
+    ("sha1", "sha1"), ("sha256", "sha256"), ("sha512t_256", "sha512_256")]
+    if algorithm in hashlib.algorithms_available}
+
+# hash attribute of file actions in published manifests
+_SHA1_RE = re.compile(r"^[0-9a-f]{40}$")
+
+
+def is_digest(value):
+    """Returns True if given file action hash is a SHA-1 digest of the
+    payload rather than a path within the prototype area."""
+    return bool(_SHA1_RE.match(value))
+
+
+def expected_digests(hash_value, attrs):
+    """Returns { hashlib algorithm: hex digest } of the uncompressed payload
+    recorded in a file action with given hash and attributes; empty for
+    actions of unpublished manifests."""
+    digests = {}
+    if hash_value and is_digest(hash_value) and "sha1" in ALGORITHMS:
+        digests["sha1"] = hash_value
+
+    # "<extraction method>:<algorithm>:<digest>", only the "file" method
+    # hashes the file as it is
+    content = attrs.get("pkg.content-hash", [])
+    if isinstance(content, str):
+        content = [content]
+    for value in content:
+        method, _, rest = value.partition(":")
+        algorithm, _, digest = rest.partition(":")
+        if method == "file" and algorithm in ALGORITHMS and digest:
+            digests[ALGORITHMS[algorithm]] = digest
+    return digests
+
+
+def hash_file(path, algorithms):
+    """Returns { algorithm: hex digest } of given file."""
+    hashers = [hashlib.new(algorithm) for algorithm in algorithms]
+    with open(path, "rb") as ifile:
+        try:
+            data = mmap.mmap(ifile.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files cannot be mapped
+            data = b""
+        try:
+            for hasher in hashers:
+                hasher.update(data)
+        finally:
+            if data:
+                data.close()
+    return {algorithm: hasher.hexdigest()
+            for algorithm, hasher in zip(algorithms, hashers)}
+
+
+def _hash_file_or_error(path, algorithms):
+    try:
+        return hash_file(path, algorithms)
+    except OSError:
+        return None
+
+
+class DigestCache(StatCache):
+    """Persistent cache of digests of proto area files, as dictionaries
+    of { algorithm: hex digest }."""
+
+    VERSION = 1
+
+    def __init__(self, path):
+        """Create cache stored in path (or not stored at all if path is
+        None)."""
+        super().__init__(path, self.VERSION)
+
+    def get(self, path, st, algorithms):
+        """Returns digests of given file computed by (at least) given
+        algorithms. OSError is raised if the file cannot be read."""
+        digests = self.lookup(st, {})
+        missing = [algorithm for algorithm in algorithms if algorithm not in digests]
+        if missing:
+            digests = dict(digests, **hash_file(path, missing))
+            self.store(st, digests)
+        return digests
+
+    def prefetch(self, files, jobs=1):
+        """Hashes all given files not in the cache yet in a pool of jobs
+        threads, so that get() doesn't have to.
+
+        Files are given as (path, stat, algorithms) tuples. Files which
+        cannot be read are left to get().
+        """
+        pending = {}
+        for path, st, algorithms in files:
+            digests = self.lookup(st, {})
+            missing = [algorithm for algorithm in algorithms if algorithm not in digests]
+            if missing:
+                pending.setdefault(self.signature(st), (path, st, missing))
+        if not pending:
+            return
+
+        items = list(pending.values())
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+            results = list(pool.map(
+                lambda item: _hash_file_or_error(item[0], item[2]), items))
+
+        for (path, st, _), digests in zip(items, results):
+            if digests is not None:
+                self.store(st, dict(self.lookup(st, {}), **digests))
+
+# vim: expandtab sw=4 ts=4
@@ -0,0 +1,146 @@
+#
+# CDDL HEADER START
+#
+# The contents of this file are subject to the terms of the
+# Common Development and Distribution License (the "License").
+# You may not use this file except in compliance with the License.
+#
+# You can obtain a copy of the license at usr/src/OPENSOLARIS.LICENSE
+# or http://www.opensolaris.org/os/licensing.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+#
+# When distributing Covered Code, include this CDDL HEADER in each
+# file and include the License file at usr/src/OPENSOLARIS.LICENSE.
+# If applicable, add the following below this CDDL HEADER, with the
+# fields enclosed by brackets "[]" replaced with your own identifying
+# information: Portions Copyright [yyyy] [name of copyright owner]
+#
+# CDDL HEADER END
+#
+
+#
+# Copyright (c) 2026, Oracle and/or its affiliates.
+#
+
+# Data persisted by the Userland pkglint extension between pkglint runs.
+#
+# All the data are only caches; a missing, broken or outdated cache file is
+# never an error and just means that the data have to be computed again.
+
+import os
+import pickle
+import tempfile
+
+
+def load(path, version):
+    """Returns data stored in the given file by save(), or None if there is
+    no such file, it cannot be read or has a different version."""
+    try:
+        with open(path, "rb") as ifile:
+            data = pickle.load(ifile)
+    except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+        return None
+
+    if not isinstance(data, tuple) or len(data) != 2 or data[0] != version:
+        return None
+    return data[1]
+
+
+def save(path, version, data):
+    """Atomically replaces the given file with data, tagged with version."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".pkglint")
+    try:
+        with os.fdopen(fd, "wb") as ofile:
+            pickle.dump((version, data), ofile,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+class Cache:
+    """Persistent mapping with entries least recently used dropped once
+    there are more than limit of them."""
+
+    limit = 500000
+
+    def __init__(self, path, version):
+        self.path = path
+        self.version = version
+        self.entries = (load(path, version) if path else None) or {}
+        # entries looked up and stored during this run
+        self.used = {}
+        self.added = False
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def lookup(self, key, default=None):
+        """Returns the value stored under the given key."""
+        if key not in self.entries:
+            return default
+        value = self.used[key] = self.entries[key]
+        return value
+
+    def store(self, key, value):
+        """Stores the value under the given key."""
+        self.entries[key] = self.used[key] = value
+        self.added = True
+
+    def save(self):
+        """Writes new entries back to the cache file, unless nothing was
+        added during this run.
+
+        Other processes may have updated the file meanwhile; their entries
+        are kept as well.
+        """
+        if self.path is None or not self.added:
+            return
+
+        entries = load(self.path, self.version) or {}
+        # entries used in this run go last, to be the last ones dropped
+        for key in self.used:
+            entries.pop(key, None)
+        entries.update(self.used)
+        while len(entries) > self.limit:
+            del entries[next(iter(entries))]
+
+        save(self.path, self.version, entries)
+        self.entries = entries
+        self.used = {}
+        self.added = False
+
+
+class StatCache(Cache):
+    """Persistent mapping of files to values computed from their content.
+
+    Files are identified by device, inode, modification time and size, so
+    values of files which didn't change since they were computed can be
+    reused without looking at the files again.
+    """
+
+    @staticmethod
+    def signature(st):
+        """Returns the key identifying the file with the given stat."""
+        return (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def __contains__(self, st):
+        return super().__contains__(self.signature(st))
+
+    def lookup(self, st, default=None):
+        """Returns the value stored for the file with the given stat."""
+        return super().lookup(self.signature(st), default)
+
+    def store(self, st, value):
+        """Stores the value computed for the file with the given stat."""
+        super().store(self.signature(st), value)
+
+
+# vim: expandtab sw=4 ts=4
@@ -0,0 +1,136 @@
+#
+# CDDL HEADER START
+#
+# The contents of this file are subject to the terms of the
+# Common Development and Distribution License (the "License").
+# You may not use this file except in compliance with the License.
+#
+# You can obtain a copy of the license at usr/src/OPENSOLARIS.LICENSE
+# or http://www.opensolaris.org/os/licensing.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+#
+# When distributing Covered Code, include this CDDL HEADER in each
+# file and include the License file at usr/src/OPENSOLARIS.LICENSE.
+# If applicable, add the following below this CDDL HEADER, with the
+# fields enclosed by brackets "[]" replaced with your own identifying
+# information: Portions Copyright [yyyy] [name of copyright owner]
+#
+# CDDL HEADER END
+#
+
+#
+# Copyright (c) 2026, Oracle and/or its affiliates.
+#
+
+# Lookup of packaged files in the proto areas (PROTO_PATH) for the Userland
+# pkglint extension.
+
+import os
+
+
+class ProtoIndex:
+    """Index of files in a list of proto area directories.
+
+    Proto areas are searched in the given order and the first one
+    containing a path wins, unless the last one is asked for. Each directory is listed (with scandir) at most
+    once, when a path within it is looked up for the first time, and stat
+    results are kept as well; PROTO_PATH contains whole component
+    directories, and so only the parts of them actually packaged are
+    indexed.
+    """
+
+    # indexes shared by all checkers, see shared()
+    _shared = {}
+
+    def __init__(self, proto_dirs):
+        self.proto_dirs = list(proto_dirs)
+        # directory -> { name: DirEntry }, or None if it's not a directory
+        self._listings = {}
+        # path -> (fullpath, stat) or None
+        self._located = {}
+        # the same for locate_last()
+        self._located_last = {}
+
+    @classmethod
+    def shared(cls, proto_dirs):
+        """Returns index of given proto areas shared by all callers within
+        this process, or None if there are no proto areas."""
+        if not proto_dirs:
+            return None
+        key = tuple(proto_dirs)
+        if key not in cls._shared:
+            cls._shared[key] = cls(proto_dirs)
+        return cls._shared[key]
+
+    @classmethod
+    def reset(cls):
+        """Drops all shared indexes, e.g. when proto areas changed."""
+        cls._shared.clear()
+
+    def _listing(self, directory):
+        if directory not in self._listings:
+            try:
+                with os.scandir(directory) as it:
+                    self._listings[directory] = {e.name: e for e in it}
+            except OSError:
+                self._listings[directory] = None
+        return self._listings[directory]
+
+    def _lookup(self, root, parts):
+        """Returns (fullpath, stat) of a path given by parts in root."""
+        directory = root
+        for i, name in enumerate(parts):
+            listing = self._listing(directory)
+            if listing is None or name not in listing:
+                return None
+            entry = listing[name]
+            try:
+                # follows symlinks, just like os.path.exists() would
+                st = entry.stat()
+            except OSError:
+                return None
+            if i == len(parts) - 1:
+                return entry.path, st
+            if not entry.is_dir():
+                return None
+            directory = entry.path
+        return None
+
+    def locate(self, path):
+        """Returns tuple with full path and stat of the first file matching
+        given path in the proto areas, or None if there is no such file."""
+        return self._search(path, self.proto_dirs, self._located)
+
+    def locate_last(self, path):
+        """Returns tuple with full path and stat of the last file matching
+        given path in the proto areas, or None if there is no such file."""
+        return self._search(path, self.proto_dirs[::-1], self._located_last)
+
+    def _search(self, path, proto_dirs, located):
+        """Returns (fullpath, stat) of the first file matching given path in
+        proto_dirs, remembered in located."""
+        if path in located:
+            return located[path]
+
+        parts = [p for p in path.split("/") if p not in ("", ".")]
+        result = None
+        if ".." in parts:
+            # not expected in packaged paths, don't try to be smart
+            for proto_dir in proto_dirs:
+                fullpath = os.path.join(proto_dir, path)
+                try:
+                    result = (fullpath, os.stat(fullpath))
+                    break
+                except OSError:
+                    pass
+        elif parts:
+            for proto_dir in proto_dirs:
+                result = self._lookup(proto_dir, parts)
+                if result is not None:
+                    break
+
+        located[path] = result
+        return result
+
+# vim: expandtab sw=4 ts=4
@@ -0,0 +1,281 @@
+#
+# CDDL HEADER START
+#
+# The contents of this file are subject to the terms of the
+# Common Development and Distribution License (the "License").
+# You may not use this file except in compliance with the License.
+#
+# You can obtain a copy of the license at usr/src/OPENSOLARIS.LICENSE
+# or http://www.opensolaris.org/os/licensing.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+#
+# When distributing Covered Code, include this CDDL HEADER in each
+# file and include the License file at usr/src/OPENSOLARIS.LICENSE.
+# If applicable, add the following below this CDDL HEADER, with the
+# fields enclosed by brackets "[]" replaced with your own identifying
+# information: Portions Copyright [yyyy] [name of copyright owner]
+#
+# CDDL HEADER END
+#
+
+#
+# Copyright (c) 2026, Oracle and/or its affiliates.
+#
+
+# Lookup structures over the reference action path dictionaries used by
+# the Userland pkglint extension (see userland.py).
+#
+# Nothing in here depends on the pkg(7) modules, so it can be imported and
+# tested on any system.
+
+import bisect
+import posixpath
+
+from pkglint import persist
+from pkglint.pathtable import ENTRY_ATTRS
+
+
+class PrefixIndex:
+    """Sorted array of delivered paths, which can answer whether there is
+    any path delivered underneath a given directory in logarithmic time.
+
+    Reference paths don't start with '/', and neither should directories
+    passed into the lookup methods.
+    """
+
+    def __init__(self, paths=()):
+        self._keys = sorted(paths)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, path):
+        i = bisect.bisect_left(self._keys, path)
+        return i < len(self._keys) and self._keys[i] == path
+
+    def has_descendant(self, directory):
+        """Returns True if any path starts with 'directory/'."""
+        prefix = directory + "/"
+        # All paths starting with prefix are sorted right after it.
+        i = bisect.bisect_left(self._keys, prefix)
+        return i < len(self._keys) and self._keys[i].startswith(prefix)
+
+    def count_descendants(self, directory):
+        """Returns number of paths starting with 'directory/'."""
+        # '0' follows '/', so paths starting with prefix sort before
+        # directory + '0'
+        return (bisect.bisect_left(self._keys, directory + "0") -
+                bisect.bisect_left(self._keys, directory + "/"))
+
+    def descendants(self, directory):
+        """Generates paths starting with 'directory/', in sorted order."""
+        prefix = directory + "/"
+        keys = self._keys
+        for i in range(bisect.bisect_left(keys, prefix), len(keys)):
+            if not keys[i].startswith(prefix):
+                break
+            yield keys[i]
+
+
+class PrefixOverlay:
+    """PrefixIndex of a path table made from another one, whose index is
+    reused: paths added to the table are indexed on their own, and the
+    paths removed from it are counted for each of their parent
+    directories.
+
+    A pkglint daemon builds the index of the reference paths it keeps
+    once, rather than for every run (see WarmPaths in pathtable.py).
+    """
+
+    def __init__(self, base, changed, table):
+        """Paths of table not in base, and paths of base not in table,
+        have to be among the changed ones."""
+        self.base = base
+        self.table = table
+        added = []
+        # directory -> number of base paths underneath it not in table
+        self.removed = {}
+        for path in set(changed):
+            if path in table:
+                if path not in base:
+                    added.append(path)
+            elif path in base:
+                directory = path.rpartition("/")[0]
+                while directory:
+                    self.removed[directory] = self.removed.get(directory, 0) + 1
+                    directory = directory.rpartition("/")[0]
+        self.added = PrefixIndex(added)
+
+    def __len__(self):
+        return len(self.table)
+
+    def __contains__(self, path):
+        return path in self.table
+
+    def has_descendant(self, directory):
+        """Returns True if any path starts with 'directory/'."""
+        if self.added.has_descendant(directory):
+            return True
+        return (self.base.count_descendants(directory) >
+                self.removed.get(directory, 0))
+
+
+class LibraryIndex:
+    """Directories delivering each shared object name, so that libraries
+    needed by ELF objects can be found in constant time per directory.
+
+    Only paths whose name contains ".so" are indexed.
+    """
+
+    def __init__(self, paths=()):
+        index = {}
+        for path in paths:
+            directory, _, name = path.rpartition("/")
+            if ".so" in name:
+                index.setdefault(name, set()).add(directory)
+        self._dirs = {name: frozenset(dirs) for name, dirs in index.items()}
+
+    def __len__(self):
+        return len(self._dirs)
+
+    def directories(self, name):
+        """Returns set of directories delivering given name."""
+        return self._dirs.get(name, frozenset())
+
+
+class LibraryOverlay:
+    """LibraryIndex of a path table made from another one, whose index is
+    reused, see PrefixOverlay. Directories of removed paths are still
+    returned, so they have to be looked up in the table."""
+
+    def __init__(self, base, added):
+        self.base = base
+        self.added = LibraryIndex(added)
+
+    def __len__(self):
+        return len(self.base) + sum(
+            1 for name in self.added._dirs if name not in self.base._dirs)
+
+    def directories(self, name):
+        """Returns set of directories delivering given name."""
+        added = self.added.directories(name)
+        if not added:
+            return self.base.directories(name)
+        return self.base.directories(name) | added
+
+
+class LinkResolver:
+    """Resolves paths through chains of links delivered in a path table
+    (PathTable or MappedPathTable), including links to directories in any
+    of their components.
+
+    Every resolved prefix is memoized, so resolving all paths in a
+    directory costs about the same as resolving one of them.
+    """
+
+    def __init__(self, paths):
+        self.paths = paths
+        # (path, variants) -> resolved path, None for circular links
+        self._resolved = {}
+
+    def __len__(self):
+        return len(self._resolved)
+
+    def resolve(self, path, variants=()):
+        """Returns given path with all links in it resolved within the
+        actions which can be installed with given variants (see
+        variant_key()), or None if it runs into circular links."""
+        return self.__resolve(path, variants, set())
+
+    def __link(self, path, variants):
+        for entry in self.paths.select(path, variants):
+            if entry.name == "link":
+                return entry
+        return None
+
+    def __resolve(self, path, variants, pending):
+        if not path:
+            return path
+
+        key = (path, variants)
+        try:
+            return self._resolved[key]
+        except KeyError:
+            pass
+        # link leading back to a path being resolved
+        if key in pending:
+            return None
+        pending.add(key)
+
+        parent, _, name = path.rpartition("/")
+        head = self.__resolve(parent, variants, pending)
+        if head is None:
+            resolved = None
+        else:
+            current = f"{head}/{name}" if head else name
+            link = self.__link(current, variants)
+            if link is None:
+                resolved = current
+            else:
+                target = link.target
+                base = "" if target.startswith("/") else head
+                joined = posixpath.normpath(posixpath.join(base, target.lstrip("/")))
+                # there is nothing above the root directory
+                while joined == ".." or joined.startswith("../"):
+                    joined = joined[3:]
+                resolved = self.__resolve(
+                    "" if joined == "." else joined, variants, pending)
+
+        pending.discard(key)
+        self._resolved[key] = resolved
+        return resolved
+
+
+class RefPathCache:
+    """Persistent cache of the seeded reference path dictionary.
+
+    The dictionary is stored as per-package fragments, each being a list
+    of (path, action name, attrs) tuples, keyed by the package FMRI
+    string. The whole cache is tagged with the state of the reference
+    catalog it was built from; if the state didn't change, the fragments
+    can be used as they are. Otherwise only packages without a fragment
+    need to be seeded again and fragments of packages which are gone are
+    dropped. Fragments are put into the dictionary by PathTable.seed().
+    """
+
+    VERSION = 2
+
+    # attributes of reference actions preserved in the fragments
+    attrs = ("path", "target") + ENTRY_ATTRS
+
+    def __init__(self, path):
+        self.path = path
+        self.state = None
+        self.fragments = {}
+
+    def load(self):
+        """Load the cache from disk; a missing, unreadable or outdated
+        cache file is silently treated as an empty cache."""
+        data = persist.load(self.path, self.VERSION)
+        if data is not None:
+            self.state, self.fragments = data
+
+    def save(self, state, fragments):
+        """Atomically replace the cache file with the given fragments."""
+        self.state = state
+        self.fragments = fragments
+        persist.save(self.path, self.VERSION, (state, fragments))
+
+    @classmethod
+    def fragment(cls, actions):
+        """Create a fragment from (action name, attrs) pairs, keeping only
+        the preserved attributes and variants."""
+        fragment = []
+        for name, attrs in actions:
+            kept = {k: v for k, v in attrs.items()
+                    if k in cls.attrs or k.startswith("variant.")}
+            fragment.append((attrs["path"], name, kept))
+        return fragment
+
+# vim: expandtab sw=4 ts=4
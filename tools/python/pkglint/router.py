@@ -0,0 +1,112 @@
+#
+# CDDL HEADER START
+#
+# The contents of this file are subject to the terms of the
+# Common Development and Distribution License (the "License").
+# You may not use this file except in compliance with the License.
+#
+# You can obtain a copy of the license at usr/src/OPENSOLARIS.LICENSE
+# or http://www.opensolaris.org/os/licensing.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+#
+# When distributing Covered Code, include this CDDL HEADER in each
+# file and include the License file at usr/src/OPENSOLARIS.LICENSE.
+# If applicable, add the following below this CDDL HEADER, with the
+# fields enclosed by brackets "[]" replaced with your own identifying
+# information: Portions Copyright [yyyy] [name of copyright owner]
+#
+# CDDL HEADER END
+#
+
+#
+# Copyright (c) 2026, Oracle and/or its affiliates.
+#
+
+
+# Routing of actions to the action checks interested in them.
+#
+# The pkglint engine calls every check of an action checker for every
+# action, although most checks look only at a few action types or at paths
+# under a particular directory. Checks declare what they are interested in
+# with handles(), and checkers deriving from RoutedActionChecker call them
+# only for matching actions, so checks don't test the action type or path
+# prefix themselves. Checks which declare nothing get all actions.
+
+
+def handles(*types, prefixes=None):
+    """Declares that the decorated check wants only actions of given types
+    (all types when none are given) delivering paths starting with one of
+    given prefixes (any path or no path at all when prefixes is None)."""
+    def decorator(func):
+        func.pkglint_types = frozenset(types) if types else None
+        func.pkglint_prefixes = tuple(prefixes) if prefixes is not None else None
+        return func
+    return decorator
+
+
+class Router:
+    """Selects checks (items of Checker.included_checks) for actions."""
+
+    def __init__(self, checks):
+        self.checks = checks
+        # action name -> (checks, None) when all of them want every action
+        # of that type, or (None, ((check, prefixes), ..)) otherwise
+        self.routes = {}
+
+    def __build(self, name):
+        routed = []
+        for check in self.checks:
+            types = getattr(check[0], "pkglint_types", None)
+            if types is None or name in types:
+                routed.append((check, getattr(check[0], "pkglint_prefixes", None)))
+
+        if all(prefixes is None for _, prefixes in routed):
+            return tuple(check for check, _ in routed), None
+        return None, tuple(routed)
+
+    def route(self, action):
+        """Returns checks which should be run on given action."""
+        route = self.routes.get(action.name)
+        if route is None:
+            route = self.routes[action.name] = self.__build(action.name)
+
+        checks, prefixed = route
+        if checks is not None:
+            return checks
+
+        path = action.attrs.get("path")
+        return tuple(
+            check for check, prefixes in prefixed
+            if prefixes is None or (path is not None and path.startswith(prefixes)))
+
+
+class RoutedActionChecker:
+    """Mixin of action checkers (preceding base.ActionChecker in bases),
+    which runs only checks routed to each action.
+
+    The router is rebuilt whenever included_checks is assigned, as
+    excluded checks are known only after the checker is created; while
+    checking an action, included_checks are the checks routed to it."""
+
+    __router = Router(())
+    __routed = None
+
+    @property
+    def included_checks(self):
+        if self.__routed is not None:
+            return self.__routed
+        return self.__router.checks
+
+    @included_checks.setter
+    def included_checks(self, checks):
+        self.__router = Router(checks)
+
+    def check(self, action, manifest, engine):
+        self.__routed = self.__router.route(action)
+        try:
+            super().check(action, manifest, engine)
+        finally:
+            self.__routed = None
+
+# vim: expandtab sw=4 ts=4
@@ -0,0 +1,202 @@
+#
+# CDDL HEADER START
+#
+# The contents of this file are subject to the terms of the
+# Common Development and Distribution License (the "License").
+# You may not use this file except in compliance with the License.
+#
+# You can obtain a copy of the license at usr/src/OPENSOLARIS.LICENSE
+# or http://www.opensolaris.org/os/licensing.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+#
+# When distributing Covered Code, include this CDDL HEADER in each
+# file and include the License file at usr/src/OPENSOLARIS.LICENSE.
+# If applicable, add the following below this CDDL HEADER, with the
+# fields enclosed by brackets "[]" replaced with your own identifying
+# information: Portions Copyright [yyyy] [name of copyright owner]
+#
+# CDDL HEADER END
+#
+
+#
+# Copyright (c) 2026, Oracle and/or its affiliates.
+#
+
+
+# Sharded pkglint driver: lints manifests given on the command line with
+# several pkglint processes running in parallel.
+#
+# Usage: python3 -m pkglint.sharded <pkglint arguments>
+#
+# The manifests are split into PKGLINT_SHARDS (number of CPUs by default)
+# contiguous shards of similar size. The first shard is started alone: the
+# Userland extension running in it seeds reference and lint paths of all
+# shards and publishes them merged into a file (see sharedindex.py). Only
+# then the other shards are started, mapping that file read-only instead of
+# building their own copy of the reference paths, which also makes sure
+# that the pkglint cache directory has been set up before they use it.
+#
+# Output of the shards is written in shard order once all of them finish,
+# so findings come in the same order no matter which shard finished first.
+# The exit code is the highest one of all shards.
+#
+# Manifests given with other pkglint options than those sharded here
+# (e.g. a lint repository) are linted by a single pkglint process.
+#
+# Checks of the pkglint core comparing actions of different lint manifests
+# (e.g. the duplicate action checks of pkglint.dupaction) see only the
+# manifests of their own shard, so conflicts between manifests of
+# different shards are not reported. The Userland checks see paths of all
+# shards. Use a single pkglint run where those core checks matter.
+
+import getopt
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+PKGLINT = "/usr/bin/pkglint"
+
+# options of pkglint(1); those not allowed in a sharded run are below
+SHORT_OPTIONS = "b:c:e:f:l:p:r:vL"
+LONG_OPTIONS = ["help", "version", "debug"]
+UNSHARDED = {"-l", "-L", "--help", "--version"}
+
+
+def split_args(args):
+    """Returns pkglint options and manifests given in args, or None when
+    the manifests cannot be linted in shards."""
+    try:
+        opts, manifests = getopt.gnu_getopt(args, SHORT_OPTIONS, LONG_OPTIONS)
+    except getopt.GetoptError:
+        return None
+    if any(opt in UNSHARDED for opt, _ in opts):
+        return None
+
+    options = []
+    for opt, value in opts:
+        options.append(opt)
+        if f"{opt[1:]}:" in SHORT_OPTIONS:
+            options.append(value)
+    return options, manifests
+
+
+def partition(manifests, shards):
+    """Splits manifests into at most given number of contiguous shards of
+    similar total size."""
+    sizes = []
+    for manifest in manifests:
+        try:
+            sizes.append(max(os.path.getsize(manifest), 1))
+        except OSError:
+            sizes.append(1)
+
+    total = sum(sizes)
+    chunks = [[]]
+    done = 0
+    for manifest, size in zip(manifests, sizes):
+        if chunks[-1] and len(chunks) < shards and \
+                done + size / 2 > total * len(chunks) / shards:
+            chunks.append([])
+        chunks[-1].append(manifest)
+        done += size
+    return chunks
+
+
+class Shard:
+    """pkglint process linting one shard, with output kept in files."""
+
+    def __init__(self, index, args, workdir):
+        self.args = args
+        self.stdout = open(os.path.join(workdir, f"shard{index}.out"), "w+")
+        self.stderr = open(os.path.join(workdir, f"shard{index}.err"), "w+")
+        self.process = None
+
+    def start(self, env):
+        self.process = subprocess.Popen(
+            [PKGLINT] + self.args, stdout=self.stdout, stderr=self.stderr, env=env)
+
+    def running(self):
+        return self.process is not None and self.process.poll() is None
+
+    def report(self, findings=True):
+        """Copies output of the finished pkglint to ours; only its error
+        output unless findings is True."""
+        outputs = [(self.stderr, sys.stderr)]
+        if findings:
+            outputs.insert(0, (self.stdout, sys.stdout))
+        for output, ours in outputs:
+            output.seek(0)
+            shutil.copyfileobj(output, ours)
+            ours.flush()
+        self.stdout.close()
+        self.stderr.close()
+
+
+def run_sharded(options, chunks, workdir):
+    """Lints chunks of manifests with pkglint processes, each run with
+    given options; returns the exit code."""
+    index = os.path.join(workdir, "index")
+    listing = os.path.join(workdir, "manifests")
+    with open(listing, "w") as ofile:
+        for chunk in chunks:
+            for manifest in chunk:
+                ofile.write(os.path.abspath(manifest) + "\n")
+
+    env = dict(os.environ, PKGLINT_SHARED_INDEX=index)
+    env.pop("PKGLINT_SHARD_MANIFESTS", None)
+    # share the CPUs among shards (for checks running in parallel)
+    env.setdefault("PKGLINT_JOBS", str(max(1, (os.cpu_count() or 1) // len(chunks))))
+
+    shards = [Shard(i, options + chunk, workdir) for i, chunk in enumerate(chunks)]
+    try:
+        shards[0].start(dict(env, PKGLINT_SHARD_MANIFESTS=listing))
+        while shards[0].running() and not os.path.exists(index):
+            time.sleep(0.1)
+
+        if not os.path.exists(index):
+            # Errors of the first shard tell why there is no index. All
+            # manifests are linted again, so its findings are not needed.
+            status = shards[0].process.wait()
+            shards[0].report(findings=False)
+            sys.stderr.write("pkglint: shared reference paths were not "
+                             f"published (exit status {status}), linting all "
+                             "manifests again without shards\n")
+            sys.stderr.flush()
+            return subprocess.call(
+                [PKGLINT] + options + [m for chunk in chunks for m in chunk])
+
+        for shard in shards[1:]:
+            shard.start(env)
+
+        status = 0
+        for shard in shards:
+            status = max(status, shard.process.wait())
+            shard.report()
+        return status
+    finally:
+        for shard in shards:
+            if shard.running():
+                shard.process.kill()
+                shard.process.wait()
+
+
+def main(args):
+    shards = int(os.getenv("PKGLINT_SHARDS", "0")) or os.cpu_count() or 1
+
+    split = split_args(args)
+    if split is None or shards < 2 or len(split[1]) < 2:
+        return subprocess.call([PKGLINT] + args)
+
+    options, manifests = split
+    with tempfile.TemporaryDirectory(prefix="pkglint-shards") as workdir:
+        return run_sharded(options, partition(manifests, shards), workdir)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
+
+# vim: expandtab sw=4 ts=4
@@ -0,0 +1,303 @@
+#
+# CDDL HEADER START
+#
+# The contents of this file are subject to the terms of the
+# Common Development and Distribution License (the "License").
+# You may not use this file except in compliance with the License.
+#
+# You can obtain a copy of the license at usr/src/OPENSOLARIS.LICENSE
+# or http://www.opensolaris.org/os/licensing.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+#
+# When distributing Covered Code, include this CDDL HEADER in each
+# file and include the License file at usr/src/OPENSOLARIS.LICENSE.
+# If applicable, add the following below this CDDL HEADER, with the
+# fields enclosed by brackets "[]" replaced with your own identifying
+# information: Portions Copyright [yyyy] [name of copyright owner]
+#
+# CDDL HEADER END
+#
+
+#
+# Copyright (c) 2026, Oracle and/or its affiliates.
+#
+
+
+# Reference path table shared by pkglint processes linting shards of one
+# set of manifests (see sharded.py).
+#
+# The merged reference path table is written once into a file, which the
+# other processes map read-only instead of building their own copy; the
+# memory holding it is then shared by all of them through the page cache.
+#
+# The file consists of a header followed by these sections:
+#
+#   paths     (string offset, string length, first entry, entry count) of
+#             each path, sorted by path
+#   entries   (fmri, name, target offset, target length, variants, attrs)
+#             of each PathEntry; name, variants and attrs index the tables
+#             below, target length is -1 for actions without target
+#   fmris     (string offset, string length) of each package FMRI
+#   names     (string offset, string length) of each action name
+#   variants  (string offset, string length) of each variant combination,
+#             encoded as JSON
+#   attrs     (string offset, string length) of each PathEntry.attrs tuple,
+#             encoded as JSON
+#   strings   UTF-8 encoded strings referred to from the other sections
+#
+# The header ends with a JSON encoded dictionary of metadata about the
+# table (e.g. state of the reference catalog it was built from).
+
+import json
+import mmap
+import os
+import struct
+import tempfile
+
+from pkglint.pathtable import PathEntry, VariantBits, VariantSelect
+
+MAGIC = b"PKGLIDX\0"
+VERSION = 2
+
+_HEADER = struct.Struct("<8sI" + "QQ" * 7 + "QI")
+_PATH = struct.Struct("<QIII")
+_ENTRY = struct.Struct("<IIQiII")
+_STRING = struct.Struct("<QI")
+
+# order of sections in the header, each described by (offset, count)
+_SECTIONS = ("paths", "entries", "fmris", "names", "variants", "attrs", "strings")
+
+
+class _Strings:
+    """Builder of the strings section."""
+
+    def __init__(self):
+        self.data = bytearray()
+
+    def add(self, text):
+        encoded = text.encode()
+        offset = len(self.data)
+        self.data += encoded
+        return offset, len(encoded)
+
+
+class _Interned:
+    """Builder of a section of distinct strings."""
+
+    def __init__(self, strings):
+        self.strings = strings
+        self.ids = {}
+        self.data = bytearray()
+
+    def add(self, value, text):
+        index = self.ids.get(value)
+        if index is None:
+            index = self.ids[value] = len(self.ids)
+            self.data += _STRING.pack(*self.strings.add(text))
+        return index
+
+
+def publish(path, table, meta):
+    """Atomically writes given PathTable with a dictionary of metadata into
+    the file at path."""
+    strings = _Strings()
+    fmris = _Interned(strings)
+    names = _Interned(strings)
+    variants = _Interned(strings)
+    attrs = _Interned(strings)
+
+    paths = bytearray()
+    entries = bytearray()
+    count = 0
+    for key in sorted(table):
+        path_entries = table[key]
+        paths += _PATH.pack(*strings.add(key), count, len(path_entries))
+        count += len(path_entries)
+        for entry in path_entries:
+            if entry.target is None:
+                target = (0, -1)
+            else:
+                target = strings.add(entry.target)
+            entries += _ENTRY.pack(
+                fmris.add(entry.fmri, str(table.fmris[entry.fmri])),
+                names.add(entry.name, entry.name),
+                target[0], target[1],
+                variants.add(entry.variants, json.dumps(entry.variants)),
+                attrs.add(entry.attrs, json.dumps(entry.attrs)))
+
+    meta_data = json.dumps(meta).encode()
+    sections = [(paths, len(table)), (entries, count),
+                (fmris.data, len(fmris.ids)), (names.data, len(names.ids)),
+                (variants.data, len(variants.ids)), (attrs.data, len(attrs.ids)),
+                (strings.data, len(strings.data))]
+
+    offset = _HEADER.size + len(meta_data)
+    layout = []
+    for data, items in sections:
+        layout += [offset, items]
+        offset += len(data)
+    header = _HEADER.pack(MAGIC, VERSION, *layout, _HEADER.size, len(meta_data))
+
+    directory = os.path.dirname(path) or "."
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".pkglint")
+    try:
+        with os.fdopen(fd, "wb") as ofile:
+            ofile.write(header)
+            ofile.write(meta_data)
+            for data, _ in sections:
+                ofile.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+class MappedPathTable(VariantSelect):
+    """Read-only PathTable (and PrefixIndex) backed by a file written by
+    publish(). Entries refer to FMRIs in the fmris attribute, which are
+    FMRI strings rather than pkg.fmri.PkgFmri objects."""
+
+    def __init__(self, path):
+        with open(path, "rb") as ifile:
+            self._map = mmap.mmap(ifile.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            fields = _HEADER.unpack_from(self._map, 0)
+        except struct.error:
+            raise ValueError(f"{path}: truncated shared path index") from None
+        if fields[0] != MAGIC or fields[1] != VERSION:
+            raise ValueError(f"{path}: not a shared path index of version {VERSION}")
+
+        end = 2 + 2 * len(_SECTIONS)
+        offsets = dict(zip(_SECTIONS, fields[2:end:2]))
+        counts = dict(zip(_SECTIONS, fields[3:end:2]))
+        self._paths = offsets["paths"]
+        self._entries = offsets["entries"]
+        self._strings = offsets["strings"]
+        self._len = counts["paths"]
+        self.fmris = _MappedStrings(self, offsets["fmris"], counts["fmris"])
+        self._names = _MappedStrings(self, offsets["names"], counts["names"])
+        self._variant_strings = _MappedStrings(
+            self, offsets["variants"], counts["variants"])
+        self._variant_cache = {}
+        self._attr_strings = _MappedStrings(self, offsets["attrs"], counts["attrs"])
+        self._attr_cache = {}
+        self.variant_bits = VariantBits()
+
+        meta_offset, meta_len = fields[end:]
+        self.meta = json.loads(bytes(self._map[meta_offset:meta_offset + meta_len]))
+
+    def close(self):
+        self._map.close()
+
+    def _string(self, offset, length):
+        start = self._strings + offset
+        return self._map[start:start + length].decode()
+
+    def __path_record(self, index):
+        return _PATH.unpack_from(self._map, self._paths + index * _PATH.size)
+
+    def __path_bytes(self, index):
+        offset, length, _, _ = self.__path_record(index)
+        start = self._strings + offset
+        return self._map[start:start + length]
+
+    def __bisect(self, key):
+        """Returns index of the first path not less than key (bytes)."""
+        low, high = 0, self._len
+        while low < high:
+            mid = (low + high) // 2
+            if self.__path_bytes(mid) < key:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def __find(self, path):
+        key = path.encode()
+        index = self.__bisect(key)
+        if index < self._len and self.__path_bytes(index) == key:
+            return index
+        return None
+
+    def __variants(self, index):
+        variants = self._variant_cache.get(index)
+        if variants is None:
+            variants = tuple(
+                (k, tuple(v) if isinstance(v, list) else v)
+                for k, v in json.loads(self._variant_strings[index]))
+            self._variant_cache[index] = variants
+        return variants
+
+    def __attrs(self, index):
+        attrs = self._attr_cache.get(index)
+        if attrs is None:
+            attrs = self._attr_cache[index] = tuple(json.loads(self._attr_strings[index]))
+        return attrs
+
+    def __entries(self, index):
+        _, _, first, count = self.__path_record(index)
+        entries = []
+        for i in range(first, first + count):
+            fmri, name, target_offset, target_len, variants, attrs = _ENTRY.unpack_from(
+                self._map, self._entries + i * _ENTRY.size)
+            target = None
+            if target_len >= 0:
+                target = self._string(target_offset, target_len)
+            entries.append(PathEntry(
+                fmri, self._names[name], target, self.__variants(variants),
+                self.__attrs(attrs)))
+        return tuple(entries)
+
+    def __len__(self):
+        return self._len
+
+    def __contains__(self, path):
+        return self.__find(path) is not None
+
+    def __iter__(self):
+        for index in range(self._len):
+            yield self.__path_bytes(index).decode()
+
+    def __getitem__(self, path):
+        index = self.__find(path)
+        if index is None:
+            raise KeyError(path)
+        return self.__entries(index)
+
+    def get(self, path, default=()):
+        index = self.__find(path)
+        if index is None:
+            return default
+        return self.__entries(index)
+
+    def items(self):
+        for index in range(self._len):
+            yield self.__path_bytes(index).decode(), self.__entries(index)
+
+    def has_descendant(self, directory):
+        """Returns True if any path starts with 'directory/'."""
+        prefix = (directory + "/").encode()
+        index = self.__bisect(prefix)
+        return index < self._len and self.__path_bytes(index).startswith(prefix)
+
+
+class _MappedStrings:
+    """Section of (offset, length) references into the strings section."""
+
+    def __init__(self, table, offset, count):
+        self.table = table
+        self.offset = offset
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        offset, length = _STRING.unpack_from(
+            self.table._map, self.offset + index * _STRING.size)
+        return self.table._string(offset, length)
+
+# vim: expandtab sw=4 ts=4
@@ -0,0 +1,134 @@
+#
+# CDDL HEADER START
+#
+# The contents of this file are subject to the terms of the
+# Common Development and Distribution License (the "License").
+# You may not use this file except in compliance with the License.
+#
+# You can obtain a copy of the license at usr/src/OPENSOLARIS.LICENSE
+# or http://www.opensolaris.org/os/licensing.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+#
+# When distributing Covered Code, include this CDDL HEADER in each
+# file and include the License file at usr/src/OPENSOLARIS.LICENSE.
+# If applicable, add the following below this CDDL HEADER, with the
+# fields enclosed by brackets "[]" replaced with your own identifying
+# information: Portions Copyright [yyyy] [name of copyright owner]
+#
+# CDDL HEADER END
+#
+
+#
+# Copyright (c) 2026, Oracle and/or its affiliates.
+#
+
+# Validation of SMF manifests for the Userland pkglint extension.
+
+import concurrent.futures
+import hashlib
+import os
+import subprocess
+
+from pkglint import persist
+
+
+class SmfValidator:
+    """Validates SMF manifests with svccfg(8).
+
+    Manifests can be queued with add() and validated all at once by run(),
+    using a pool of concurrently running svccfg processes. Verdicts are
+    cached by manifest content, so manifests which didn't change since
+    the last run don't need to be validated again.
+    """
+
+    VERSION = 1
+
+    # Paths in svccfg output are replaced with this placeholder in the
+    # cache, as the same content may be validated from a different place.
+    _placeholder = "\0manifest\0"
+
+    def __init__(self, cache_path=None, jobs=1,
+                 command=("/usr/sbin/svccfg", "validate")):
+        self.cache_path = cache_path
+        self.jobs = jobs
+        self.command = list(command)
+
+        # Verdicts are only valid for the svccfg that produced them.
+        try:
+            st = os.stat(self.command[0])
+            self.tool = (self.command[0], st.st_mtime_ns, st.st_size)
+        except OSError:
+            self.tool = (self.command[0], None, None)
+
+        verdicts = None
+        if cache_path is not None:
+            verdicts = persist.load(cache_path, (self.VERSION, self.tool))
+        self.verdicts = verdicts or {}
+        self.changed = False
+
+        # fullpath -> content digest of queued and validated manifests
+        self.digests = {}
+        self.queue = []
+
+    @staticmethod
+    def digest(fullpath):
+        """Returns the digest of manifest content."""
+        with open(fullpath, "rb") as ifile:
+            return hashlib.sha256(ifile.read()).hexdigest()
+
+    def add(self, fullpath):
+        """Queues given manifest for validation by run()."""
+        if fullpath in self.digests:
+            return
+        digest = self.digests[fullpath] = self.digest(fullpath)
+        if digest not in self.verdicts:
+            self.queue.append(fullpath)
+
+    def __validate(self, fullpath):
+        res = subprocess.run(self.command + [fullpath],
+                             capture_output=True, text=True)
+        if res.returncode == 0:
+            return None
+        return res.stderr.replace(fullpath, self._placeholder)
+
+    def run(self):
+        """Validates all queued manifests."""
+        # the same content may be queued under several paths
+        pending = {}
+        for fullpath in self.queue:
+            pending.setdefault(self.digests[fullpath], fullpath)
+        self.queue = []
+
+        if not pending:
+            return
+
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=max(1, min(self.jobs, len(pending)))) as pool:
+            futures = {digest: pool.submit(self.__validate, fullpath)
+                       for digest, fullpath in pending.items()}
+            for digest, future in futures.items():
+                self.verdicts[digest] = future.result()
+        self.changed = True
+
+    def result(self, fullpath):
+        """Returns svccfg error output for given manifest, or None if it is
+        valid. Manifests not validated by run() are validated now."""
+        if fullpath not in self.digests:
+            self.add(fullpath)
+        if self.queue:
+            self.run()
+
+        verdict = self.verdicts[self.digests[fullpath]]
+        if verdict is None:
+            return None
+        return verdict.replace(self._placeholder, fullpath)
+
+    def save(self):
+        """Writes verdicts back to the cache file, if there are new ones."""
+        if self.cache_path is None or not self.changed:
+            return
+        persist.save(self.cache_path, (self.VERSION, self.tool), self.verdicts)
+        self.changed = False
+
+# vim: expandtab sw=4 ts=4
@@ -21,7 +21,7 @@
 #
 
 #
-# Copyright (c) 2010, 2022, Oracle and/or its affiliates.
+# Copyright (c) 2010, 2026, Oracle and/or its affiliates.
 #
 
 # Some userland consolidation specific lint checks
@@ -46,25 +46,96 @@
 #   manifest:  /ips-gate/src/modules/manifest.py
 #
 
+import hashlib
+import itertools
 import os.path
 import platform
 import re
 import subprocess
 import sys
+import time
 
+import pkg.client.api
+import pkg.client.api_errors
 import pkg.elf as elf
 import pkg.fmri
 import pkg.lint.base as base
+import pkg.manifest
 
 from pkg.lint.engine import lint_fmri_successor
 from pathlib import PurePath
+from pkglint import instrument
+from pkglint.conflicts import find_conflicts
+from pkglint.elfinfo import ElfCache, ElfError, ElfRecord, read_elf
+from pkglint.findings import FindingStore, Session
+from pkglint.loader import pipelined
+from pkglint.payload import DigestCache, expected_digests, is_digest
+from pkglint.pathtable import FmriTable, PathTable, WarmPaths, variant_key
+from pkglint.pathclass import PathClassifier
+from pkglint.protoarea import ProtoIndex
+from pkglint.persist import StatCache
+from pkglint.refindex import LibraryIndex, LibraryOverlay, LinkResolver
+from pkglint.refindex import PrefixIndex, PrefixOverlay, RefPathCache
+from pkglint.router import RoutedActionChecker, handles
+from pkglint.sharedindex import MappedPathTable, publish
+from pkglint.smfvalidate import SmfValidator
+
+
+def read_manifests(path):
+    """Reads manifests from files listed in the file at path, one per line,
+    the way pkglint reads manifests given on its command line."""
+    manifests = []
+    with open(path) as ifile:
+        for line in ifile:
+            manifest = pkg.manifest.Manifest()
+            manifest.set_content(pathname=line.rstrip("\n"))
+            manifest.fmri = pkg.fmri.PkgFmri(manifest["pkg.fmri"])
+            manifests.append(manifest)
+    return manifests
+
+
+def gen_attr_actions(mf, attr, atype=None):
+    """Generates actions of a given type atype with the given
+    attribute in the given manifest, with their variants merged
+    into action attributes."""
+
+    pkg_vars = mf.get_all_variants()
+
+    if atype:
+        mfg = (a for a in mf.gen_actions_by_type(atype))
+    else:
+        mfg = (a for a in mf.gen_actions())
+
+    for action in mfg:
+        if atype and action.name != atype:
+            continue
+        if attr not in action.attrs:
+            continue
+
+        variants = action.get_variant_template()
+        variants.merge_unknown(pkg_vars)
+        # Action attributes must be lists or strings.
+        for k, v in variants.items():
+            if isinstance(v, set):
+                action.attrs[k] = list(v)
+            else:
+                action.attrs[k] = v
+
+        yield action
 
 
-class UserlandActionChecker(base.ActionChecker):
+class UserlandActionChecker(RoutedActionChecker, base.ActionChecker):
     """An opensolaris.org-specific class to check actions."""
 
     name = "userland.action"
 
+    # names of the persistent cache files
+    ref_cache_name = "userland_ref_paths.pickle"
+    elf_cache_name = "userland_elf.pickle"
+    smf_cache_name = "userland_smf.pickle"
+    digest_cache_name = "userland_digests.pickle"
+    findings_cache_name = "userland_findings.pickle"
+
     def __init__(self, config):
         self.description = "checks Userland packages for common content errors"
         path = os.getenv("PROTO_PATH")
@@ -72,7 +143,21 @@ class UserlandActionChecker(base.ActionChecker):
             self.proto_path = path.split()
         else:
             self.proto_path = None
+        # files in the proto areas, shared with UserlandManifestChecker
+        self.proto = ProtoIndex.shared(self.proto_path)
+        # In a sharded run (see sharded.py), the first shard gets a list of
+        # the manifests of all shards in PKGLINT_SHARD_MANIFESTS, so that it
+        # can seed their paths, and publishes the merged reference paths to
+        # the file named by PKGLINT_SHARED_INDEX; the other shards map that
+        # file instead of seeding and merging their own copy.
+        self.shared_index = os.getenv("PKGLINT_SHARED_INDEX")
+        self.shard_manifests = os.getenv("PKGLINT_SHARD_MANIFESTS")
+        # proto area files are compared with digests in published manifests
+        # only on request, as it means reading all of them
+        self.verify_payload = bool(os.getenv("PKGLINT_VERIFY_PAYLOAD"))
         solaris_ver = os.getenv("SOLARIS_VERSION", "")
+        # number of concurrent jobs for checks which can run in parallel
+        self.jobs = int(os.getenv("PKGLINT_JOBS", "0")) or os.cpu_count() or 1
         #
         # These lists are used to check if a 32/64-bit binary
         # is in a proper 32/64-bit directory.
@@ -148,11 +233,42 @@ class UserlandActionChecker(base.ActionChecker):
             re.compile(r"^/usr/lib/xorg/modules/(drivers|extensions|input)$")
             # Xorg path
         ]
+        #
+        # Directories the runtime linker searches for libraries after
+        # RUNPATH (see ld.so.1(1)).
+        #
+        self.default_libdirs = {
+            32: ["lib", "usr/lib"],
+            64: ["lib/64", "usr/lib/64"],
+        }
         self.initscript_re = re.compile(r"^etc/(rc.|init)\.d")
         self.smf_manifest_re = re.compile(r"^lib/svc/manifest/.*\.xml$")
-
-        self.lint_paths = {}
-        self.ref_paths = {}
+        # all of the path rules above, evaluated at once for each path
+        self.classifier = PathClassifier(
+            self.allowed_paths, self.initscript_re, self.smf_manifest_re,
+            self.pathlist32, self.pathlist64)
+
+        # FMRIs are shared, so that paths of both tables can be merged
+        self.fmris = FmriTable()
+        self.lint_paths = PathTable(self.fmris)
+        self.ref_paths = PathTable(self.fmris)
+        # sorted index of ref_paths keys, built at the end of startup()
+        self.ref_index = PrefixIndex()
+        # directories of libraries in ref_paths, built at the end of startup()
+        self.library_index = LibraryIndex()
+        # resolver of links within ref_paths, set at the end of startup()
+        self.link_resolver = LinkResolver(self.ref_paths)
+        # path -> conflicting actions delivering it, see delivery_conflicts()
+        self.conflicts = {}
+        # (runpath, ELF class, variants) -> findings, see __elf_runpath_check()
+        self.__runpath_verdicts = {}
+        # metadata of proto area ELF objects, shared by all ELF checks
+        self.elf_cache = ElfCache(None, self.__inspect_elf)
+        self.smf_validator = SmfValidator(jobs=self.jobs)
+        # digests of proto area files, see payload_check()
+        self.digest_cache = DigestCache(None)
+        # set in the incremental mode, see check()
+        self.session = None
 
         super(UserlandActionChecker, self).__init__(config)
 
@@ -164,77 +280,437 @@ class UserlandActionChecker(base.ActionChecker):
         be made common.
         """
 
-        def seed_dict(mf, attr, dic, atype=None, verbose=False):
-            """Updates a dictionary of { attr: [(fmri, action), ..]}
-            where attr is the value of that attribute from
-            actions of a given type atype, in the given
-            manifest."""
+        # results memoized for the reference paths of the previous run
+        self.__runpath_verdicts.clear()
 
-            pkg_vars = mf.get_all_variants()
+        seeding = time.monotonic()
+        with instrument.phase("userland.startup.lint_fmris"):
+            lint_fmris, lint_repo, local_manifests, mapped = \
+                self.__read_lint_manifests(engine)
 
-            if atype:
-                mfg = (a for a in mf.gen_actions_by_type(atype))
-            else:
-                mfg = (a for a in mf.gen_actions())
+        cache_dir = self.__cache_dir(engine)
+        store = self.__open_caches(engine, cache_dir)
 
-            for action in mfg:
-                if atype and action.name != atype:
-                    continue
-                if attr not in action.attrs:
-                    continue
+        warm = None
+        if mapped is not None:
+            engine.logger.debug(_("Using shared reference action paths."))
+        else:
+            engine.logger.debug(_("Seeding reference action path dictionaries."))
+            with instrument.phase("userland.startup.seed_ref"):
+                state = self.__catalog_state(engine.ref_api_inst, engine.release)
+                warm = self.__seed_ref(engine, cache_dir, state, lint_fmris)
 
-                variants = action.get_variant_template()
-                variants.merge_unknown(pkg_vars)
-                # Action attributes must be lists or strings.
-                for k, v in variants.items():
-                    if isinstance(v, set):
-                        action.attrs[k] = list(v)
-                    else:
-                        action.attrs[k] = v
+        linted = self.__seed_lint(engine, lint_repo, local_manifests)
+
+        engine.logger.debug(
+            _("Seeded {0} reference and {1} lint paths in {2:.2f} seconds.").format(
+                len(self.ref_paths), len(self.lint_paths), time.monotonic() - seeding))
+
+        # the shared reference paths were merged with paths of all shards
+        if mapped is not None:
+            context = bytes.fromhex(mapped.meta["context"])
+        else:
+            context = self.__lint_context(engine, state)
 
-                p = action.attrs[attr]
-                dic.setdefault(p, []).append((mf.fmri, action))
+        if store is not None:
+            with instrument.phase("userland.startup.manifest_keys"):
+                for manifest in linted:
+                    store.keys[str(manifest.fmri)] = \
+                        self.__manifest_key(manifest, context)
+
+        self.__index_ref(engine, mapped, warm, context)
+        self.__prefetch_proto(engine, linted, store)
+
+    def __read_lint_manifests(self, engine):
+        """Returns { package name: [FMRI, ..] } of all linted packages,
+        [(manifest, actions delivering paths)] of the lint repository,
+        local manifests whose paths are to be seeded and the shared
+        reference paths (MappedPathTable) if they are to be used."""
 
         # construct a set of FMRIs being presented for linting, and
         # avoid seeding the reference dictionary with any for which
         # we're delivering new packages.
         lint_fmris = {}
-        for m in engine.gen_manifests(
-                engine.lint_api_inst, release=engine.release, pattern=engine.pattern):
+        # manifests of the lint repository with their actions delivering
+        # paths; the repository is walked only once
+        lint_repo = []
+        mapped = None
+        local_manifests = engine.lint_manifests
+        if self.shared_index and self.shard_manifests:
+            # Seeding merges variants of the manifests into their actions,
+            # which checks of this shard rely on just like in a single run,
+            # so manifests of this shard are seeded from the engine and only
+            # those of other shards are read here.
+            own = {str(m.fmri) for m in engine.lint_manifests}
+            local_manifests = list(engine.lint_manifests) + [
+                m for m in read_manifests(self.shard_manifests)
+                if str(m.fmri) not in own]
+        elif self.shared_index:
+            try:
+                mapped = MappedPathTable(self.shared_index)
+            except (OSError, ValueError) as err:
+                engine.logger.debug(
+                    _("Cannot map shared reference paths: {0}").format(err))
+
+        # we provide a search pattern, to allow users to lint a
+        # subset of the packages in the lint_repository
+        for m, actions in pipelined(
+                engine.gen_manifests(engine.lint_api_inst, release=engine.release,
+                                     pattern=engine.pattern),
+                lambda mf: list(gen_attr_actions(mf, "path")), self.jobs):
             lint_fmris.setdefault(m.fmri.get_name(), []).append(m.fmri)
-        for m in engine.lint_manifests:
+            lint_repo.append((m, actions))
+        for m in local_manifests:
             lint_fmris.setdefault(m.fmri.get_name(), []).append(m.fmri)
 
-        engine.logger.debug(_("Seeding reference action path dictionaries."))
+        return lint_fmris, lint_repo, local_manifests, mapped
+
+    def __open_caches(self, engine, cache_dir):
+        """Sets up caches kept in the cache directory, if there is one;
+        returns FindingStore in the incremental mode, None otherwise."""
+        if cache_dir is not None:
+            self.elf_cache = ElfCache(
+                os.path.join(cache_dir, self.elf_cache_name), self.__inspect_elf)
+            self.smf_validator = SmfValidator(
+                os.path.join(cache_dir, self.smf_cache_name), self.jobs)
+            self.digest_cache = DigestCache(
+                os.path.join(cache_dir, self.digest_cache_name))
+
+        store = None
+        FindingStore.reset()
+        if os.getenv("PKGLINT_INCREMENTAL"):
+            if cache_dir is None:
+                engine.logger.debug(
+                    _("Incremental mode needs a cache directory, ignored."))
+            else:
+                store = FindingStore.shared(
+                    os.path.join(cache_dir, self.findings_cache_name))
+                self.session = Session(store, self.name)
+        return store
+
+    def __seed_ref(self, engine, cache_dir, state, lint_fmris):
+        """Seeds ref_paths with paths of reference packages, except older
+        versions of linted packages; returns WarmPaths they were copied
+        from, if any."""
+
+        # A pkglint daemon keeps reference paths seeded by previous
+        # runs in memory, until the reference catalog changes.
+        warm = None
+        if WarmPaths.enabled and state is not None:
+            warm = WarmPaths.shared(state)
+
+        if warm is not None:
+            engine.logger.debug(_("Using reference action paths kept in memory."))
+            fmris = warm.fmris
+        else:
+            fmris, fragments = self.__ref_fragments(engine, cache_dir, state)
+            if WarmPaths.enabled and state is not None:
+                warm = WarmPaths.keep(state, fmris, fragments)
+
+        def superseded(fmri):
+            """Returns True if fmri is an older version of a package
+            being linted."""
+            return any(
+                lint_fmri_successor(lfmri, fmri)
+                for lfmri in lint_fmris.get(fmri.get_name(), []))
+
+        # Only put manifests into the reference dictionary if they are
+        # not an older version of the same package.
+        if warm is not None:
+            self.__superseded = [
+                key for key, fmri in fmris.items() if superseded(fmri)]
+            self.ref_paths = warm.copy(self.__superseded)
+            # lint paths are merged into the copy, see __merge_dict()
+            self.fmris = self.ref_paths.fmris
+            self.lint_paths = PathTable(self.fmris)
+        else:
+            # each fragment is released once seeded; with a large
+            # reference repository, they take more memory than
+            # the seeded paths
+            for key in list(fragments):
+                fragment = fragments.pop(key)
+                if not superseded(fmris[key]):
+                    self.ref_paths.seed(fmris[key], fragment)
+            self.ref_paths.freeze()
+        return warm
+
+    def __ref_fragments(self, engine, cache_dir, state):
+        """Returns { FMRI string: FMRI } and { FMRI string: fragment } of
+        all reference packages (see RefPathCache)."""
+
+        # Reference paths are seeded from per-package fragments, which
+        # are kept in a persistent cache between runs. As long as the
+        # reference catalog doesn't change, the reference repository is
+        # not walked at all; when it does, only new packages need to be
+        # seeded.
+        cache = None
+        if cache_dir is not None and engine.ref_api_inst is not None:
+            cache = RefPathCache(os.path.join(cache_dir, self.ref_cache_name))
+            cache.load()
+
+        if cache is not None and state is not None and cache.state == state:
+            engine.logger.debug(_("Using cached reference action paths."))
+            fragments = cache.fragments
+            fmris = {key: pkg.fmri.PkgFmri(key) for key in fragments}
+            return fmris, fragments
+
+        known = cache.fragments if cache is not None else {}
+
+        def ref_fragment(item):
+            manifest = item[1]
+            return RefPathCache.fragment(
+                (a.name, a.attrs) for a in gen_attr_actions(manifest, "path"))
+
+        # Only manifests of packages which were not cached are
+        # retrieved; packages gone from the catalog are dropped.
+        # Without a catalog listing (or a cache to update), the
+        # whole reference repository is walked.
+        catalog = None
+        if known and engine.release is None:
+            catalog = self.__catalog_fmris(engine.ref_api_inst)
+        if catalog is not None:
+            fmris = catalog
+            fragments = {key: known[key] for key in catalog if key in known}
+            engine.logger.debug(
+                _("Updating {0} cached reference packages with {1} "
+                  "new ones.").format(
+                    len(fragments), len(catalog) - len(fragments)))
+            manifests = (
+                (key, engine.ref_api_inst.get_manifest(fmri, all_variants=True))
+                for key, fmri in catalog.items() if key not in known)
+        else:
+            fmris = {}
+            fragments = {}
+            manifests = (
+                (str(manifest.fmri), manifest)
+                for manifest in engine.gen_manifests(
+                    engine.ref_api_inst, release=engine.release))
+
+        # manifests are retrieved ahead of turning them into
+        # fragments, see pipelined()
+        for (key, manifest), fragment in pipelined(
+                manifests, ref_fragment, self.jobs):
+            fmris[key] = manifest.fmri
+            fragments[key] = fragment
+        if cache is not None and state is not None:
+            try:
+                cache.save(state, fragments)
+            except OSError as err:
+                engine.logger.debug(
+                    _("Cannot save reference path cache: {0}").format(err))
+        return fmris, fragments
 
-        for manifest in engine.gen_manifests(
-                engine.ref_api_inst, release=engine.release):
-            # Only put this manifest into the reference dictionary
-            # if it's not an older version of the same package.
-            if not any(
-                    lint_fmri_successor(fmri, manifest.fmri)
-                    for fmri in lint_fmris.get(manifest.fmri.get_name(), [])):
-                seed_dict(manifest, "path", self.ref_paths)
+    def __seed_lint(self, engine, lint_repo, local_manifests):
+        """Seeds lint_paths with paths of linted packages; returns their
+        manifests."""
 
         engine.logger.debug(_("Seeding lint action path dictionaries."))
 
-        # we provide a search pattern, to allow users to lint a
-        # subset of the packages in the lint_repository
-        for manifest in engine.gen_manifests(
-                engine.lint_api_inst, release=engine.release, pattern=engine.pattern):
-            seed_dict(manifest, "path", self.lint_paths)
+        # manifests to be linted
+        linted = []
+
+        with instrument.phase("userland.startup.seed_lint"):
+            for manifest, actions in lint_repo:
+                fmri_id = self.lint_paths.fmris.intern(manifest.fmri)
+                for action in actions:
+                    self.lint_paths.add(
+                        action.attrs["path"], fmri_id, action.name, action.attrs)
+                linted.append(manifest)
 
         engine.logger.debug(_("Seeding local action path dictionaries."))
 
-        for manifest in engine.lint_manifests:
-            seed_dict(manifest, "path", self.lint_paths)
+        with instrument.phase("userland.startup.seed_local"):
+            for manifest in local_manifests:
+                fmri_id = self.lint_paths.fmris.intern(manifest.fmri)
+                for action in gen_attr_actions(manifest, "path"):
+                    self.lint_paths.add(
+                        action.attrs["path"], fmri_id, action.name, action.attrs)
+            linted.extend(engine.lint_manifests)
+            self.lint_paths.freeze()
+
+        return linted
+
+    def __index_ref(self, engine, mapped, warm, context):
+        """Merges lint paths into the reference paths and builds the
+        lookup structures of the merged paths. The indexes of reference
+        paths kept in memory (warm) are built only once, and only lint
+        paths are indexed for each run."""
+
+        if mapped is not None:
+            self.ref_paths = self.ref_index = mapped
+        else:
+            with instrument.phase("userland.startup.merge"):
+                self.__merge_dict(
+                    self.lint_paths, self.ref_paths, ignore_pubs=engine.ignore_pubs)
+
+            # Links and runpaths may point to directories which have no action
+            # of their own; build an index to find out whether anything is
+            # delivered underneath them without scanning all reference paths.
+            with instrument.phase("userland.startup.ref_index"):
+                if warm is not None:
+                    # paths only packages left out of the copy delivered
+                    # are removed from the kept ones
+                    changed = itertools.chain(self.lint_paths, *(
+                        warm.paths[key] for key in self.__superseded))
+                    self.ref_index = PrefixOverlay(
+                        warm.index(PrefixIndex), changed, self.ref_paths)
+                else:
+                    self.ref_index = PrefixIndex(self.ref_paths)
+
+            # Other shards wait for the shared reference paths, so they are
+            # published before any work on the proto area of this shard.
+            if self.shared_index and self.shard_manifests:
+                with instrument.phase("userland.startup.publish"):
+                    try:
+                        publish(self.shared_index, self.ref_paths,
+                                {"context": context.hex()})
+                    except OSError as err:
+                        engine.logger.debug(
+                            _("Cannot publish shared reference paths: {0}").format(err))
+
+        self.link_resolver = LinkResolver(self.ref_paths)
+
+        # Paths the linted packages deliver in a way conflicting with other
+        # packages are found at once in the merged reference paths.
+        with instrument.phase("userland.startup.conflicts"):
+            self.conflicts = find_conflicts(self.ref_paths, self.lint_paths)
+
+        # Libraries ELF objects depend on are looked up by their name, see
+        # needed_libraries(); only needed when there are ELF objects to check.
+        if self.proto is not None:
+            with instrument.phase("userland.startup.library_index"):
+                if warm is not None:
+                    self.library_index = LibraryOverlay(
+                        warm.index(LibraryIndex), self.lint_paths)
+                else:
+                    self.library_index = LibraryIndex(self.ref_paths)
+
+    def __prefetch_proto(self, engine, linted, store):
+        """Inspects all proto area files delivered by linted manifests at
+        once, in parallel, rather than one by one in the checks."""
+
+        # proto area files delivered by lint manifests, see
+        # __queue_proto_checks(); there is nothing to check in manifests
+        # whose findings will be replayed
+        elf_files = []
+        payload_files = []
+        for manifest in linted:
+            if store is None or store.findings(manifest, self.name) is None:
+                self.__queue_proto_checks(manifest, elf_files, payload_files)
+
+        # All proto area files to be checked are known now; inspect ELF
+        # objects, hash payload and validate SMF manifests at once, in
+        # parallel, rather than one by one in file_action, payload_check
+        # and smf_manifest.
+        engine.logger.debug(_("Inspecting proto area ELF objects."))
+        with instrument.phase("userland.startup.inspect_elf"):
+            self.elf_cache.prefetch(elf_files, self.jobs)
+        if payload_files:
+            engine.logger.debug(_("Hashing proto area files."))
+            with instrument.phase("userland.startup.hash_payload"):
+                self.digest_cache.prefetch(payload_files, self.jobs)
+        engine.logger.debug(_("Validating SMF manifests."))
+        with instrument.phase("userland.startup.validate_smf"):
+            self.smf_validator.run()
+
+    def shutdown(self, engine):
+        """Persist data which can be reused by the next pkglint run."""
+        try:
+            self.elf_cache.save()
+            self.smf_validator.save()
+            self.digest_cache.save()
+            if self.session is not None:
+                self.session.finish()
+                self.session.store.save()
+        except OSError as err:
+            engine.logger.debug(_("Cannot save pkglint caches: {0}").format(err))
+
+    def check(self, action, manifest, engine):
+        """Runs checks routed to given action. In the incremental mode,
+        findings of manifests which didn't change are replayed instead."""
+        if self.session is None:
+            super(UserlandActionChecker, self).check(action, manifest, engine)
+            return
 
-        self.__merge_dict(
-            self.lint_paths, self.ref_paths, ignore_pubs=engine.ignore_pubs)
+        self.session.run(manifest, engine, lambda eng: super(
+            UserlandActionChecker, self).check(action, manifest, eng))
+
+    def __cache_dir(self, engine):
+        """Directory for data persisted between pkglint runs. It is the
+        pkglint cache directory (-c) unless PKGLINT_CACHE_DIR is set."""
+        return os.getenv("PKGLINT_CACHE_DIR", getattr(engine, "basedir", None))
+
+    def __lint_context(self, engine, ref_state):
+        """Returns digest of everything but the manifest itself the
+        findings of Userland checks depend on: the extension modules,
+        pkglint configuration, environment, reference catalog state and
+        paths delivered by all lint manifests."""
+        package = os.path.dirname(os.path.abspath(__file__))
+        modules = []
+        for name in sorted(os.listdir(package)):
+            if name.endswith(".py"):
+                st = os.stat(os.path.join(package, name))
+                modules.append((name, st.st_mtime_ns, st.st_size))
+        # pkglintrc, including parameters of the checks and excluded checks
+        settings = [(section, sorted(engine.conf.items(section, raw=True)))
+                    for section in engine.conf.sections()]
+        lint_paths = [
+            (path, [(entry.name, entry.target, entry.variants, entry.attrs)
+                    for entry in entries])
+            for path, entries in sorted(self.lint_paths.items())]
+        context = (FindingStore.VERSION, modules, settings, engine.ignore_pubs,
+                   platform.processor(), self.proto_path,
+                   os.getenv("SOLARIS_VERSION"), ref_state, self.verify_payload,
+                   lint_paths)
+        return hashlib.sha256(repr(context).encode()).digest()
+
+    def __manifest_key(self, manifest, context):
+        """Returns key of findings of given manifest, a digest of the
+        context, its actions and proto area files they deliver."""
+        digest = hashlib.sha256(context)
+        digest.update(str(manifest.fmri).encode())
+        for action in manifest.gen_actions():
+            digest.update(str(action).encode())
+            if self.proto is not None and \
+                    action.name in ["file", "link", "hardlink"]:
+                path = self.__proto_relpath(action)
+                locations = [self.proto.locate(path)]
+                # SMF manifests are validated in the last proto area
+                if self.classifier.classify(action.attrs["path"]).smf_manifest:
+                    locations.append(self.proto.locate_last(path))
+                for location in locations:
+                    if location is not None:
+                        digest.update(repr(StatCache.signature(location[1])).encode())
+            digest.update(b"\n")
+        return digest.hexdigest()
+
+    def __catalog_state(self, api_inst, release):
+        """Returns a value identifying the current state of the catalogs
+        of the given image, or None when it cannot be determined."""
+        if api_inst is None:
+            return None
+
+        state = [str(release)]
+        for pub in api_inst.get_publishers():
+            catalog = pub.catalog
+            state.append((pub.prefix, str(catalog.last_modified),
+                          catalog.package_version_count))
+        return tuple(state)
+
+    def __catalog_fmris(self, api_inst):
+        """Returns { FMRI string: FMRI } of the newest packages in the
+        catalogs of the given image, which gen_manifests() walks when
+        there is no release, or None when they cannot be listed."""
+        try:
+            return {str(item[0]): item[0] for item in api_inst.get_pkg_list(
+                pkg.client.api.ImageInterface.LIST_NEWEST, variants=True,
+                return_fmris=True)}
+        except pkg.client.api_errors.ApiException:
+            return None
 
     def __merge_dict(self, src, target, ignore_pubs=True):
-        """Merges the given src dictionary into the target
-        dictionary, giving us the target content as it would appear,
+        """Merges the given src PathTable into the target
+        PathTable, giving us the target content as it would appear,
         were the packages in src to get published to the
         repositories that made up target.
 
@@ -242,41 +718,66 @@ class UserlandActionChecker(base.ActionChecker):
         version from the src dictionary into the target dictionary.
         If the src dictionary contains a package with no version
         information, it is assumed to be more recent than the same
-        package with no version in the target."""
+        package with no version in the target.
 
-        for p in src:
+        Both tables have to share their FmriTable."""
+
+        fmris = target.fmris
+
+        def build_dic(entries):
+            """Builds a dictionary of fmri index:entries"""
+            dic = {}
+            for entry in entries:
+                if entry.fmri in dic:
+                    dic[entry.fmri].append(entry)
+                else:
+                    dic[entry.fmri] = [entry]
+            return dic
+
+        # Whether one package supersedes another doesn't depend on the
+        # path both of them deliver, so each decision is made only once
+        # for the whole merge. Packages with a different stem are never
+        # successors of each other, and so are not compared at all.
+        successors = {}
+        names = {}
+
+        def name(fmri_id):
+            if fmri_id not in names:
+                names[fmri_id] = fmris[fmri_id].get_name()
+            return names[fmri_id]
+
+        def superseded(targ_id, src_stems):
+            """Returns True if targ_id is older than any of the src
+            packages with the same stem."""
+            for src_id in src_stems.get(name(targ_id), ()):
+                key = (src_id, targ_id)
+                if key not in successors:
+                    successors[key] = lint_fmri_successor(
+                        fmris[src_id], fmris[targ_id], ignore_pubs=ignore_pubs)
+                if successors[key]:
+                    return True
+            return False
+
+        for p, src_entries in src.items():
             if p not in target:
-                target[p] = src[p]
+                target[p] = src_entries
                 continue
 
-            def build_dic(arr):
-                """Builds a dictionary of fmri:action entries"""
-                dic = {}
-                for pfmri, action in arr:
-                    if pfmri in dic:
-                        dic[pfmri].append(action)
-                    else:
-                        dic[pfmri] = [action]
-                return dic
-
-            src_dic = build_dic(src[p])
+            src_dic = build_dic(src_entries)
             targ_dic = build_dic(target[p])
 
-            for src_pfmri in src_dic:
-                # we want to remove entries deemed older than
-                # src_pfmri from targ_dic.
-                for targ_pfmri in targ_dic.copy():
-                    sname = src_pfmri.get_name()
-                    tname = targ_pfmri.get_name()
-                    if lint_fmri_successor(
-                            src_pfmri, targ_pfmri, ignore_pubs=ignore_pubs):
-                        targ_dic.pop(targ_pfmri)
+            src_stems = {}
+            for src_id in src_dic:
+                src_stems.setdefault(name(src_id), []).append(src_id)
+
+            # we want to remove entries deemed older than
+            # any src package from targ_dic.
+            for targ_id in list(targ_dic):
+                if superseded(targ_id, src_stems):
+                    targ_dic.pop(targ_id)
             targ_dic.update(src_dic)
-            l = []
-            for pfmri in targ_dic:
-                for action in targ_dic[pfmri]:
-                    l.append((pfmri, action))
-            target[p] = l
+            target[p] = [entry for entries in targ_dic.values()
+                         for entry in entries]
 
     def __realpath(self, path, target):
         """Combine path and target to get the real path."""
@@ -293,39 +794,94 @@ class UserlandActionChecker(base.ActionChecker):
 
         return result
 
-    def __elf_aslr_check(self, path, engine, _pkglint_id):
-        """Verify that given executable binary is ASLR tagged and enabled."""
+    def __proto_relpath(self, action):
+        """Returns path of file delivered by given action within the
+        prototype area."""
+        path = action.hash
+        if path is None or path == "NOHASH":
+            path = action.attrs["path"]
+        # published manifests have the payload digest there instead, which
+        # is only expected when verifying payload (see payload_check())
+        elif self.verify_payload and is_digest(path):
+            path = action.attrs["path"]
+        return path
+
+    def __inspect_elf(self, path):
+        """Returns ElfRecord with everything ELF checks need to know about
+        given file, or None if it is not an ELF object."""
+        try:
+            return read_elf(path)
+        except ElfError:
+            # let the system tools deal with whatever we cannot parse
+            return self.__inspect_elf_tools(path)
+
+    def __inspect_elf_tools(self, path):
+        """Same as __inspect_elf(), but using pkg.elf and elfedit(1), which
+        is much slower as elfedit has to be run for every executable."""
+        if not elf.is_elf_object(path):
+            return None
+
         elfinfo = elf.get_info(path)
-        if elfinfo["type"] != "exe" and elfinfo["type"] != "pie":
-            return
+        dyninfo = elf.get_dynamic(path)
 
-        # get the ASLR tag string for this binary
-        res = subprocess.run(
-            ["/usr/bin/elfedit", "-r", "-e", "dyn:sunw_aslr", path],
-            capture_output=True)
+        aslr = None
+        if elfinfo["type"] == "exe" or elfinfo["type"] == "pie":
+            # get the ASLR tag string for this binary
+            res = subprocess.run(
+                ["/usr/bin/elfedit", "-r", "-e", "dyn:sunw_aslr", path],
+                capture_output=True)
+            # look for "ENABLE" anywhere in the string
+            if res.returncode == 0:
+                aslr = b"ENABLE" in res.stdout
+
+        return ElfRecord(bits=elfinfo["bits"], type=elfinfo["type"],
+                         runpath=dyninfo.get("runpath", ""), aslr=aslr,
+                         pie=elfinfo["type"] == "pie",
+                         needed=tuple(dep[0] for dep in dyninfo.get("deps", [])))
+
+    def __elf_aslr_check(self, path, record, engine, _pkglint_id):
+        """Verify that given executable binary is ASLR tagged and enabled."""
+        if record.type != "exe" and record.type != "pie":
+            return
 
         # No ASLR tag was found; everything must be tagged
-        if res.returncode != 0:
+        if record.aslr is None:
             engine.error(f"'{path}' is not tagged for aslr",
                          msgid=f"{self.name}{_pkglint_id}.5")
 
-        # look for "ENABLE" anywhere in the string;
         # warn about binaries which are not ASLR enabled
-        elif b"ENABLE" not in res.stdout:
+        elif not record.aslr:
             engine.warning(f"'{path}' does not have aslr enabled",
                            msgid=f"{self.name}{_pkglint_id}.6")
 
-        if elfinfo["type"] != "pie":
+        if not record.pie:
             engine.error(f"'{path}' is not PIE compiled",
                            msgid=f"{self.name}{_pkglint_id}.PIE")
 
-    def __elf_runpath_check(self, path, engine, _pkglint_id):
-        """Verify that RUNPATH of given binary is correct."""
+    def __elf_runpath_check(self, path, record, variants, engine, _pkglint_id):
+        """Verify that RUNPATH of given binary, delivered with given
+        variants (see variant_key()), is correct.
+
+        Findings depend only on the RUNPATH, ELF class and variants, so
+        they are found only once for binaries sharing all of them."""
+        key = (record.runpath, record.bits, variants)
+        verdict = self.__runpath_verdicts.get(key)
+        if verdict is None:
+            verdict = self.__runpath_verdicts[key] = self.__runpath_verdict(
+                record.runpath, record.bits, variants)
+
+        for level, before, after in verdict:
+            getattr(engine, level)(before + path + after,
+                                   msgid=f"{self.name}{_pkglint_id}.3")
+
+    def __runpath_verdict(self, runpath_str, bits, variants):
+        """Returns findings about binaries with given RUNPATH, ELF class
+        and variants as a tuple of (level, message before binary path,
+        message after it)."""
+        findings = []
         runpath_list = []
 
-        dyninfo = elf.get_dynamic(path)
-        elfinfo = elf.get_info(path)
-        for runpath in dyninfo.get("runpath", "").split(":"):
+        for runpath in runpath_str.split(":"):
             if not runpath:
                 continue
 
@@ -352,8 +908,8 @@ class UserlandActionChecker(base.ActionChecker):
                 # to a directory that has no action because it uses
                 # the default attributes.
                 relative_dir = runpath.strip("/")
-                if relative_dir not in self.ref_paths and not any(
-                        key.startswith(relative_dir + "/") for key in self.ref_paths):
+                if not self.ref_paths.select(relative_dir, variants) and \
+                        not self.ref_index.has_descendant(relative_dir):
 
                     # If still no match, if the runpath contains
                     # an embedded symlink, emit a warning; it may or may
@@ -363,62 +919,50 @@ class UserlandActionChecker(base.ActionChecker):
                     # Otherwise, runpath is bad; add it to list.
                     pdir = os.path.dirname(relative_dir)
                     while pdir != "":
-                        if pdir in self.ref_paths and self.ref_paths[pdir][0][1].name == "link":
-                            engine.warning(
-                                f"runpath '{runpath}' in '{path}' not found in reference "
-                                f"paths but contains symlink at '{pdir}'",
-                                msgid=f"{self.name}{_pkglint_id}.3")
+                        entries = self.ref_paths.select(pdir, variants)
+                        if entries and entries[0].name == "link":
+                            findings.append((
+                                "warning", f"runpath '{runpath}' in '",
+                                f"' not found in reference paths but contains "
+                                f"symlink at '{pdir}'"))
                             break
                         pdir = os.path.dirname(pdir)
                     else:
                         runpath_list.append(runpath)
 
-            if elfinfo["bits"] == 32:
+            if bits == 32:
                 for expr in self.runpath_64_re:
                     if expr.search(runpath):
-                        engine.warning(
-                            f"64-bit runpath in 32-bit binary, '{path}' includes '{runpath}'",
-                            msgid=f"{self.name}{_pkglint_id}.3")
+                        findings.append((
+                            "warning", "64-bit runpath in 32-bit binary, '",
+                            f"' includes '{runpath}'"))
             else:
                 for expr in self.runpath_64_re:
                     if expr.search(runpath):
                         break
                 else:
-                    engine.warning(
-                        f"32-bit runpath in 64-bit binary, '{path}' includes '{runpath}'",
-                        msgid=f"{self.name}{_pkglint_id}.3")
+                    findings.append((
+                        "warning", "32-bit runpath in 64-bit binary, '",
+                        f"' includes '{runpath}'"))
 
         # handle all incorrect RUNPATHs in a single error
         if runpath_list:
-            engine.error(
-                f"bad RUNPATH, '{path}' includes '{':'.join(runpath_list)}'",
-                msgid=f"{self.name}{_pkglint_id}.3")
+            findings.append((
+                "error", "bad RUNPATH, '", f"' includes '{':'.join(runpath_list)}'"))
+
+        return tuple(findings)
 
-    def __elf_location_check(self, path, inspath, engine, _pkglint_id):
+    def __elf_location_check(self, record, inspath, engine, _pkglint_id):
         """Make sure that file is placed within correct 32/64 directory."""
-        elfinfo = elf.get_info(path)
-        bits = elfinfo["bits"]
-        elftype = elfinfo["type"]
-        elems = os.path.dirname(inspath).split("/")
-
-        path32 = False
-        path64 = False
-
-        # Walk through the path elements backward and at the first
-        # 32/64 bit specific element, flag it and break.
-        for part in elems[::-1]:
-            if part in self.pathlist32:
-                path32 = True
-                break
-            if part in self.pathlist64:
-                path64 = True
-                break
+        bits = record.bits
+        elftype = record.type
 
-        # The Xorg module directory is a hybrid case - everything
-        # but the dri subdirectory is 64-bit
-        dirname = os.path.dirname(inspath)
-        if dirname.startswith("usr/lib/xorg/modules") and dirname != "usr/lib/xorg/modules/dri":
-            path64 = True
+        # the closest 32/64 bit specific path element decides, except for
+        # the Xorg module directory (see PathClassifier)
+        pathclass = self.classifier.classify(inspath)
+        path32 = pathclass.path32
+        path64 = pathclass.path64
+        elems = pathclass.dirparts
 
         # ignore 64-bit executables in normal (non-32-bit-specific)
         # locations, that's ok now.
@@ -432,19 +976,15 @@ class UserlandActionChecker(base.ActionChecker):
             engine.error(f"64-bit object '{inspath}' in 32-bit path",
                          msgid=f"{self.name}{_pkglint_id}.2")
 
+    @handles("file")
     def file_action(self, action, manifest, engine, pkglint_id="001"):
         """Various file checks."""
 
-        if action.name not in ["file"]:
-            return
-
         # path to the delivered file
         inspath = action.attrs["path"]
 
         # path to the file within the prototype area
-        path = action.hash
-        if path is None or path == "NOHASH":
-            path = inspath
+        path = self.__proto_relpath(action)
 
         # verify that preserve attribute is correctly used when
         # file is writable and not in other cases
@@ -466,33 +1006,68 @@ class UserlandActionChecker(base.ActionChecker):
                          msgid=f"{self.name}{pkglint_id}.3")
 
         # checks that require a physical file to look at
-        if self.proto_path is not None:
-            for directory in self.proto_path:
-                fullpath = directory + "/" + path
-
-                if os.path.exists(fullpath):
-                    break
+        if self.proto is not None:
+            location = self.proto.locate(path)
 
-            if not os.path.exists(fullpath):
+            if location is None:
                 engine.info(
                     f"{path} missing from proto area, skipping content checks",
                     msgid=f"{self.name}{pkglint_id}.1")
-            elif elf.is_elf_object(fullpath):
+            else:
+                fullpath, st = location
+                record = self.elf_cache.get(fullpath, st)
+                if record is None:
+                    # not an ELF object
+                    return
                 # 32/64 bit in wrong place
-                self.__elf_location_check(fullpath, inspath, engine, pkglint_id)
+                self.__elf_location_check(record, inspath, engine, pkglint_id)
                 # verify that correct RUNPATH is present
-                self.__elf_runpath_check(fullpath, engine, pkglint_id)
+                self.__elf_runpath_check(
+                    fullpath, record, variant_key(action.attrs), engine, pkglint_id)
                 # verify that ASLR is enabled when appropriate
-                self.__elf_aslr_check(fullpath, engine, pkglint_id)
+                self.__elf_aslr_check(fullpath, record, engine, pkglint_id)
 
     file_action.pkglint_desc = "Paths should exist in the proto area."
 
-    def link_resolves(self, action, manifest, engine, pkglint_id="002"):
-        """Checks for link resolution."""
+    @handles("file")
+    def payload_check(self, action, manifest, engine, pkglint_id="012"):
+        """Checks that proto area files match the payload digests recorded
+        in published manifests, when enabled by PKGLINT_VERIFY_PAYLOAD."""
 
-        if action.name not in ["link", "hardlink"]:
+        if not self.verify_payload or self.proto is None:
+            return
+
+        expected = expected_digests(action.hash, action.attrs)
+        if not expected:
+            return
+
+        # missing files are reported by file_action
+        location = self.proto.locate(self.__proto_relpath(action))
+        if location is None:
+            return
+
+        fullpath, st = location
+        try:
+            digests = self.digest_cache.get(fullpath, st, list(expected))
+        except OSError as err:
+            engine.error(f"cannot verify payload of {action.attrs['path']}: {err}",
+                         msgid=f"{self.name}{pkglint_id}.1")
             return
 
+        for algorithm, digest in sorted(expected.items()):
+            if digests[algorithm] != digest:
+                engine.error(
+                    f"{fullpath} does not match payload of {action.attrs['path']} "
+                    f"({algorithm} {digests[algorithm]}, expected {digest})",
+                    msgid=f"{self.name}{pkglint_id}.0")
+                break
+
+    payload_check.pkglint_desc = "Proto area files should match published payload."
+
+    @handles("link", "hardlink")
+    def link_resolves(self, action, manifest, engine, pkglint_id="002"):
+        """Checks for link resolution."""
+
         path = action.attrs["path"]
         target = action.attrs["target"]
         realtarget = self.__realpath(path, target)
@@ -501,19 +1076,24 @@ class UserlandActionChecker(base.ActionChecker):
         # resolve outside the packages delivering a particular
         # component.
 
-        # links to files should directly match a patch in the reference
-        # repo.
-        if self.ref_paths.get(realtarget, None):
-            return
+        # Follow the target through links to other links and through
+        # links to directories; circular links never resolve. Links to
+        # files should then match a path in the reference repo, delivered
+        # in the same variants as the link (startup() has merged variants
+        # of the manifest into action attributes).
+        variants = variant_key(action.attrs)
+        resolved = self.link_resolver.resolve(realtarget, variants)
+        if resolved is not None:
+            if self.ref_paths.select(resolved, variants):
+                return
 
-        # If it didn't match a path in the reference repo, it may still
-        # be a link to a directory that has no action because it uses
-        # the default attributes.  Look for a path that starts with
-        # this value plus a trailing slash to be sure this it will be
-        # resolvable on a fully installed system.
-        realtarget += "/"
-        for key in self.ref_paths:
-            if key.startswith(realtarget):
+            # If it didn't match a path in the reference repo, it may still
+            # be a link to a directory that has no action because it uses
+            # the default attributes.  Look for a path that starts with
+            # this value plus a trailing slash to be sure this it will be
+            # resolvable on a fully installed system.
+            if self.ref_index.has_descendant(resolved) or \
+                    self.ref_index.has_descendant(realtarget):
                 return
 
         engine.error(
@@ -522,54 +1102,42 @@ class UserlandActionChecker(base.ActionChecker):
 
     link_resolves.pkglint_desc = "links should resolve."
 
+    @handles("file", "dir", "link", "hardlink")
     def init_script(self, action, manifest, engine, pkglint_id="003"):
         """Checks for SVR4 startup scripts."""
 
-        if action.name not in ["file", "dir", "link", "hardlink"]:
-            return
-
         path = action.attrs["path"]
-        if self.initscript_re.match(path):
+        if self.classifier.classify(path).init_script:
             engine.warning(
                 f"SVR4 startup '{path}', deliver SMF" " service instead",
                 msgid=f"{self.name}{pkglint_id}.0")
 
     init_script.pkglint_desc = "SVR4 startup scripts should not be delivered."
 
+    @handles("file", "dir", "link", "hardlink")
     def delivery_location(self, action, manifest, engine, pkglint_id="004"):
         """Checks if all actions are installed in known locations only."""
 
-        if action.name not in ["file", "dir", "link", "hardlink"]:
-            return
-
         # path to the delivered file
         inspath = action.attrs["path"]
 
-        for expr in self.allowed_paths:
-            if expr.match(inspath):
-                return
-        else:
-            # we didn't match anything
+        if not self.classifier.classify(inspath).allowed:
             engine.error(f"object delivered into non-standard location: {inspath}",
                          msgid=f"{self.name}{pkglint_id}.0")
 
+    @handles("legacy")
     def legacy_action(self, action, manifest, engine, pkglint_id="005"):
         """Checks for deprecated legacy actions."""
 
-        if action.name not in ["legacy"]:
-            return
-
         engine.error("legacy actions are deprecated",
                      msgid=f"{self.name}{pkglint_id}.0")
 
     legacy_action.pkglint_desc = "Legacy actions are deprecated."
 
+    @handles("file")
     def solaris_dep_file(self, action, manifest, engine, pkglint_id="006"):
         """Checks that _solaris_dep file is not being delivered."""
 
-        if action.name != "file":
-            return
-
         inspath = action.attrs["path"]
         if inspath.endswith("_solaris_dep"):
             engine.error("_solaris_dep should not be delivered.",
@@ -577,45 +1145,144 @@ class UserlandActionChecker(base.ActionChecker):
 
     solaris_dep_file.pkglint_desc = "_solaris_dep should not be delivered."
 
-    def smf_manifest(self, action, manifest, engine, pkglint_id="008"):
-        """Checks if SMF manifests are valid, otherwise SMF won't import
-        them when packages are installed."""
+    def __library_dirs(self, inspath, record):
+        """Returns directories the runtime linker searches for libraries
+        needed by given ELF object installed as inspath, or None if some
+        of them cannot be determined."""
+        directories = []
+        for runpath in record.runpath.split(":"):
+            if not runpath:
+                continue
+            for origin in ("$ORIGIN", "${ORIGIN}"):
+                if runpath == origin or runpath.startswith(origin + "/"):
+                    runpath = "/" + os.path.dirname(inspath) + runpath[len(origin):]
+            if "$" in runpath:
+                # other tokens ($ISALIST, $PLATFORM, ..) are not expanded
+                return None
+            directories.append(os.path.normpath(runpath).strip("/"))
+        return directories + self.default_libdirs[record.bits]
+
+    @handles("file")
+    def needed_libraries(self, action, manifest, engine, pkglint_id="010"):
+        """Checks that libraries ELF objects depend on are delivered into
+        directories the runtime linker will search for them."""
+
+        # Without a reference repository, libraries delivered by the system
+        # are unknown and so every library would seem to be missing.
+        if self.proto is None or engine.ref_api_inst is None or \
+                not len(self.library_index):
+            return
+        location = self.proto.locate(self.__proto_relpath(action))
+        if location is None:
+            return
+        record = self.elf_cache.get(*location)
+        if record is None or not record.needed:
+            return
 
-        if action.name not in ["file", "link", "hardlink"]:
+        inspath = action.attrs["path"]
+        directories = self.__library_dirs(inspath, record)
+        if directories is None:
             return
 
+        variants = variant_key(action.attrs)
+        for name in record.needed:
+            # libraries needed by path are not searched for
+            if "/" in name:
+                continue
+            delivered = self.library_index.directories(name)
+            if not any(
+                    resolved in delivered and
+                    self.ref_paths.select(f"{resolved}/{name}", variants)
+                    for resolved in (self.link_resolver.resolve(directory) or directory
+                                     for directory in directories)):
+                engine.warning(
+                    f"{inspath} needs {name}, which is not delivered into any of "
+                    f"its library directories ({':'.join('/' + d for d in directories)})",
+                    msgid=f"{self.name}{pkglint_id}.0")
+
+    needed_libraries.pkglint_desc = "Libraries ELF objects need should be delivered."
+
+    @handles("file", "dir", "link", "hardlink")
+    def delivery_conflicts(self, action, manifest, engine, pkglint_id="011"):
+        """Checks for paths delivered by other packages in a conflicting way."""
+
+        path = action.attrs["path"]
+        conflict = self.conflicts.get(path)
+        if conflict is not None:
+            engine.error(f"{path} is delivered by conflicting actions: {conflict}",
+                         msgid=f"{self.name}{pkglint_id}.0")
+
+    delivery_conflicts.pkglint_desc = "Packages should not deliver conflicting actions."
+
+    def __smf_manifest_location(self, action):
+        """Returns path within the prototype area and full path of a SMF
+        manifest delivered by given action, or None if the action doesn't
+        deliver SMF manifest present in the proto area."""
+
+        if action.name not in ["file", "link", "hardlink"]:
+            return None
+
         # this check requires a physical file to look at
-        if self.proto_path is None:
-            return
+        if self.proto is None:
+            return None
 
         # path to the delivered file
         inspath = action.attrs["path"]
-        if self.smf_manifest_re.match(inspath):
+        if not self.classifier.classify(inspath).smf_manifest:
+            return None
 
-            # path to the file within the prototype area
-            path = action.hash
-            if path is None or path == "NOHASH":
-                path = inspath
+        # path to the file within the prototype area
+        path = self.__proto_relpath(action)
 
-            fullpath = None
-            for proto_path in self.proto_path:
-                check = os.path.join(proto_path, path)
-                if os.path.exists(check):
-                    fullpath = check
+        # unlike other checks, the manifest in the last proto area is
+        # validated
+        location = self.proto.locate_last(path)
+        if location is None:
+            # missing files are handled in another check
+            return None
 
-            if fullpath is None:
-                # missing files are handled in another check
-                return
+        return path, location[0]
 
-            res = subprocess.run(["/usr/sbin/svccfg", "validate", fullpath],
-                                 capture_output=True, text=True)
-            if res.returncode != 0:
-                engine.error(f"SMF manifest {path} is not valid:\n{res.stderr}",
-                             msgid=f"{self.name}{pkglint_id}.0")
+    def __queue_proto_checks(self, manifest, elf_files, payload_files):
+        """Queue SMF manifests delivered by given manifest for validation,
+        add proto area files it delivers to elf_files list and those to be
+        verified by payload_check() to payload_files list."""
+        if self.proto is None:
+            return
+
+        for action in manifest.gen_actions():
+            if action.name == "file":
+                location = self.proto.locate(self.__proto_relpath(action))
+                if location is not None:
+                    elf_files.append(location)
+                    if self.verify_payload:
+                        expected = expected_digests(action.hash, action.attrs)
+                        if expected:
+                            payload_files.append((*location, list(expected)))
+
+            location = self.__smf_manifest_location(action)
+            if location is not None:
+                self.smf_validator.add(location[1])
+
+    @handles("file", "link", "hardlink")
+    def smf_manifest(self, action, manifest, engine, pkglint_id="008"):
+        """Checks if SMF manifests are valid, otherwise SMF won't import
+        them when packages are installed."""
+
+        location = self.__smf_manifest_location(action)
+        if location is None:
+            return
+
+        path, fullpath = location
+        stderr = self.smf_validator.result(fullpath)
+        if stderr is not None:
+            engine.error(f"SMF manifest {path} is not valid:\n{stderr}",
+                         msgid=f"{self.name}{pkglint_id}.0")
 
     smf_manifest.pkglint_desc = "SMF manifests must be valid."
 
 
+    @handles("link", "hardlink")
     def symlink_check(self, action, manifest, engine, pkglint_id="009"):
         """Make sure that symlink and hardlink relative paths do not have too many '..' parts"""
 
@@ -655,6 +1322,38 @@ class UserlandManifestChecker(base.ManifestChecker):
 
     name = "userland.manifest"
 
+    def __init__(self, config):
+        path = os.getenv("PROTO_PATH")
+        # files in the proto areas, shared with UserlandActionChecker
+        self.proto = ProtoIndex.shared(path.split() if path else None)
+        # set in the incremental mode, see check()
+        self.session = None
+        super(UserlandManifestChecker, self).__init__(config)
+
+    def check(self, manifest, engine):
+        """Runs all checks on given manifest. In the incremental mode,
+        findings of manifests which didn't change are replayed instead."""
+        # the findings store is set up by UserlandActionChecker.startup()
+        store = FindingStore.shared()
+        if store is None:
+            super(UserlandManifestChecker, self).check(manifest, engine)
+            return
+
+        if self.session is None or self.session.store is not store:
+            self.session = Session(store, self.name)
+        self.session.run(manifest, engine, lambda eng: super(
+            UserlandManifestChecker, self).check(manifest, eng))
+
+    def shutdown(self, engine):
+        """Stores findings for the incremental mode."""
+        if self.session is None:
+            return
+        try:
+            self.session.finish()
+            self.session.store.save()
+        except OSError as err:
+            engine.logger.debug(_("Cannot save pkglint caches: {0}").format(err))
+
     def component_check(self, manifest, engine, pkglint_id="001"):
         """Make sure that manifests contain license action."""
         if not next(manifest.gen_actions_by_type("file"), False):
@@ -747,23 +1446,17 @@ class UserlandManifestChecker(base.ManifestChecker):
             "311": (3495).to_bytes(2, "little") + b"\r\n",
         }
 
-        def locate_file(path):
-            for proto_path in os.getenv("PROTO_PATH").split():
-                fullpath = os.path.join(proto_path, path)
-                if os.path.exists(fullpath):
-                    return fullpath
-            return None
-
         # Find both files in given proto areas. Both files can be in a different
         # place (due to mangling), which is the reason this is done twice.
-        pyfull = locate_file(pypath)
-        pycfull = locate_file(pycpath)
+        pyloc = self.proto.locate(pypath)
+        pycloc = self.proto.locate(pycpath)
 
-        if pyfull is None or pycfull is None:
+        if pyloc is None or pycloc is None:
             # non-existent files are handled by another check
             return
 
-        st = os.stat(pyfull)
+        st = pyloc[1]
+        pycfull = pycloc[0]
 
         # verify that pyc file is valid
         with open(pycfull, "rb") as ifile:
@@ -829,7 +1522,7 @@ class UserlandManifestChecker(base.ManifestChecker):
         """Make sure that all delivered .pyc files are up-to-date and usable
         by the respective runtime."""
 
-        if not os.getenv("PROTO_PATH"):
+        if self.proto is None:
             # this check require physical files to look at
             return
 
@@ -879,4 +1572,7 @@ class UserlandManifestChecker(base.ManifestChecker):
 
     makefile_ascii_check.pkglint_desc = "manifests are ASCII only."
 
+
+instrument.instrument(UserlandActionChecker, UserlandManifestChecker)
+
 # vim: expandtab sw=4 ts=4
@@ -0,0 +1,268 @@
+#!/usr/bin/python3.9
+#
+# CDDL HEADER START
+#
+# The contents of this file are subject to the terms of the
+# Common Development and Distribution License (the "License").
+# You may not use this file except in compliance with the License.
+#
+# You can obtain a copy of the license at usr/src/OPENSOLARIS.LICENSE
+# or http://www.opensolaris.org/os/licensing.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+#
+# When distributing Covered Code, include this CDDL HEADER in each
+# file and include the License file at usr/src/OPENSOLARIS.LICENSE.
+# If applicable, add the following below this CDDL HEADER, with the
+# fields enclosed by brackets "[]" replaced with your own identifying
+# information: Portions Copyright [yyyy] [name of copyright owner]
+#
+# CDDL HEADER END
+#
+
+#
+# Copyright (c) 2026, Oracle and/or its affiliates.
+#
+
+# Benchmarks for the Userland pkglint check extension (from userland.py).
+#
+# Run as `python3 benchmark.py [benchmark ...]`; all benchmarks are run
+# when none is given.
+
+import argparse
+import os
+import tempfile
+import time
+
+from synthrepo import SynthRepo, config, use_standin
+
+# without pkg(7), benchmarks run on top of the stand-in modules
+STANDIN = use_standin()
+
+import pkg.fmri
+
+from pkg.lint.engine import lint_fmri_successor
+from pkglint.pathtable import FmriTable, PathTable
+from pkglint.lic_pkglint import ExtractLicense, OSNetActionChecker, OSNetManifestChecker
+from pkglint.userland import UserlandActionChecker, UserlandManifestChecker
+
+
+def timed(function, setup=tuple, repeat=3):
+    """Returns the best wall time of several calls of function, each with
+    fresh arguments returned by setup."""
+    best = None
+    for _ in range(repeat):
+        args = setup()
+        start = time.perf_counter()
+        function(*args)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def quadratic_merge_dict(src, target, ignore_pubs=True):
+    """The original implementation of __merge_dict, comparing all
+    packages delivering a path, for each path."""
+
+    for p in src:
+        if p not in target:
+            target[p] = src[p]
+            continue
+
+        def build_dic(arr):
+            dic = {}
+            for pfmri, action in arr:
+                dic.setdefault(pfmri, []).append(action)
+            return dic
+
+        src_dic = build_dic(src[p])
+        targ_dic = build_dic(target[p])
+
+        for src_pfmri in src_dic:
+            for targ_pfmri in targ_dic.copy():
+                if lint_fmri_successor(
+                        src_pfmri, targ_pfmri, ignore_pubs=ignore_pubs):
+                    targ_dic.pop(targ_pfmri)
+        targ_dic.update(src_dic)
+        target[p] = [(pfmri, action)
+                     for pfmri in targ_dic for action in targ_dic[pfmri]]
+
+
+def bench_merge_dict(args):
+    """Merge lint packages into a reference repository, where all versions
+    of several packages deliver the same, large set of paths."""
+
+    def dictionaries():
+        src = {}
+        target = {}
+        for stem in range(args.stems):
+            for version in range(args.versions):
+                fmri = pkg.fmri.PkgFmri(
+                    f"pkg://solaris/bench/pkg{stem}@1.{version},11.4-11.4.0.0.1.{version}.0")
+                for path in range(args.paths):
+                    target.setdefault(f"usr/lib/pkg{path}", []).append((fmri, None))
+            fmri = pkg.fmri.PkgFmri(
+                f"pkg:/bench/pkg{stem}@1.{args.versions},11.4-11.4.0.0.1.0.0")
+            for path in range(args.paths):
+                src.setdefault(f"usr/lib/pkg{path}", []).append((fmri, None))
+        return src, target
+
+    def tables():
+        """The same as dictionaries(), as PathTables."""
+        fmris = FmriTable()
+        src, target = PathTable(fmris), PathTable(fmris)
+        for table, dic in zip((src, target), dictionaries()):
+            for path, entries in dic.items():
+                for fmri, _ in entries:
+                    table.add(path, fmri, None, {})
+        return src, target
+
+    # private methods are name mangled
+    merge = UserlandActionChecker._UserlandActionChecker__merge_dict
+    checker = UserlandActionChecker.__new__(UserlandActionChecker)
+
+    src, target = dictionaries()
+    quadratic_merge_dict(src, target)
+    src, merged = tables()
+    merge(checker, src, merged)
+    expected = {path: [(merged.fmris[e.fmri], e.name) for e in entries]
+                for path, entries in merged.items()}
+    assert target == expected, "merge results differ"
+
+    before = timed(quadratic_merge_dict, dictionaries)
+    after = timed(lambda src, target: merge(checker, src, target), tables)
+    return before, after
+
+
+_synth = None
+
+
+def synthetic_repo(args):
+    """Returns SynthRepo of the size given by args, shared by all the
+    benchmarks below."""
+    global _synth
+    if _synth is None:
+        tmpdir = tempfile.TemporaryDirectory(prefix="pkglint-bench")
+        repo = SynthRepo(tmpdir.name, args.packages, args.paths, args.lint_packages)
+        os.environ.update(repo.environment())
+        _synth = (tmpdir, repo)
+    return _synth[1]
+
+
+def started_checker(args):
+    """Returns UserlandActionChecker after startup on the synthetic
+    repository, with its engine."""
+    repo = synthetic_repo(args)
+    engine = repo.engine()
+    checker = UserlandActionChecker(config())
+    checker.startup(engine)
+    return checker, engine
+
+
+def bench_startup(args):
+    """Seed path dictionaries from the synthetic repository and inspect the
+    proto area files of linted packages."""
+    repo = synthetic_repo(args)
+    after = timed(lambda checker, engine: checker.startup(engine),
+                  lambda: (UserlandActionChecker(config()), repo.engine()))
+    return None, after
+
+
+def bench_link_resolves(args):
+    """Resolve all links delivered by the linted packages."""
+    repo = synthetic_repo(args)
+    checker, engine = started_checker(args)
+    links = [(action, manifest) for manifest in repo.lint_manifests
+             for action in manifest.gen_actions_by_type("link")]
+
+    def resolve():
+        for action, manifest in links:
+            checker.link_resolves(action, manifest, engine)
+
+    return None, timed(resolve)
+
+
+def bench_runpath(args):
+    """Check RUNPATH of all ELF objects delivered by the linted packages."""
+    repo = synthetic_repo(args)
+    checker, engine = started_checker(args)
+    objects = []
+    for manifest in repo.lint_manifests:
+        for action in manifest.gen_actions_by_type("file"):
+            location = checker.proto.locate(action.attrs["path"])
+            record = checker.elf_cache.get(*location)
+            if record is not None:
+                objects.append((location[0], record))
+
+    # private methods are name mangled
+    runpath_check = checker._UserlandActionChecker__elf_runpath_check
+
+    def check():
+        for fullpath, record in objects:
+            runpath_check(fullpath, record, (), engine, "001")
+
+    return None, timed(check)
+
+
+def bench_lint(args):
+    """Run all checks of both the Userland and OS/Net extensions on the
+    linted packages, including startup."""
+    repo = synthetic_repo(args)
+
+    def setup():
+        action_checkers = [UserlandActionChecker(config()),
+                           OSNetActionChecker(config())]
+        manifest_checkers = [UserlandManifestChecker(config()),
+                             OSNetManifestChecker(config()),
+                             ExtractLicense(config())]
+        return repo.engine(), action_checkers, manifest_checkers
+
+    return None, timed(lambda engine, *checkers: engine.run(*checkers), setup)
+
+
+BENCHMARKS = {
+    "merge_dict": bench_merge_dict,
+    "startup": bench_startup,
+    "link_resolves": bench_link_resolves,
+    "runpath": bench_runpath,
+    "lint": bench_lint,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmarks for the Userland pkglint extension.")
+    parser.add_argument("benchmarks", nargs="*", metavar="benchmark",
+                        help=f"benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument("--stems", type=int, default=20,
+                        help="number of package stems")
+    parser.add_argument("--versions", type=int, default=10,
+                        help="number of versions of each package")
+    parser.add_argument("--paths", type=int, default=500,
+                        help="number of paths delivered by each package")
+    parser.add_argument("--packages", type=int, default=2000,
+                        help="number of packages in the synthetic repository")
+    parser.add_argument("--lint-packages", type=int, default=20,
+                        help="number of linted packages of the synthetic repository")
+    args = parser.parse_args()
+
+    for name in args.benchmarks:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark '{name}'")
+
+    if STANDIN:
+        print("pkg(7) modules not found, using the stand-in modules")
+
+    for name in args.benchmarks or BENCHMARKS:
+        before, after = BENCHMARKS[name](args)
+        if before is None:
+            # nothing to compare with
+            print(f"{name:<20} {'':17}  time  {after:8.3f}s")
+            continue
+        print(f"{name:<20} before {before:8.3f}s  after {after:8.3f}s  "
+              f"speedup {before / after if after else float('inf'):6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
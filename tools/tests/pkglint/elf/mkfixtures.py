@@ -0,0 +1,164 @@
+#!/usr/bin/python3.9
+#
+# CDDL HEADER START
+#
+# The contents of this file are subject to the terms of the
+# Common Development and Distribution License (the "License").
+# You may not use this file except in compliance with the License.
+#
+# You can obtain a copy of the license at usr/src/OPENSOLARIS.LICENSE
+# or http://www.opensolaris.org/os/licensing.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+#
+# When distributing Covered Code, include this CDDL HEADER in each
+# file and include the License file at usr/src/OPENSOLARIS.LICENSE.
+# If applicable, add the following below this CDDL HEADER, with the
+# fields enclosed by brackets "[]" replaced with your own identifying
+# information: Portions Copyright [yyyy] [name of copyright owner]
+#
+# CDDL HEADER END
+#
+
+#
+# Copyright (c) 2026, Oracle and/or its affiliates.
+#
+
+# Generates the minimal ELF objects in this directory, which are used by
+# runtest_helpers.py to test the ELF reader of the Userland pkglint
+# extension on any system. Solaris compilers are not needed, the objects
+# only contain headers and a dynamic section, but no code.
+#
+# The generated files are checked in; rerun this script only when adding
+# new fixtures.
+#
+# gcc-pie64 is a real Linux executable, built with:
+#   gcc -Os -s -pie -fPIE -Wl,--enable-new-dtags,-rpath,/usr/lib/pkglinttest
+
+import pathlib
+import struct
+
+DT_NULL = 0
+DT_NEEDED = 1
+DT_STRTAB = 5
+DT_RPATH = 15
+DT_RUNPATH = 29
+DT_SUNW_ASLR = 0x60000023
+DT_FLAGS_1 = 0x6ffffffb
+DF_1_PIE = 0x08000000
+
+ET_REL = 1
+ET_EXEC = 2
+ET_DYN = 3
+
+# loadable segment is mapped at this address in all objects
+VADDR = 0x10000
+
+
+def elf(bits, order, e_type, dynamic=None, sections=True):
+    """Returns content of an ELF object with given class (32/64), byte
+    order ("<" or ">"), type and list of (tag, value) dynamic entries,
+    where string values are put into the dynamic string table."""
+    ehdr_fmt, phdr_fmt, shdr_fmt, dyn_fmt = {
+        32: ("HHIIIIIHHHHHH", "IIIIIIII", "IIIIIIIIII", "iI"),
+        64: ("HHIQQQIHHHHHH", "IIQQQQQQ", "IIQQQQIIQQ", "qQ"),
+    }[bits]
+    ehdr_size = 16 + struct.calcsize(order + ehdr_fmt)
+    phdr_size = struct.calcsize(order + phdr_fmt)
+    shdr_size = struct.calcsize(order + shdr_fmt)
+    dyn_size = struct.calcsize(order + dyn_fmt)
+
+    def phdr(p_type, offset, size):
+        if bits == 32:
+            return struct.pack(order + phdr_fmt, p_type, offset, VADDR + offset,
+                               VADDR + offset, size, size, 4, 4)
+        return struct.pack(order + phdr_fmt, p_type, 4, offset, VADDR + offset,
+                           VADDR + offset, size, size, 8)
+
+    # dynamic string table
+    dynstr = b"\0"
+    entries = []
+    for tag, value in dynamic or []:
+        if isinstance(value, str):
+            offset = len(dynstr)
+            dynstr += value.encode() + b"\0"
+            value = offset
+        entries.append((tag, value))
+
+    phnum = 2 if dynamic is not None else 0
+    dynstr_off = ehdr_size + phnum * phdr_size
+    dynamic_off = dynstr_off + len(dynstr)
+    dynamic_off += -dynamic_off % 8
+    if dynamic is not None:
+        entries.append((DT_STRTAB, VADDR + dynstr_off))
+        entries.append((DT_NULL, 0))
+    dynamic_data = b"".join(struct.pack(order + dyn_fmt, t, v) for t, v in entries)
+
+    shstrtab = b"\0.dynstr\0.dynamic\0.shstrtab\0"
+    shstrtab_off = dynamic_off + len(dynamic_data)
+    shoff = shstrtab_off + len(shstrtab)
+    shoff += -shoff % 8
+
+    shdrs = []
+    if sections:
+        # null, .dynstr, .dynamic, .shstrtab
+        shdrs.append(struct.pack(order + shdr_fmt, *[0] * 10))
+        if dynamic is not None:
+            shdrs.append(struct.pack(order + shdr_fmt, 1, 3, 2, VADDR + dynstr_off,
+                                     dynstr_off, len(dynstr), 0, 0, 1, 0))
+            shdrs.append(struct.pack(order + shdr_fmt, 9, 6, 3, VADDR + dynamic_off,
+                                     dynamic_off, len(dynamic_data), 1, 0, 8, dyn_size))
+        shdrs.append(struct.pack(order + shdr_fmt, 18, 3, 0, 0, shstrtab_off,
+                                 len(shstrtab), 0, 0, 1, 0))
+
+    ident = b"\x7fELF" + bytes([1 if bits == 32 else 2, 1 if order == "<" else 2, 1])
+    ident += b"\0" * (16 - len(ident))
+    ehdr = ident + struct.pack(
+        order + ehdr_fmt, e_type, 62 if bits == 64 else 3, 1,
+        VADDR if e_type == ET_EXEC else 0,
+        ehdr_size if phnum else 0, shoff if shdrs else 0, 0, ehdr_size,
+        phdr_size, phnum, shdr_size, len(shdrs), len(shdrs) - 1 if shdrs else 0)
+
+    content = ehdr
+    if phnum:
+        content += phdr(1, 0, shstrtab_off)
+        content += phdr(2, dynamic_off, len(dynamic_data))
+    content += dynstr
+    content += b"\0" * (dynamic_off - len(content))
+    content += dynamic_data + shstrtab
+    content += b"\0" * (shoff - len(content))
+    return content + b"".join(shdrs)
+
+
+FIXTURES = {
+    # position independent executable, ASLR enabled
+    "pie64-aslr-enabled": elf(64, "<", ET_DYN, [
+        (DT_NEEDED, "libc.so.1"),
+        (DT_RUNPATH, "/usr/lib/64:$ORIGIN/../lib"),
+        (DT_SUNW_ASLR, 1),
+        (DT_FLAGS_1, DF_1_PIE),
+    ]),
+    # 32-bit executable with ASLR disabled and an old style RPATH
+    "exe32-aslr-disabled": elf(32, "<", ET_EXEC, [
+        (DT_NEEDED, "libc.so.1"),
+        (DT_RPATH, "/usr/lib"),
+        (DT_SUNW_ASLR, 0),
+    ]),
+    # big-endian (SPARC) executable without ASLR tag, no section headers
+    "exe64-msb-untagged": elf(64, ">", ET_EXEC, [
+        (DT_NEEDED, "libc.so.1"),
+        (DT_RUNPATH, "/usr/lib/sparcv9"),
+    ], sections=False),
+    # shared object without runpath
+    "so32-msb": elf(32, ">", ET_DYN, [
+        (DT_NEEDED, "libm.so.2"),
+    ]),
+    # relocatable object without dynamic section
+    "rel64": elf(64, "<", ET_REL),
+}
+
+
+if __name__ == '__main__':
+    here = pathlib.Path(__file__).parent
+    for name, content in FIXTURES.items():
+        (here / name).write_bytes(content)
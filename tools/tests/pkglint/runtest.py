@@ -21,32 +21,125 @@
 #
 
 #
-# Copyright (c) 2021, 2022, Oracle and/or its affiliates.
+# Copyright (c) 2021, 2026, Oracle and/or its affiliates.
 #
 
 # Tests for Userland pkglint check extension (from userland.py)
-
+#
+# By default, /bin/pkglint is run for every test. With PKGLINT_TEST_RUNNER=warm,
+# pkglint runs of all tests are started upfront in a pool of worker processes
+# (PKGLINT_TEST_JOBS of them, one per CPU by default). Each worker runs
+# pkglint in-process, so that the interpreter, pkg(7) modules and the
+# extension are loaded only once per worker rather than once per test.
+# Either way, time of each pkglint run is reported at the end.
+
+import concurrent.futures
+import os
 import pathlib
-import subprocess
 import platform
+import subprocess
+import sys
+import time
 import unittest
 
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent.parent / "python"))
+
+from pkglint.daemon import run_pkglint
+
+PKGLINT = "/bin/pkglint"
+RUNNER = os.getenv("PKGLINT_TEST_RUNNER", "subprocess")
+JOBS = int(os.getenv("PKGLINT_TEST_JOBS", "0")) or os.cpu_count() or 1
+
+
+def run_subprocess(args, env):
+    """Runs pkglint with given arguments and environment in a new process;
+    returns exit code, standard output and error output."""
+    res = subprocess.run([PKGLINT] + args, text=True, capture_output=True, env=env)
+    return res.returncode, res.stdout, res.stderr
+
+
+def run_inprocess(args, env):
+    """The same as run_subprocess(), but runs pkglint in this process (see
+    run_pkglint() in the pkglint daemon)."""
+    return run_pkglint(args, os.getcwd(), env)
+
+
+def timed_run(runner, args, env):
+    """Calls runner, adding its wall time to the result."""
+    start = time.perf_counter()
+    result = runner(args, env)
+    return result + (time.perf_counter() - start,)
+
 
 class TestUserlandPkglint(unittest.TestCase):
 
     solaris_ver = "XXX"
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-
-        # Find the locations of Userland pkglint extensions, pkglintrc and
-        # test manifests based on the expected location of this script.
-        here = pathlib.Path(__file__).parent.absolute()
-        tools = here.parent.parent
-        self.extension_path = tools / "python"
-        self.pkglintrc = tools / "pkglintrc"
-        self.manifests = here / "manifests"
-        self.protoarea = here / "proto"
+    # Find the locations of Userland pkglint extensions, pkglintrc and
+    # test manifests based on the expected location of this script.
+    here = pathlib.Path(__file__).parent.absolute()
+    extension_path = here.parent.parent / "python"
+    pkglintrc = here.parent.parent / "pkglintrc"
+    manifests = here / "manifests"
+    protoarea = here / "proto"
+
+    reference = protoarea / "repo"
+
+    # (manifest, proto, ref) of all tests, see with_manifest()
+    runs = []
+    # pkglint runs started by setUpClass() in the warm mode
+    pending = {}
+    # test name -> time of its pkglint run
+    timings = {}
+
+    @classmethod
+    def pkglint_args(cls, manifest, proto, ref):
+        """Returns arguments and environment to run pkglint with."""
+        env = {"SOLARIS_VERSION": cls.solaris_ver}
+        if proto:
+            env["PROTO_PATH"] = str(cls.protoarea)
+        args = ["-e", str(cls.extension_path), "-f", str(cls.pkglintrc)]
+        if ref:
+            args += ["-r", f"file://{cls.reference}",
+                     "-c", str(cls.protoarea / "cache" / manifest)]
+        args.append(str(cls.manifests / manifest))
+        return args, env
+
+    @classmethod
+    def setUpClass(cls):
+        cls.executor = None
+        if RUNNER != "warm":
+            return
+
+        cls.executor = concurrent.futures.ProcessPoolExecutor(max_workers=JOBS)
+        for manifest, proto, ref in cls.runs:
+            args, env = cls.pkglint_args(manifest, proto, ref)
+            cls.pending[manifest, proto, ref] = cls.executor.submit(
+                timed_run, run_inprocess, args, env)
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls.executor is not None:
+            cls.executor.shutdown()
+        cls.pending.clear()
+
+        if cls.timings:
+            total = sum(cls.timings.values())
+            sys.stderr.write(f"\npkglint runs ({RUNNER}, {total:.2f}s in total):\n")
+            for name, elapsed in sorted(cls.timings.items(), key=lambda t: -t[1]):
+                sys.stderr.write(f"  {elapsed:7.3f}s  {name}\n")
+            cls.timings.clear()
+
+    def run_pkglint(self, manifest, proto, ref):
+        """Returns exit code, standard output and error output of pkglint
+        run on given manifest."""
+        if (manifest, proto, ref) in self.pending:
+            ret, stdout, stderr, elapsed = self.pending[manifest, proto, ref].result()
+        else:
+            args, env = self.pkglint_args(manifest, proto, ref)
+            ret, stdout, stderr, elapsed = timed_run(run_subprocess, args, env)
+        self.timings[self._testMethodName] = elapsed
+        return ret, stdout, stderr
 
     # override these for better debugging
     def assertIn(self, member, container, msg=None):
@@ -59,7 +152,9 @@ class TestUserlandPkglint(unittest.TestCase):
             standardMsg = f"'{member}' unexpectedly found in\n{container}"
             self.fail(self._formatMessage(msg, standardMsg))
 
-    def with_manifest(manifest, proto=False):
+    def with_manifest(manifest, proto=False, ref=False, runs=runs):
+        runs.append((manifest, proto, ref))
+
         def decorator(function):
             def wrapper(self):
                 manifest_path = self.manifests / manifest
@@ -67,14 +162,8 @@ class TestUserlandPkglint(unittest.TestCase):
                     manifest_path.exists(),
                     msg=f"Manifest {manifest} was not found here: {manifest_path}.")
 
-                env = {"SOLARIS_VERSION": self.solaris_ver}
-                if proto:
-                    env["PROTO_PATH"] = self.protoarea
-
-                res = subprocess.run(
-                    ["/bin/pkglint", "-e", self.extension_path, "-f", self.pkglintrc, manifest_path],
-                    text=True, capture_output=True, env=env)
-                return function(self, res.returncode, res.stdout, res.stderr)
+                ret, stdout, stderr = self.run_pkglint(manifest, proto, ref)
+                return function(self, ret, stdout, stderr)
             return wrapper
         return decorator
 
@@ -268,6 +357,22 @@ class TestUserlandPkglint(unittest.TestCase):
             "SMF manifest manifest.xml is not valid:\n", stderr)
 
 
+    @with_manifest("userland.action010.in", proto=True, ref=True)
+    def test_action010(self, ret, stdout, stderr):
+        """Libraries not delivered into library directories are reported."""
+        self.assertNotIn("needs libneeded.so.1", stderr)
+        self.assertNotIn("needs libc.so.1", stderr)
+        self.assertIn("WARNING userland.action010.0      "
+            "usr/lib/needed/missing needs libmissing.so.1, which is not delivered "
+            "into any of its library directories (/usr/lib/needed:/lib/64:/usr/lib/64)\n", stderr)
+
+
+    @with_manifest("userland.action001_5.in", proto=True)
+    def test_action010_no_reference(self, ret, stdout, stderr):
+        """Without a reference repository, needed libraries are not checked."""
+        self.assertNotIn("userland.action010", stderr)
+
+
     @with_manifest("userland.manifest001_1.in")
     def test_manifest001_empty(self, ret, stdout, stderr):
         """Packages without license and files are ok."""
@@ -0,0 +1,1467 @@
+#!/usr/bin/python3.9
+#
+# CDDL HEADER START
+#
+# The contents of this file are subject to the terms of the
+# Common Development and Distribution License (the "License").
+# You may not use this file except in compliance with the License.
+#
+# You can obtain a copy of the license at usr/src/OPENSOLARIS.LICENSE
+# or http://www.opensolaris.org/os/licensing.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+#
+# When distributing Covered Code, include this CDDL HEADER in each
+# file and include the License file at usr/src/OPENSOLARIS.LICENSE.
+# If applicable, add the following below this CDDL HEADER, with the
+# fields enclosed by brackets "[]" replaced with your own identifying
+# information: Portions Copyright [yyyy] [name of copyright owner]
+#
+# CDDL HEADER END
+#
+
+#
+# Copyright (c) 2026, Oracle and/or its affiliates.
+#
+
+# Tests for helper modules of the Userland pkglint extension. Unlike
+# runtest.py, these don't need /bin/pkglint and run on any system.
+
+import contextlib
+import hashlib
+import io
+import os
+import inspect
+import json
+import pathlib
+import re
+import stat
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent.parent / "python"))
+
+from pkglint import daemon, instrument
+from pkglint.conflicts import find_conflicts
+from pkglint.elfinfo import ElfCache, ElfError, ElfRecord, read_elf
+from pkglint.findings import FindingStore, Session
+from pkglint.loader import pipelined
+from pkglint.pathclass import PathClassifier
+from pkglint.payload import DigestCache, expected_digests
+from pkglint.pathtable import FmriTable, PathTable, WarmPaths, variant_key
+from pkglint.protoarea import ProtoIndex
+from pkglint.refindex import LibraryIndex, LibraryOverlay, LinkResolver
+from pkglint.refindex import PrefixIndex, PrefixOverlay, RefPathCache
+from pkglint.router import RoutedActionChecker, handles
+from pkglint import sharded
+from pkglint.sharded import partition, split_args
+from pkglint.sharedindex import MappedPathTable, publish
+from pkglint.smfvalidate import SmfValidator
+
+
+class TestPrefixIndex(unittest.TestCase):
+
+    def test_has_descendant(self):
+        """Only real directory prefixes are matched."""
+        index = PrefixIndex(["usr/lib/libfoo.so.1", "usr/lib/python3.9/os.py",
+                             "usr/bin/foo", "usr/libexec/bar"])
+
+        self.assertTrue(index.has_descendant("usr"))
+        self.assertTrue(index.has_descendant("usr/lib"))
+        self.assertTrue(index.has_descendant("usr/lib/python3.9"))
+        self.assertFalse(index.has_descendant("usr/lib/python3"))
+        self.assertFalse(index.has_descendant("usr/lib/libfoo.so.1"))
+        self.assertFalse(index.has_descendant("usr/sbin"))
+        self.assertFalse(index.has_descendant("var"))
+
+    def test_contains(self):
+        """Exact paths are found, prefixes are not."""
+        index = PrefixIndex(["usr/bin/foo", "usr/bin/foobar"])
+
+        self.assertIn("usr/bin/foo", index)
+        self.assertNotIn("usr/bin", index)
+        self.assertNotIn("usr/bin/fo", index)
+        self.assertEqual(len(index), 2)
+
+    def test_overlay(self):
+        """Index of a changed table reuses the index of the original one."""
+        base = ["usr/bin/foo", "usr/lib/foo/libfoo.so.1", "usr/share/doc/foo/README"]
+        table = set(base[:2]) | {"usr/share/man/man1/foo.1", "usr/share/doc"}
+        index = PrefixOverlay(PrefixIndex(base), table.symmetric_difference(base), table)
+
+        self.assertTrue(index.has_descendant("usr/lib/foo"))
+        self.assertTrue(index.has_descendant("usr/share/man"))
+        # removed from the table
+        self.assertFalse(index.has_descendant("usr/share/doc"))
+        self.assertIn("usr/share/doc", index)
+        self.assertNotIn("usr/share/doc/foo/README", index)
+        self.assertEqual(len(index), 4)
+
+    def test_overlay_deep(self):
+        """Directories with many paths removed are not walked."""
+        base = [f"usr/lib/python3.11/site-packages/mod{i}.py" for i in range(20000)]
+        index = PrefixIndex(base)
+        self.assertEqual(index.count_descendants("usr/lib"), 20000)
+        self.assertEqual(index.count_descendants("usr/li"), 0)
+
+        index.descendants = None
+        table = set(base[-1:])
+        overlay = PrefixOverlay(index, base[:-1], table)
+        self.assertTrue(overlay.has_descendant("usr/lib"))
+        self.assertTrue(overlay.has_descendant("usr/lib/python3.11/site-packages"))
+
+        overlay = PrefixOverlay(index, base, set())
+        self.assertFalse(overlay.has_descendant("usr"))
+        self.assertFalse(overlay.has_descendant("usr/lib/python3.11/site-packages"))
+
+
+class TestLibraryIndex(unittest.TestCase):
+
+    def test_directories(self):
+        index = LibraryIndex(["lib/libc.so.1", "lib/amd64/libc.so.1", "usr/lib/libc.so",
+                              "usr/bin/ls", "libfoo.so.2"])
+        self.assertEqual(index.directories("libc.so.1"), {"lib", "lib/amd64"})
+        self.assertEqual(index.directories("libfoo.so.2"), {""})
+        self.assertEqual(index.directories("ls"), set())
+        self.assertEqual(len(index), 3)
+
+    def test_overlay(self):
+        base = LibraryIndex(["lib/libc.so.1", "usr/lib/libm.so.2"])
+        index = LibraryOverlay(base, ["usr/lib/64/libc.so.1", "usr/lib/libz.so.1"])
+        self.assertEqual(index.directories("libc.so.1"), {"lib", "usr/lib/64"})
+        self.assertEqual(index.directories("libm.so.2"), {"usr/lib"})
+        self.assertEqual(index.directories("libz.so.1"), {"usr/lib"})
+        self.assertEqual(len(index), 3)
+
+
+class TestLinkResolver(unittest.TestCase):
+
+    def setUp(self):
+        self.table = PathTable()
+        for path, target, attrs in [
+                ("usr/lib/libfoo.so.1", None, {}),
+                ("usr/lib/libfoo.so", "libfoo.so.1", {}),
+                ("usr/lib/libbar.so", "libfoo.so", {}),
+                ("usr/lib/64", "amd64", {"variant.arch": "i386"}),
+                ("usr/lib/64", "sparcv9", {"variant.arch": "sparc"}),
+                ("usr/lib/amd64/libfoo.so.1", None, {}),
+                ("usr/X11", "/usr/openwin/../lib", {}),
+                ("usr/bin/ping", "pong", {}),
+                ("usr/bin/pong", "../bin/ping", {}),
+                ("usr/bin/deep", "../../../../usr/lib/libbar.so", {})]:
+            name = "file" if target is None else "link"
+            self.table.add(path, "pkg:/foo@1", name, dict(attrs, target=target))
+
+    def test_resolve(self):
+        """Chains of links and links to directories are followed."""
+        resolver = LinkResolver(self.table)
+        self.assertEqual(resolver.resolve("usr/lib/libbar.so"), "usr/lib/libfoo.so.1")
+        self.assertEqual(resolver.resolve("usr/bin/deep"), "usr/lib/libfoo.so.1")
+        self.assertEqual(resolver.resolve("usr/X11/libfoo.so"), "usr/lib/libfoo.so.1")
+        self.assertEqual(resolver.resolve("usr/lib/missing"), "usr/lib/missing")
+        self.assertEqual(resolver.resolve(""), "")
+
+    def test_variants(self):
+        """Only links delivered in given variants are followed."""
+        resolver = LinkResolver(self.table)
+        i386 = (("variant.arch", "i386"),)
+        sparc = (("variant.arch", "sparc"),)
+        self.assertEqual(resolver.resolve("usr/lib/64/libfoo.so.1", i386),
+                         "usr/lib/amd64/libfoo.so.1")
+        self.assertEqual(resolver.resolve("usr/lib/64/libfoo.so.1", sparc),
+                         "usr/lib/sparcv9/libfoo.so.1")
+
+    def test_circular(self):
+        """Circular links don't resolve, and all prefixes are memoized."""
+        resolver = LinkResolver(self.table)
+        self.assertIsNone(resolver.resolve("usr/bin/ping"))
+        self.assertIsNone(resolver.resolve("usr/bin/pong/foo"))
+        self.assertEqual(resolver.resolve("usr/bin/ls"), "usr/bin/ls")
+
+        resolved = len(resolver)
+        resolver.resolve("usr/bin/pong")
+        self.assertEqual(len(resolver), resolved)
+
+
+class TestRefPathCache(unittest.TestCase):
+
+    def test_roundtrip(self):
+        """Fragments survive a save and load, with unneeded attributes
+        stripped."""
+        fragment = RefPathCache.fragment([
+            ("file", {"path": "usr/bin/foo", "mode": "0555", "pkg.size": "42",
+                      "variant.arch": ["i386"]}),
+            ("link", {"path": "usr/bin/bar", "target": "foo"}),
+        ])
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = pathlib.Path(tmpdir) / "sub" / "cache.pickle"
+            RefPathCache(path).save(("state",), {"pkg:/foo@1.0": fragment})
+
+            cache = RefPathCache(path)
+            cache.load()
+
+        self.assertEqual(cache.state, ("state",))
+        self.assertEqual(cache.fragments["pkg:/foo@1.0"], [
+            ("usr/bin/foo", "file", {"path": "usr/bin/foo", "mode": "0555",
+                                     "variant.arch": ["i386"]}),
+            ("usr/bin/bar", "link", {"path": "usr/bin/bar", "target": "foo"}),
+        ])
+
+    def test_broken_cache(self):
+        """Unreadable cache file is treated as an empty cache."""
+        with tempfile.NamedTemporaryFile() as tmp:
+            tmp.write(b"garbage")
+            tmp.flush()
+            cache = RefPathCache(tmp.name)
+            cache.load()
+
+        self.assertIsNone(cache.state)
+        self.assertEqual(cache.fragments, {})
+
+
+class TestPathTable(unittest.TestCase):
+
+    def test_seed(self):
+        """Fragments are seeded into compact entries."""
+        fragment = RefPathCache.fragment([
+            ("file", {"path": "usr/bin/foo", "variant.arch": ["i386"]}),
+            ("link", {"path": "usr/bin/bar", "target": "foo",
+                      "variant.arch": ["i386"]}),
+        ])
+        table = PathTable()
+        table.seed("pkg:/foo@1.0", fragment)
+        table.add("usr/bin/foo", "pkg:/bar@1.0", "file", {"mode": "0555"})
+
+        self.assertEqual(sorted(table), ["usr/bin/bar", "usr/bin/foo"])
+        self.assertEqual(len(table), 2)
+        self.assertIn("usr/bin/foo", table)
+        self.assertEqual(table.get("usr/sbin"), ())
+
+        foo, bar = table["usr/bin/foo"]
+        self.assertEqual(table.fmris[foo.fmri], "pkg:/foo@1.0")
+        self.assertEqual(table.fmris[bar.fmri], "pkg:/bar@1.0")
+        self.assertEqual(foo.name, "file")
+        self.assertIsNone(foo.target)
+        self.assertEqual(foo.variants, (("variant.arch", ("i386",)),))
+        self.assertEqual(bar.variants, ())
+        self.assertEqual(bar.attrs, ("0555", None, None, None))
+
+        link, = table["usr/bin/bar"]
+        self.assertEqual(link.target, "foo")
+        # FMRIs and variants are stored only once
+        self.assertEqual(link.fmri, foo.fmri)
+        self.assertIs(link.variants, foo.variants)
+        self.assertIs(link.attrs, foo.attrs)
+        self.assertEqual(len(table.fmris), 2)
+
+    def test_freeze(self):
+        """Actions added after the table was read follow those before."""
+        table = PathTable()
+        table.add("usr/bin/foo", "pkg:/foo@1.0", "file", {})
+        table.add("usr/bin/foo", "pkg:/bar@1.0", "file", {})
+        self.assertIsInstance(table["usr/bin/foo"], tuple)
+        table.add("usr/bin/foo", "pkg:/baz@1.0", "file", {})
+        table.freeze()
+
+        self.assertEqual([table.fmris[e.fmri] for e in table.get("usr/bin/foo")],
+                         ["pkg:/foo@1.0", "pkg:/bar@1.0", "pkg:/baz@1.0"])
+        self.assertIsInstance(table.get("usr/bin/foo"), tuple)
+
+    def test_shared_fmris(self):
+        """Tables can share their FMRIs."""
+        fmris = FmriTable()
+        first, second = PathTable(fmris), PathTable(fmris)
+        first.add("usr/bin/foo", "pkg:/foo@1.0", "file", {})
+        second.add("usr/bin/bar", "pkg:/foo@1.0", "file", {})
+        self.assertEqual(first["usr/bin/foo"][0].fmri, second["usr/bin/bar"][0].fmri)
+        self.assertEqual(fmris.intern("pkg:/foo@1.0"), 0)
+
+    def test_copy(self):
+        """Copies share entries, but not paths, with the original."""
+        table = PathTable()
+        table.add("usr/bin/foo", "pkg:/foo@1.0", "file", {})
+        table.add("usr/bin/foo", "pkg:/bar@1.0", "file", {})
+        table.add("usr/bin/bar", "pkg:/bar@1.0", "file", {})
+
+        copy = table.copy()
+        bar = table.fmris.intern("pkg:/bar@1.0")
+        copy.discard("usr/bin/foo", bar)
+        copy.discard("usr/bin/bar", bar)
+        copy.discard("usr/bin/baz", bar)
+
+        self.assertEqual(sorted(copy), ["usr/bin/foo"])
+        self.assertEqual([table.fmris[e.fmri] for e in copy["usr/bin/foo"]],
+                         ["pkg:/foo@1.0"])
+        self.assertIs(copy["usr/bin/foo"][0], table["usr/bin/foo"][0])
+        self.assertEqual(len(table["usr/bin/foo"]), 2)
+        self.assertIn("usr/bin/bar", table)
+
+        # FMRIs added to the copy are not added to the original
+        copy.add("usr/bin/baz", "pkg:/baz@1.0", "file", {"mode": "0555"})
+        self.assertEqual(len(table.fmris), 2)
+        self.assertEqual(len(table._attrs), 1)
+
+    def test_select(self):
+        """Only entries installable with given variants are selected."""
+        table = PathTable()
+        table.add("usr/lib/libfoo.so", "pkg:/foo-x86@1.0", "file",
+                  {"variant.arch": "i386"})
+        table.add("usr/lib/libfoo.so", "pkg:/foo-sparc@1.0", "link",
+                  {"variant.arch": ["sparc"], "target": "libfoo.so.1"})
+        table.add("usr/lib/libfoo.so", "pkg:/foo-debug@1.0", "file",
+                  {"variant.arch": ["i386", "sparc"], "variant.debug.foo": "true"})
+        table.add("usr/lib/libbar.so", "pkg:/bar@1.0", "file", {})
+
+        def select(path, **attrs):
+            variants = variant_key({f"variant.{k.replace('_', '.')}": v
+                                    for k, v in attrs.items()})
+            return [table.fmris[e.fmri] for e in table.select(path, variants)]
+
+        self.assertEqual(select("usr/lib/libfoo.so", arch="i386"),
+                         ["pkg:/foo-x86@1.0", "pkg:/foo-debug@1.0"])
+        self.assertEqual(select("usr/lib/libfoo.so", arch=["sparc"], debug_foo="false"),
+                         ["pkg:/foo-sparc@1.0"])
+        self.assertEqual(select("usr/lib/libfoo.so", debug_foo="true"),
+                         ["pkg:/foo-x86@1.0", "pkg:/foo-sparc@1.0", "pkg:/foo-debug@1.0"])
+        self.assertEqual(select("usr/lib/libfoo.so", arch="aarch64"), [])
+        self.assertEqual(len(select("usr/lib/libfoo.so")), 3)
+        # entries without variants are installed with any of them
+        self.assertEqual(select("usr/lib/libbar.so", arch="sparc"), ["pkg:/bar@1.0"])
+        self.assertEqual(select("usr/lib/libbaz.so", arch="sparc"), [])
+
+
+class TestConflicts(unittest.TestCase):
+
+    def test_find(self):
+        """Conflicting actions of linted and other packages are found."""
+        fmris = FmriTable()
+        ref, lint = PathTable(fmris), PathTable(fmris)
+        for table, path, fmri, name, attrs in [
+                (ref, "usr/bin/foo", "pkg://solaris/foo@1", "file", {}),
+                (lint, "usr/bin/foo", "pkg:/bar@2", "dir",
+                 {"mode": "0755", "owner": "root", "group": "bin"}),
+                (ref, "usr/share/doc", "pkg:/foo@1", "dir",
+                 {"mode": "0755", "owner": "root", "group": "bin"}),
+                (lint, "usr/share/doc", "pkg:/bar@2", "dir",
+                 {"mode": "0755", "owner": "root", "group": "bin"}),
+                (ref, "usr/share/man", "pkg:/foo@1", "dir",
+                 {"mode": "0755", "owner": "root", "group": "bin"}),
+                (lint, "usr/share/man", "pkg:/bar@2", "dir",
+                 {"mode": "0755", "owner": "root", "group": "sys"}),
+                (ref, "etc/foo.conf", "pkg:/foo@1", "file", {"overlay": "allow"}),
+                (lint, "etc/foo.conf", "pkg:/bar@2", "file", {"overlay": "true"}),
+                (ref, "usr/lib/64", "pkg:/foo@1", "link",
+                 {"target": "amd64", "variant.arch": "i386"}),
+                (lint, "usr/lib/64", "pkg:/bar@2", "link",
+                 {"target": "sparcv9", "variant.arch": "sparc"}),
+                (ref, "usr/lib/libfoo.so", "pkg:/foo@1", "link", {"target": "libfoo.so.1"}),
+                (ref, "usr/lib/libfoo.so", "pkg:/baz@1", "link", {"target": "libfoo.so.2"}),
+                (lint, "usr/lib/libfoo.so", "pkg:/foo@2", "link", {"target": "libfoo.so.1"})]:
+            table.add(path, fmri, name, attrs)
+        # the linted version of foo supersedes the reference one
+        for path, entries in lint.items():
+            ref[path] = [e for e in ref.get(path) if fmris[e.fmri] != "pkg:/foo@1"
+                         or path != "usr/lib/libfoo.so"] + list(entries)
+
+        self.assertEqual(find_conflicts(ref, lint), {
+            "usr/bin/foo": "file in pkg://solaris/foo@1, "
+                           "dir (mode=0755 owner=root group=bin) in pkg:/bar@2",
+            "usr/share/man": "dir (mode=0755 owner=root group=bin) in pkg:/foo@1, "
+                             "dir (mode=0755 owner=root group=sys) in pkg:/bar@2",
+            "usr/lib/libfoo.so": "link to libfoo.so.2 in pkg:/baz@1, "
+                                 "link to libfoo.so.1 in pkg:/foo@2",
+        })
+
+
+    def test_shared_directory(self):
+        """Directories delivered by many packages are compared by groups of
+        equal actions."""
+        fmris = FmriTable()
+        ref, lint = PathTable(fmris), PathTable(fmris)
+        for i in range(1000):
+            ref.add("usr/bin", f"pkg:/ref{i}@1", "dir",
+                    {"mode": "0755", "owner": "root", "group": "bin"})
+        lint.add("usr/bin", "pkg:/bar@2", "dir",
+                 {"mode": "0755", "owner": "root", "group": "bin"})
+        lint.add("usr/bin", "pkg:/baz@2", "dir",
+                 {"mode": "0755", "owner": "root", "group": "sys", "variant.arch": "sparc"})
+        ref["usr/bin"] = list(ref["usr/bin"]) + list(lint["usr/bin"])
+
+        conflict = find_conflicts(ref, lint)["usr/bin"].split(", ")
+        self.assertEqual(len(conflict), 1002)
+        self.assertEqual(conflict[-1], "dir (mode=0755 owner=root group=sys) in pkg:/baz@2")
+
+
+class TestDaemon(unittest.TestCase):
+
+    def test_requests(self):
+        """Requests are run by the daemon until it is asked to stop."""
+        def runner(args, cwd, env):
+            return len(args), f"out {' '.join(args)}\n", f"{cwd} {env['FOO']}\n"
+
+        def request(message):
+            # the daemon may not listen yet
+            for _ in range(500):
+                try:
+                    return daemon.request(path, message)
+                except (ConnectionRefusedError, FileNotFoundError):
+                    time.sleep(0.01)
+            return daemon.request(path, message)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "socket")
+            server = threading.Thread(target=daemon.serve, args=(path, runner))
+            server.start()
+            try:
+                reply = request({"args": ["-c", "cache", "foo.p5m"], "cwd": tmpdir,
+                                 "env": {"FOO": "bar"}})
+                self.assertEqual(reply, {"status": 3, "stdout": "out -c cache foo.p5m\n",
+                                         "stderr": f"{tmpdir} bar\n"})
+                self.assertTrue(WarmPaths.enabled)
+                self.assertEqual(stat.S_IMODE(os.stat(path).st_mode) & 0o077, 0)
+            finally:
+                request({"stop": True})
+                server.join()
+
+            self.assertFalse(os.path.exists(path))
+            self.assertFalse(WarmPaths.enabled)
+            self.assertRaises(OSError, daemon.request, path, {"stop": True})
+
+
+class TestSharedIndex(unittest.TestCase):
+
+    def test_roundtrip(self):
+        """Mapped table answers the same as the published one."""
+        table = PathTable()
+        table.add("usr/bin/ls", "pkg:/file/gnu-coreutils@9.4", "link",
+                  {"target": "../gnu/bin/ls", "variant.arch": ["i386", "sparc"]})
+        table.add("usr/bin/ls", "pkg:/system/core-os@11.4", "file",
+                  {"mode": "0555", "owner": "root", "group": "bin"})
+        table.add("usr/lib/libc.so.1", "pkg:/system/library@11.4", "file",
+                  {"variant.debug.osnet": "true"})
+        table.add("usr/share/Ωmega", "pkg:/system/library@11.4", "dir", {})
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "index")
+            publish(path, table, {"context": "00ff"})
+            mapped = MappedPathTable(path)
+
+            self.assertEqual(mapped.meta, {"context": "00ff"})
+            self.assertEqual(len(mapped), 3)
+            self.assertEqual(list(mapped), sorted(table))
+            for key, entries in table.items():
+                self.assertIn(key, mapped)
+                self.assertEqual(
+                    [(mapped.fmris[e.fmri], e.name, e.target, e.variants, e.attrs)
+                     for e in mapped[key]],
+                    [(table.fmris[e.fmri], e.name, e.target, e.variants, e.attrs)
+                     for e in entries])
+            self.assertNotIn("usr/bin", mapped)
+            self.assertEqual(mapped.get("usr/bin"), ())
+            self.assertRaises(KeyError, mapped.__getitem__, "usr/bin/cat")
+
+            self.assertTrue(mapped.has_descendant("usr"))
+            self.assertTrue(mapped.has_descendant("usr/share"))
+            self.assertFalse(mapped.has_descendant("usr/bin/ls"))
+            self.assertFalse(mapped.has_descendant("usr/li"))
+            self.assertEqual(
+                [e.name for e in mapped.select("usr/bin/ls", (("variant.arch", "s390"),))],
+                ["file"])
+            mapped.close()
+
+    def test_broken(self):
+        """Files which are not shared indexes are refused."""
+        with tempfile.NamedTemporaryFile() as tmpfile:
+            tmpfile.write(b"PKGLIDX")
+            tmpfile.flush()
+            self.assertRaises(ValueError, MappedPathTable, tmpfile.name)
+
+
+class TestSharded(unittest.TestCase):
+
+    def test_split_args(self):
+        self.assertEqual(
+            split_args(["-c", "/cache", "-e", "/tools/python/", "-f", "rc", "a.p5m", "b.p5m"]),
+            (["-c", "/cache", "-e", "/tools/python/", "-f", "rc"], ["a.p5m", "b.p5m"]))
+        self.assertEqual(split_args(["-v", "a.p5m", "-p", ""]), (["-v", "-p", ""], ["a.p5m"]))
+        # lint repositories are linted by a single process
+        self.assertIsNone(split_args(["-l", "file:///repo", "a.p5m"]))
+        self.assertIsNone(split_args(["--unknown", "a.p5m"]))
+
+    def test_partition(self):
+        """Shards are contiguous and of similar size."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manifests = []
+            for i, size in enumerate([10, 10, 10, 30, 10, 10, 10]):
+                path = os.path.join(tmpdir, f"{i}.p5m")
+                with open(path, "w") as ofile:
+                    ofile.write("x" * size)
+                manifests.append(path)
+
+            chunks = partition(manifests, 3)
+            self.assertEqual([len(c) for c in chunks], [3, 1, 3])
+            self.assertEqual(sum(chunks, []), manifests)
+            # never more shards than manifests
+            self.assertEqual(partition(manifests[:2], 8), [manifests[:1], manifests[1:2]])
+
+
+    def test_not_published(self):
+        """When the first shard doesn't publish the shared index, its
+        errors are reported and all manifests are linted again."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            pkglint = os.path.join(tmpdir, "pkglint")
+            runs = os.path.join(tmpdir, "runs")
+            with open(pkglint, "w") as ofile:
+                ofile.write(f"""#!/bin/sh
+echo "$PKGLINT_SHARD_MANIFESTS $@" >> {runs}
+if [ -n "$PKGLINT_SHARD_MANIFESTS" ]; then
+    echo "partial findings"
+    echo "cannot publish" >&2
+    exit 1
+fi
+""")
+            os.chmod(pkglint, 0o755)
+
+            workdir = os.path.join(tmpdir, "work")
+            os.mkdir(workdir)
+            stdout, stderr = io.StringIO(), io.StringIO()
+            saved = sharded.PKGLINT
+            sharded.PKGLINT = pkglint
+            try:
+                with contextlib.redirect_stdout(stdout), \
+                        contextlib.redirect_stderr(stderr):
+                    status = sharded.run_sharded(
+                        ["-v"], [["a.p5m"], ["b.p5m"]], workdir)
+            finally:
+                sharded.PKGLINT = saved
+
+            with open(runs) as ifile:
+                calls = ifile.read().splitlines()
+
+        self.assertEqual(status, 0)
+        self.assertEqual(calls, [
+            f"{os.path.join(workdir, 'manifests')} -v a.p5m", " -v a.p5m b.p5m"])
+        self.assertEqual(stdout.getvalue(), "")
+        self.assertIn("cannot publish", stderr.getvalue())
+        self.assertIn("exit status 1", stderr.getvalue())
+
+
+class TestReadElf(unittest.TestCase):
+
+    fixtures = pathlib.Path(__file__).parent / "elf"
+
+    def check(self, name, expected):
+        self.assertEqual(read_elf(self.fixtures / name), ElfRecord(*expected))
+
+    def test_aslr(self):
+        """ASLR tag and PIE flag are read from the dynamic section."""
+        self.check("pie64-aslr-enabled",
+                   (64, "pie", "/usr/lib/64:$ORIGIN/../lib", True, True, ("libc.so.1",)))
+        self.check("exe32-aslr-disabled",
+                   (32, "exe", "/usr/lib", False, False, ("libc.so.1",)))
+        self.check("exe64-msb-untagged",
+                   (64, "exe", "/usr/lib/sparcv9", None, False, ("libc.so.1",)))
+
+    def test_other_types(self):
+        """Objects without runpath and dynamic section are handled."""
+        self.check("so32-msb", (32, "so", "", None, False, ("libm.so.2",)))
+        self.check("rel64", (64, "rel", "", None, False))
+
+    def test_real_binary(self):
+        """Binaries produced by a real link-editor are read correctly."""
+        self.check("gcc-pie64",
+                   (64, "pie", "/usr/lib/pkglinttest", None, True, ("libc.so.6",)))
+
+    def test_not_elf(self):
+        """Non ELF files are recognized, broken ELF objects reported."""
+        self.assertIsNone(read_elf(self.fixtures / "mkfixtures.py"))
+
+        with tempfile.NamedTemporaryFile() as tmp:
+            tmp.write((self.fixtures / "pie64-aslr-enabled").read_bytes()[:80])
+            tmp.flush()
+            with self.assertRaises(ElfError):
+                read_elf(tmp.name)
+
+
+class TestElfCache(unittest.TestCase):
+
+    def test_persistence(self):
+        """Unchanged files are inspected only once across runs."""
+        inspected = []
+
+        def inspect(path):
+            inspected.append(path)
+            if path.endswith(".txt"):
+                return None
+            return ElfRecord(64, "pie", "/usr/lib/64", True, True)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = pathlib.Path(tmpdir)
+            binary = tmpdir / "binary"
+            binary.write_bytes(b"content")
+            text = tmpdir / "text.txt"
+            text.write_bytes(b"content")
+            cachefile = str(tmpdir / "cache.pickle")
+
+            cache = ElfCache(cachefile, inspect)
+            self.assertEqual(cache.get(str(binary)).runpath, "/usr/lib/64")
+            self.assertIsNone(cache.get(str(text)))
+            self.assertIsNone(cache.get(str(text)))
+            cache.save()
+            self.assertEqual(len(inspected), 2)
+
+            cache = ElfCache(cachefile, inspect)
+            self.assertTrue(cache.get(str(binary)).pie)
+            self.assertIsNone(cache.get(str(text)))
+            self.assertEqual(len(inspected), 2)
+
+            # modified files are inspected again
+            binary.write_bytes(b"new content")
+            cache.get(str(binary))
+            self.assertEqual(len(inspected), 3)
+
+    def test_prefetch(self):
+        """Prefetched files are read in worker processes, only files
+        which cannot be parsed are inspected by the fallback."""
+        fixtures = pathlib.Path(__file__).parent / "elf"
+        inspected = []
+
+        def inspect(path):
+            inspected.append(path)
+            return ElfRecord(64, "so", "", None, False)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            broken = pathlib.Path(tmpdir) / "broken"
+            broken.write_bytes((fixtures / "rel64").read_bytes()[:40])
+
+            paths = [str(p) for p in fixtures.iterdir() if p.is_file()]
+            paths.append(str(broken))
+            files = [(path, os.stat(path)) for path in paths]
+
+            cache = ElfCache(None, inspect)
+            cache.prefetch_min = 1
+            cache.prefetch(files, jobs=2)
+            self.assertEqual(inspected, [str(broken)])
+
+            for path, st in files:
+                self.assertEqual(cache.get(path, st), cache.lookup(st))
+            self.assertEqual(cache.get(str(fixtures / "gcc-pie64")).type, "pie")
+            self.assertIsNone(cache.get(str(fixtures / "mkfixtures.py")))
+            self.assertEqual(len(inspected), 1)
+
+
+class TestPathClassifier(unittest.TestCase):
+
+    def setUp(self):
+        self.classifier = PathClassifier(
+            [re.compile(r"^etc/"), re.compile(r"^usr/"), re.compile(r"^var/(?!share/)")],
+            re.compile(r"^etc/(rc.|init)\.d"),
+            re.compile(r"^lib/svc/manifest/.*\.xml$"),
+            ["i86", "sparcv7", "32"], ["amd64", "sparcv9", "64"])
+
+    def test_rules(self):
+        """All path rules are evaluated by one classification."""
+        cls = self.classifier.classify("etc/init.d/foo")
+        self.assertTrue(cls.allowed)
+        self.assertTrue(cls.init_script)
+        self.assertFalse(cls.smf_manifest)
+
+        cls = self.classifier.classify("lib/svc/manifest/site/foo.xml")
+        self.assertFalse(cls.allowed)
+        self.assertFalse(cls.init_script)
+        self.assertTrue(cls.smf_manifest)
+
+        self.assertTrue(self.classifier.classify("var/lib/foo").allowed)
+        self.assertFalse(self.classifier.classify("var/share/foo").allowed)
+        self.assertFalse(self.classifier.classify("opt/foo").allowed)
+
+    def test_bits(self):
+        """The closest 32/64-bit specific directory decides."""
+        cls = self.classifier.classify("usr/lib/amd64/libfoo.so.1")
+        self.assertEqual((cls.path32, cls.path64), (False, True))
+        self.assertEqual(cls.dirparts, ["usr", "lib", "amd64"])
+
+        cls = self.classifier.classify("usr/lib/64/foo/32/bar")
+        self.assertEqual((cls.path32, cls.path64), (True, False))
+
+        cls = self.classifier.classify("usr/lib/libfoo.so.1")
+        self.assertEqual((cls.path32, cls.path64), (False, False))
+
+        # everything in Xorg modules but dri is 64-bit
+        cls = self.classifier.classify("usr/lib/xorg/modules/drivers/foo.so")
+        self.assertEqual((cls.path32, cls.path64), (False, True))
+        cls = self.classifier.classify("usr/lib/xorg/modules/dri/foo.so")
+        self.assertEqual((cls.path32, cls.path64), (False, False))
+
+    def test_memoized(self):
+        """Paths and directories are classified only once."""
+        first = self.classifier.classify("usr/bin/foo")
+        self.assertIs(self.classifier.classify("usr/bin/foo"), first)
+        self.assertIs(self.classifier.classify("usr/bin/bar").dirparts, first.dirparts)
+
+
+class TestDigestCache(unittest.TestCase):
+
+    def test_expected_digests(self):
+        """Digests of the payload are found in published file actions."""
+        sha1 = "0123456789abcdef0123456789abcdef01234567"
+        self.assertEqual(expected_digests(sha1, {}), {"sha1": sha1})
+        self.assertEqual(expected_digests("NOHASH", {}), {})
+        self.assertEqual(expected_digests("build/foo", {}), {})
+        self.assertEqual(expected_digests(sha1, {"pkg.content-hash": [
+            "gzip:sha512t_256:ff00", "file:sha512t_256:00ff"]}),
+            {"sha1": sha1, "sha512_256": "00ff"})
+        self.assertEqual(expected_digests(None, {"pkg.content-hash": "file:md5:00ff"}), {})
+
+    def test_persistence(self):
+        """Files are hashed once, unchanged files are not read again."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_path = os.path.join(tmpdir, "digests.pickle")
+            files = []
+            for name, content in [("empty", b""), ("foo", b"foo\n" * 100000)]:
+                path = os.path.join(tmpdir, name)
+                with open(path, "wb") as ofile:
+                    ofile.write(content)
+                files.append((path, os.stat(path), ["sha1", "sha256"]))
+
+            cache = DigestCache(cache_path)
+            cache.prefetch(files, jobs=2)
+            cache.save()
+            self.assertEqual(len(cache), 2)
+
+            cache = DigestCache(cache_path)
+            for path, st, _ in files:
+                os.unlink(path)
+            empty, foo = [cache.get(path, st, ["sha1"]) for path, st, _ in files]
+            self.assertEqual(empty["sha1"], "da39a3ee5e6b4b0d3255bfef95601890afd80709")
+            self.assertEqual(foo["sha256"], hashlib.sha256(b"foo\n" * 100000).hexdigest())
+            # digests by other algorithms need the file
+            self.assertRaises(OSError, cache.get, files[0][0], files[0][1], ["sha512"])
+
+
+class TestProtoIndex(unittest.TestCase):
+
+    def test_locate(self):
+        """Files are found in the first proto area containing them."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            first = pathlib.Path(tmpdir) / "first"
+            second = pathlib.Path(tmpdir) / "second"
+            (first / "usr/bin").mkdir(parents=True)
+            (second / "usr/bin").mkdir(parents=True)
+            (first / "usr/bin/foo").write_text("first")
+            (second / "usr/bin/foo").write_text("second")
+            (second / "usr/bin/bar").write_text("second")
+            (second / "usr/bin/broken").symlink_to("nonexistent")
+            (second / "usr/bin/link").symlink_to("bar")
+
+            index = ProtoIndex([str(first), str(second)])
+            fullpath, st = index.locate("usr/bin/foo")
+            self.assertEqual(fullpath, f"{first}/usr/bin/foo")
+            self.assertEqual(st.st_size, 5)
+            self.assertEqual(index.locate("usr/bin/bar")[0], f"{second}/usr/bin/bar")
+            self.assertEqual(index.locate("usr/bin/link")[1].st_size, 6)
+            self.assertEqual(index.locate("usr/./bin//bar")[0], f"{second}/usr/bin/bar")
+            self.assertEqual(index.locate("usr/bin/../bin/bar")[0],
+                             f"{second}/usr/bin/../bin/bar")
+            self.assertIsNone(index.locate("usr/bin/broken"))
+            self.assertIsNone(index.locate("usr/bin/foo/bar"))
+            self.assertIsNone(index.locate("usr/lib/foo"))
+
+            self.assertEqual(index.locate_last("usr/bin/foo")[0], f"{second}/usr/bin/foo")
+            self.assertEqual(index.locate_last("usr/bin/bar")[0], f"{second}/usr/bin/bar")
+            self.assertIsNone(index.locate_last("usr/lib/foo"))
+
+            # results are remembered for the whole run
+            (first / "usr/bin/foo").unlink()
+            self.assertEqual(index.locate("usr/bin/foo")[0], f"{first}/usr/bin/foo")
+
+    def test_shared(self):
+        """Checkers share one index of the same proto areas."""
+        self.assertIsNone(ProtoIndex.shared(None))
+        index = ProtoIndex.shared(["/nonexistent"])
+        self.assertIs(ProtoIndex.shared(["/nonexistent"]), index)
+        ProtoIndex.reset()
+        self.assertIsNot(ProtoIndex.shared(["/nonexistent"]), index)
+
+
+class TestSmfValidator(unittest.TestCase):
+
+    # stand-in for svccfg validate, which counts its invocations
+    validate = (
+        "import sys\n"
+        "open(sys.argv[1] + '.count', 'a').write('x')\n"
+        "if 'broken' in open(sys.argv[1]).read():\n"
+        "    sys.exit(f'{sys.argv[1]}: broken manifest')\n"
+    )
+
+    def test_validation(self):
+        """Verdicts are cached by content across runs."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = pathlib.Path(tmpdir)
+            cachefile = str(tmpdir / "cache.pickle")
+            command = (sys.executable, "-c", self.validate)
+            good = tmpdir / "good.xml"
+            good.write_text("<service_bundle/>")
+            bad = tmpdir / "bad.xml"
+            bad.write_text("broken")
+            copy = tmpdir / "copy.xml"
+            copy.write_text("broken")
+
+            validator = SmfValidator(cachefile, 4, command)
+            for path in (good, bad, copy):
+                validator.add(str(path))
+            validator.run()
+            self.assertIsNone(validator.result(str(good)))
+            self.assertEqual(validator.result(str(bad)), f"{bad}: broken manifest\n")
+            # same content is validated only once, but reported correctly
+            self.assertEqual(validator.result(str(copy)), f"{copy}: broken manifest\n")
+            self.assertFalse((tmpdir / "copy.xml.count").exists())
+            validator.save()
+
+            validator = SmfValidator(cachefile, 4, command)
+            self.assertIsNone(validator.result(str(good)))
+            self.assertEqual(validator.result(str(bad)), f"{bad}: broken manifest\n")
+            self.assertEqual((tmpdir / "good.xml.count").read_text(), "x")
+            self.assertEqual((tmpdir / "bad.xml.count").read_text(), "x")
+
+            # not queued manifest is validated on demand
+            other = tmpdir / "other.xml"
+            other.write_text("<service_bundle></service_bundle>")
+            self.assertIsNone(validator.result(str(other)))
+            self.assertEqual((tmpdir / "other.xml.count").read_text(), "x")
+
+
+class TestPipelined(unittest.TestCase):
+
+    def test_order(self):
+        """Results come in the order of items, whatever the jobs."""
+        for jobs in (1, 4):
+            self.assertEqual(list(pipelined(iter(range(200)), lambda i: i * i, jobs)),
+                             [(i, i * i) for i in range(200)])
+
+    def test_calling_thread(self):
+        """Items are processed in the calling thread."""
+        caller = threading.current_thread()
+        threads = {thread for _, thread in pipelined(
+            range(100), lambda i: threading.current_thread(), 4)}
+        self.assertEqual(threads, {caller})
+
+    def test_errors(self):
+        """Errors of the producer and of the processing are raised."""
+        def items():
+            yield 1
+            raise OSError("repository gone")
+
+        with self.assertRaisesRegex(OSError, "repository gone"):
+            list(pipelined(items(), str, 4))
+        with self.assertRaises(ZeroDivisionError):
+            list(pipelined(range(10), lambda i: 1 / (i - 5), 4))
+
+    def test_abandoned(self):
+        """Producer stops when the caller doesn't want more results."""
+        produced = []
+
+        def items():
+            for i in range(1000):
+                produced.append(i)
+                yield i
+
+        results = pipelined(items(), str, 2)
+        self.assertEqual(next(results), (0, "0"))
+        results.close()
+        self.assertLess(len(produced), 1000)
+
+
+class TestRouter(unittest.TestCase):
+
+    class Action:
+        def __init__(self, name, path=None):
+            self.name = name
+            self.attrs = {} if path is None else {"path": path}
+
+    class Checker:
+        def __init__(self):
+            self.seen = []
+            self.included_checks = [
+                (self.any_action, "001"), (self.links, "002"),
+                (self.var_share, "003"), (self.var_files, "004")]
+
+        def check(self, action, manifest, engine):
+            for func, _ in self.included_checks:
+                func(action, manifest, engine)
+
+        def any_action(self, action, manifest, engine, pkglint_id="001"):
+            self.seen.append(("any", action.name))
+
+        @handles("link", "hardlink")
+        def links(self, action, manifest, engine, pkglint_id="002"):
+            self.seen.append(("links", action.name))
+
+        @handles(prefixes=["var/share/"])
+        def var_share(self, action, manifest, engine, pkglint_id="003"):
+            self.seen.append(("var_share", action.name))
+
+        @handles("file", prefixes=["var/"])
+        def var_files(self, action, manifest, engine, pkglint_id="004"):
+            self.seen.append(("var_files", action.name))
+
+    class RoutedChecker(RoutedActionChecker, Checker):
+        pass
+
+    def test_routing(self):
+        """Checks see only actions they declared interest in."""
+        checker = self.RoutedChecker()
+        included = checker.included_checks
+        for action in [self.Action("set"), self.Action("hardlink", "usr/lib/a"),
+                       self.Action("file", "var/share/b"), self.Action("file", "etc/c"),
+                       self.Action("dir", "var/share/")]:
+            checker.check(action, None, None)
+
+        self.assertEqual(checker.seen, [
+            ("any", "set"),
+            ("any", "hardlink"), ("links", "hardlink"),
+            ("any", "file"), ("var_share", "file"), ("var_files", "file"),
+            ("any", "file"),
+            ("any", "dir"), ("var_share", "dir")])
+        self.assertIs(checker.included_checks, included)
+
+    def test_excluded(self):
+        """Routes follow changes of the included checks."""
+        checker = self.RoutedChecker()
+        checker.check(self.Action("link", "a"), None, None)
+        checker.included_checks = checker.included_checks[1:]
+        checker.check(self.Action("link", "b"), None, None)
+        self.assertEqual(checker.seen, [("any", "link"), ("links", "link"),
+                                        ("links", "link")])
+
+
+class TestFindings(unittest.TestCase):
+
+    class Manifest:
+        def __init__(self, fmri):
+            self.fmri = fmri
+
+    class Engine:
+        def __init__(self):
+            self.reported = []
+
+        def error(self, message, msgid=None):
+            self.reported.append(("error", message, msgid))
+
+        def warning(self, message, msgid=None):
+            self.reported.append(("warning", message, msgid))
+
+    def lint(self, store, manifests, checked):
+        """Runs a checker reporting a warning for each action of given
+        manifests, as {fmri: number of actions}."""
+        engine = self.Engine()
+        session = Session(store, "test.checker")
+        for manifest in manifests:
+            for i in range(manifests[manifest]):
+                def check(eng, i=i):
+                    checked.append((manifest.fmri, i))
+                    eng.warning(f"{manifest.fmri} action {i}", msgid="test001.1")
+                session.run(manifest, engine, check)
+        session.finish()
+        store.save()
+        return engine.reported
+
+    def test_replay(self):
+        """Findings of manifests with known keys are replayed."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "findings.pickle")
+            foo = self.Manifest("pkg:/foo@1")
+            bar = self.Manifest("pkg:/bar@1")
+
+            store = FindingStore(path)
+            store.keys = {"pkg:/foo@1": "foo-key", "pkg:/bar@1": "bar-key"}
+            checked = []
+            first = self.lint(store, {foo: 2, bar: 1}, checked)
+            self.assertEqual(len(checked), 3)
+
+            # bar changed, foo did not
+            store = FindingStore(path)
+            store.keys = {"pkg:/foo@1": "foo-key", "pkg:/bar@1": "bar-key2"}
+            foo = self.Manifest("pkg:/foo@1")
+            bar = self.Manifest("pkg:/bar@1")
+            checked = []
+            second = self.lint(store, {foo: 2, bar: 1}, checked)
+            self.assertEqual(checked, [("pkg:/bar@1", 0)])
+            self.assertEqual(second, first)
+
+            # manifests without key are neither replayed nor recorded
+            store = FindingStore(path)
+            checked = []
+            self.lint(store, {foo: 1}, checked)
+            self.assertEqual(len(checked), 1)
+            self.assertFalse(store.added)
+
+    def test_shared(self):
+        """All checkers share one store until it is reset."""
+        self.assertIsNone(FindingStore.shared())
+        store = FindingStore.shared("/nonexistent/findings.pickle")
+        self.assertIs(FindingStore.shared(), store)
+        FindingStore.reset()
+        self.assertIsNone(FindingStore.shared())
+
+
+class TestSynthRepo(unittest.TestCase):
+
+    def setUp(self):
+        from synthrepo import use_standin
+        use_standin()
+
+    @contextlib.contextmanager
+    def environment(self, repo, **env):
+        """Runs the block with the environment pkglint runs in on given
+        synthetic repository, and given variables."""
+        environ = dict(os.environ)
+        os.environ.update(repo.environment(), **env)
+        try:
+            yield
+        finally:
+            os.environ.clear()
+            os.environ.update(environ)
+            ProtoIndex.reset()
+
+    def test_lint(self):
+        """Userland checks run on a synthetic repository, using the
+        stand-in pkg(7) modules where the real ones are missing."""
+        from synthrepo import SynthRepo, config
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            repo = SynthRepo(tmpdir, packages=5, paths=60, lint_packages=2)
+            with self.environment(repo):
+                from pkglint.userland import UserlandActionChecker
+                from pkglint.userland import UserlandManifestChecker
+                engine = repo.engine()
+                engine.run([UserlandActionChecker(config())],
+                           [UserlandManifestChecker(config())])
+
+        msgids = {msgid for _, msgid, _ in engine.reported}
+        # dangling links, 32-bit objects in 64-bit directories
+        self.assertIn("userland.action002.0", msgids)
+        self.assertIn("userland.action001.2", msgids)
+        unresolved = [m for _, msgid, m in engine.reported
+                      if msgid == "userland.action002.0"]
+        self.assertEqual(unresolved, [
+            "link usr/bin/synth0-49 has unresolvable target '../lib/synth/pkg0/missing49'",
+            "link usr/bin/synth1-49 has unresolvable target '../lib/synth/pkg1/missing49'",
+        ])
+
+
+    def test_incremental(self):
+        """Findings are replayed only as long as the configuration of
+        pkglint doesn't change."""
+        from synthrepo import SynthRepo, config
+        import pkg.manifest
+        from pkglint.userland import UserlandActionChecker, UserlandManifestChecker
+
+        published = pkg.manifest.Manifest()
+        published.set_content("set name=pkg.fmri value=pkg://userland/published@1.0")
+        pattern = re.compile(r"package \S+ has a publisher set!")
+
+        def lint(repo, cachedir, allowed_pubs):
+            with self.environment(repo, PKGLINT_CACHE_DIR=cachedir,
+                                  PKGLINT_INCREMENTAL="1"):
+                engine = repo.engine(params={
+                    "userland.manifest002.allowed_pubs": allowed_pubs})
+                engine.lint_manifests = engine.lint_manifests + [published]
+                engine.run([UserlandActionChecker(config())],
+                           [UserlandManifestChecker(config())])
+            return [m for _, _, m in engine.reported if pattern.match(m)]
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            repo = SynthRepo(tmpdir, packages=3, paths=20, lint_packages=1)
+            cachedir = os.path.join(tmpdir, "cache")
+            os.mkdir(cachedir)
+            try:
+                self.assertEqual(len(lint(repo, cachedir, "solaris")), 1)
+                self.assertEqual(lint(repo, cachedir, "solaris userland"), [])
+                self.assertEqual(len(lint(repo, cachedir, "solaris")), 1)
+            finally:
+                FindingStore.reset()
+
+    def test_needed_libraries(self):
+        """Libraries needed by ELF objects are looked up in RUNPATH and
+        default library directories, following links to directories."""
+        from synthrepo import SynthRepo, config
+        import pkg.manifest
+        from pkglint.userland import UserlandActionChecker
+
+        libraries = pkg.manifest.Manifest()
+        libraries.set_content("\n".join([
+            "set name=pkg.fmri value=pkg://solaris/system/library@11.4",
+            "dir path=lib/amd64 owner=root group=bin mode=0755",
+            "link path=lib/64 target=amd64",
+            "file NOHASH path=lib/amd64/libc.so.1 owner=root group=bin mode=0755",
+            "file NOHASH path=lib/libc.so.1 owner=root group=bin mode=0755",
+        ]))
+
+        def missing(repo, extra=(), reference=True):
+            with self.environment(repo):
+                engine = repo.engine()
+                engine.ref_api_inst.manifests.extend(extra)
+                if not reference:
+                    engine.ref_api_inst = None
+                engine.run([UserlandActionChecker(config())], [])
+            return [m for _, msgid, m in engine.reported if msgid == "userland.action010.0"]
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            repo = SynthRepo(tmpdir, packages=3, paths=60, lint_packages=2)
+            before = missing(repo)
+            after = missing(repo, [libraries])
+            # libraries of the system are unknown without reference packages
+            self.assertEqual(missing(repo, reference=False), [])
+
+        needed = re.compile(r"^\S+ needs (\S+), which")
+        self.assertEqual({needed.match(m).group(1) for m in before},
+                         {"libc.so.1", "libm.so.2"})
+        self.assertEqual({needed.match(m).group(1) for m in after}, {"libm.so.2"})
+        self.assertRegex(after[0], r"needs libm.so.2, .* \(/lib:/usr/lib\)$")
+
+    def test_runpath_verdicts(self):
+        """RUNPATH findings are found once for each RUNPATH, ELF class and
+        variants, and reported with the path of every binary."""
+        from synthrepo import SynthRepo, config
+        from pkglint.userland import UserlandActionChecker
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            repo = SynthRepo(tmpdir, packages=3, paths=60, lint_packages=1)
+            with self.environment(repo):
+                engine = repo.engine()
+                checker = UserlandActionChecker(config())
+                checker.startup(engine)
+
+        # private methods are name mangled
+        verdict = checker._UserlandActionChecker__runpath_verdict
+        computed = []
+
+        def counting(*args):
+            computed.append(args)
+            return verdict(*args)
+        checker._UserlandActionChecker__runpath_verdict = counting
+        runpath_check = checker._UserlandActionChecker__elf_runpath_check
+
+        record = ElfRecord(32, "exe", "/usr/lib/64:/opt/foo/lib", True, False)
+        for path in ("usr/bin/foo", "usr/bin/bar"):
+            runpath_check(path, record, (), engine, "001")
+        runpath_check("usr/bin/amd64/foo", record._replace(bits=64), (), engine, "001")
+        runpath_check("usr/bin/sparc", record, (("variant.arch", "sparc"),),
+                      engine, "001")
+
+        self.assertEqual(len(computed), 3)
+        self.assertEqual(engine.reported, [
+            ("WARNING", "userland.action001.3",
+             "64-bit runpath in 32-bit binary, 'usr/bin/foo' includes '/usr/lib/64'"),
+            ("ERROR", "userland.action001.3",
+             "bad RUNPATH, 'usr/bin/foo' includes '/opt/foo/lib'"),
+            ("WARNING", "userland.action001.3",
+             "64-bit runpath in 32-bit binary, 'usr/bin/bar' includes '/usr/lib/64'"),
+            ("ERROR", "userland.action001.3",
+             "bad RUNPATH, 'usr/bin/bar' includes '/opt/foo/lib'"),
+            ("WARNING", "userland.action001.3",
+             "32-bit runpath in 64-bit binary, 'usr/bin/amd64/foo' includes '/opt/foo/lib'"),
+            ("ERROR", "userland.action001.3",
+             "bad RUNPATH, 'usr/bin/amd64/foo' includes '/opt/foo/lib'"),
+            ("WARNING", "userland.action001.3",
+             "64-bit runpath in 32-bit binary, 'usr/bin/sparc' includes '/usr/lib/64'"),
+            ("ERROR", "userland.action001.3",
+             "bad RUNPATH, 'usr/bin/sparc' includes '/opt/foo/lib'"),
+        ])
+
+    def test_payload(self):
+        """Proto area files not matching the published payload are
+        reported when requested."""
+        from synthrepo import SynthRepo, config
+        import pkg.manifest
+        from pkglint.userland import UserlandActionChecker
+
+        def lint(repo, **env):
+            with self.environment(repo, **env):
+                engine = repo.engine()
+                engine.lint_manifests = engine.lint_manifests + [published]
+                engine.run([UserlandActionChecker(config())], [])
+            return [m for _, msgid, m in engine.reported
+                    if msgid.startswith("userland.action012")]
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            repo = SynthRepo(tmpdir, packages=3, paths=20, lint_packages=1)
+            lines = ["set name=pkg.fmri value=pkg://solaris/payload@1.0"]
+            for name, published_content, content in [
+                    ("fresh", b"fresh", b"fresh"), ("stale", b"new", b"old")]:
+                (repo.proto / "usr/share/payload").mkdir(parents=True, exist_ok=True)
+                (repo.proto / "usr/share/payload" / name).write_bytes(content)
+                sha256 = hashlib.sha256(published_content).hexdigest()
+                lines.append(
+                    f"file {hashlib.sha1(published_content).hexdigest()} "
+                    f"path=usr/share/payload/{name} owner=root group=bin mode=0444 "
+                    f"pkg.content-hash=file:sha256:{sha256}")
+            published = pkg.manifest.Manifest()
+            published.set_content("\n".join(lines))
+
+            self.assertEqual(lint(repo), [])
+            reported = lint(repo, PKGLINT_VERIFY_PAYLOAD="1")
+
+        self.assertEqual(len(reported), 1)
+        self.assertRegex(reported[0], r"/usr/share/payload/stale does not match payload "
+                                      r"of usr/share/payload/stale \(sha1 ")
+
+    def test_warm_paths(self):
+        """Reference paths are kept between runs until the reference
+        catalog changes, with the same findings as without them."""
+        from synthrepo import SynthRepo, config
+        import pkg.manifest
+        from pkglint.userland import UserlandActionChecker
+
+        libraries = pkg.manifest.Manifest()
+        libraries.set_content("\n".join([
+            "set name=pkg.fmri value=pkg://solaris/system/library@11.4",
+            "file NOHASH path=lib/amd64/libc.so.1 owner=root group=bin mode=0755",
+            "file NOHASH path=lib/libc.so.1 owner=root group=bin mode=0755",
+        ]))
+
+        def lint(repo, extra=()):
+            walked = []
+            with self.environment(repo):
+                engine = repo.engine()
+                engine.ref_api_inst.manifests = list(engine.ref_api_inst.manifests) + list(extra)
+                gen_manifests = engine.gen_manifests
+
+                def counting(api_inst, **kwargs):
+                    walked.append(api_inst)
+                    return gen_manifests(api_inst, **kwargs)
+                engine.gen_manifests = counting
+                engine.run([UserlandActionChecker(config())], [])
+            return engine.ref_api_inst in walked, engine.reported
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            repo = SynthRepo(tmpdir, packages=5, paths=60, lint_packages=2)
+            _, cold = lint(repo)
+            WarmPaths.enabled = True
+            try:
+                self.assertEqual(lint(repo), (True, cold))
+                # runs neither change the kept paths nor index them again
+                warm = WarmPaths._shared
+                kept = len(warm.table.fmris), dict(warm._indexes)
+                self.assertEqual(len(kept[1]), 2)
+                self.assertEqual(lint(repo), (False, cold))
+                self.assertEqual((len(warm.table.fmris), warm._indexes), kept)
+                walked, changed = lint(repo, [libraries])
+                self.assertTrue(walked)
+                self.assertEqual(lint(repo, [libraries]), (False, changed))
+            finally:
+                WarmPaths.enabled = False
+                WarmPaths.reset()
+
+        self.assertLess(len(changed), len(cold))
+
+    def test_catalog_delta(self):
+        """When the reference catalog changes, only manifests of packages
+        missing from the reference path cache are retrieved."""
+        from synthrepo import SynthRepo, config
+        import pkg.manifest
+        from pkglint.userland import UserlandActionChecker
+
+        libraries = pkg.manifest.Manifest()
+        libraries.set_content("\n".join([
+            "set name=pkg.fmri value=pkg://solaris/system/library@11.4",
+            "file NOHASH path=lib/amd64/libc.so.1 owner=root group=bin mode=0755",
+            "file NOHASH path=lib/libc.so.1 owner=root group=bin mode=0755",
+        ]))
+
+        def lint(repo, cachedir, extra=()):
+            env = {} if cachedir is None else {"PKGLINT_CACHE_DIR": cachedir}
+            walked = []
+            retrieved = []
+            with self.environment(repo, **env):
+                engine = repo.engine()
+                image = engine.ref_api_inst
+                image.manifests = list(image.manifests) + list(extra)
+                gen_manifests = engine.gen_manifests
+                get_manifest = image.get_manifest
+
+                def walking(api_inst, **kwargs):
+                    walked.append(api_inst)
+                    return gen_manifests(api_inst, **kwargs)
+
+                def retrieving(pfmri, **kwargs):
+                    retrieved.append(str(pfmri))
+                    return get_manifest(pfmri, **kwargs)
+                engine.gen_manifests = walking
+                image.get_manifest = retrieving
+                engine.run([UserlandActionChecker(config())], [])
+            return image in walked, retrieved, engine.reported
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            repo = SynthRepo(tmpdir, packages=5, paths=60, lint_packages=2)
+            cachedir = os.path.join(tmpdir, "cache")
+            os.mkdir(cachedir)
+            _, _, cold = lint(repo, None, [libraries])
+            walked, retrieved, _ = lint(repo, cachedir)
+            self.assertEqual((walked, retrieved), (True, []))
+            walked, retrieved, changed = lint(repo, cachedir, [libraries])
+
+        self.assertFalse(walked)
+        self.assertEqual(retrieved, [str(libraries.fmri)])
+        self.assertEqual(changed, cold)
+
+    def test_shards(self):
+        """Shards linting parts of the manifests with the shared reference
+        paths report the same as one run linting all of them."""
+        from synthrepo import SynthRepo, config
+        import pkg.manifest
+        from pkglint.userland import UserlandActionChecker, read_manifests
+
+        # link resolving only in a variant the package is not published
+        # for; variants of the package are merged into its actions when
+        # seeding lint paths
+        variants = pkg.manifest.Manifest()
+        variants.set_content("\n".join([
+            "set name=pkg.fmri value=pkg://solaris/variants@1.0",
+            "set name=variant.arch value=sparc",
+            "file NOHASH path=usr/lib/only-i386 owner=root group=bin mode=0444 "
+            "variant.arch=i386",
+            "link path=usr/lib/lnk target=only-i386",
+        ]))
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            repo = SynthRepo(tmpdir, packages=5, paths=60, lint_packages=2)
+            listing = os.path.join(tmpdir, "manifests")
+            with open(listing, "w") as ofile:
+                for i, manifest in enumerate([variants] + repo.lint_manifests):
+                    path = os.path.join(tmpdir, f"lint{i}.p5m")
+                    with open(path, "w") as mfile:
+                        mfile.writelines(manifest.as_lines())
+                    ofile.write(path + "\n")
+            index = os.path.join(tmpdir, "index")
+
+            def lint(shard, **env):
+                with self.environment(repo, **env):
+                    engine = repo.engine()
+                    engine.lint_manifests = read_manifests(listing)[shard]
+                    engine.run([UserlandActionChecker(config())], [])
+                return engine.reported
+
+            single = lint(slice(None))
+            # the index is published before proto area files are inspected
+            published = []
+            prefetch = ElfCache.prefetch
+
+            def inspecting(cache, *args):
+                published.append(os.path.exists(index))
+                return prefetch(cache, *args)
+            ElfCache.prefetch = inspecting
+            try:
+                first = lint(slice(0, 1), PKGLINT_SHARED_INDEX=index,
+                             PKGLINT_SHARD_MANIFESTS=listing)
+            finally:
+                ElfCache.prefetch = prefetch
+            self.assertEqual(published, [True])
+            second = lint(slice(1, None), PKGLINT_SHARED_INDEX=index)
+
+        self.assertIn(("ERROR", "userland.action002.0",
+                       "link usr/lib/lnk has unresolvable target 'only-i386'"), first)
+        self.assertTrue(second)
+        self.assertEqual(first + second, single)
+
+
+class TestInstrument(unittest.TestCase):
+
+    class Checker:
+        name = "test.checker"
+
+        def startup(self, engine):
+            with instrument.phase("test.startup.seed"):
+                pass
+
+        def check(self, action, manifest, engine, pkglint_id="001"):
+            """Check docstring."""
+            return action
+
+        check.pkglint_desc = "description"
+
+        def helper(self, action):
+            return action
+
+    def setUp(self):
+        self.environ = dict(os.environ)
+        os.environ.pop("PKGLINT_PROFILE", None)
+        instrument.start()
+
+    def tearDown(self):
+        os.environ.clear()
+        os.environ.update(self.environ)
+        instrument.persistent = False
+        instrument.start()
+
+    def test_disabled(self):
+        """Nothing is instrumented unless PKGLINT_PROFILE is set."""
+        cls = type("Checker", (self.Checker,), {})
+        instrument.instrument(cls)
+        self.assertNotIn("check", vars(cls))
+        with instrument.phase("test.phase"):
+            pass
+        self.assertIsNone(instrument._profile)
+
+    def test_summary(self):
+        """Checks and phases are timed and reported as JSON."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output = os.environ["PKGLINT_PROFILE"] = os.path.join(tmpdir, "profile.json")
+            instrument.start()
+            cls = type("Checker", (self.Checker,), dict(vars(self.Checker)))
+            instrument.instrument(cls)
+
+            # pkglint must still find the check and its pkglint_id
+            checker = cls()
+            spec = inspect.getfullargspec(checker.check)
+            self.assertEqual(spec.args[-1], "pkglint_id")
+            self.assertEqual(spec.defaults, ("001",))
+            self.assertEqual(checker.check.pkglint_desc, "description")
+            self.assertEqual(checker.check.__doc__, "Check docstring.")
+            self.assertIs(vars(cls)["helper"], vars(self.Checker)["helper"])
+
+            checker.startup(None)
+            self.assertEqual(checker.check(1, None, None), 1)
+            checker.check(2, None, None)
+            instrument.finish()
+
+            with open(output) as ifile:
+                summary = json.load(ifile)
+            check = summary["checks"]["test.checker.check"]
+            self.assertEqual(check["calls"], 2)
+            self.assertEqual(check["pkglint_id"], "test.checker001")
+            self.assertGreaterEqual(check["total"], check["max"])
+            self.assertEqual(summary["checks"]["test.checker.startup"]["calls"], 1)
+            self.assertEqual(summary["phases"]["test.startup.seed"]["calls"], 1)
+
+
+    def test_persistent(self):
+        """In a persistent process, each run is profiled according to its
+        own PKGLINT_PROFILE."""
+        instrument.persistent = True
+        cls = type("Checker", (self.Checker,), dict(vars(self.Checker)))
+        instrument.instrument(cls)
+        checker = cls()
+
+        checker.check(1, None, None)
+        instrument.finish()
+        self.assertIsNone(instrument._profile)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output = os.environ["PKGLINT_PROFILE"] = os.path.join(tmpdir, "profile.json")
+            instrument.start()
+            checker.check(2, None, None)
+            instrument.finish()
+            with open(output) as ifile:
+                summary = json.load(ifile)
+
+        self.assertEqual(summary["checks"]["test.checker.check"]["calls"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
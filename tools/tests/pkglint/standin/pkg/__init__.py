@@ -0,0 +1,38 @@
+#
+# CDDL HEADER START
+#
+# The contents of this file are subject to the terms of the
+# Common Development and Distribution License (the "License").
+# You may not use this file except in compliance with the License.
+#
+# You can obtain a copy of the license at usr/src/OPENSOLARIS.LICENSE
+# or http://www.opensolaris.org/os/licensing.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+#
+# When distributing Covered Code, include this CDDL HEADER in each
+# file and include the License file at usr/src/OPENSOLARIS.LICENSE.
+# If applicable, add the following below this CDDL HEADER, with the
+# fields enclosed by brackets "[]" replaced with your own identifying
+# information: Portions Copyright [yyyy] [name of copyright owner]
+#
+# CDDL HEADER END
+#
+
+#
+# Copyright (c) 2026, Oracle and/or its affiliates.
+#
+
+# Stand-in for the parts of the pkg(7) Python modules used by the Userland
+# pkglint extension, so that the extension can be benchmarked on systems
+# without pkg(7) (see ../benchmark.py). Only what the extension needs is
+# implemented, and only as far as synthetic manifests need it; this is not
+# a replacement for the real modules and is never used when they exist.
+
+import builtins
+
+# pkglint installs gettext as _()
+if not hasattr(builtins, "_"):
+    builtins._ = lambda message: message
+
+# vim: expandtab sw=4 ts=4
@@ -0,0 +1,57 @@
+#
+# CDDL HEADER START
+#
+# The contents of this file are subject to the terms of the
+# Common Development and Distribution License (the "License").
+# You may not use this file except in compliance with the License.
+#
+# You can obtain a copy of the license at usr/src/OPENSOLARIS.LICENSE
+# or http://www.opensolaris.org/os/licensing.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+#
+# When distributing Covered Code, include this CDDL HEADER in each
+# file and include the License file at usr/src/OPENSOLARIS.LICENSE.
+# If applicable, add the following below this CDDL HEADER, with the
+# fields enclosed by brackets "[]" replaced with your own identifying
+# information: Portions Copyright [yyyy] [name of copyright owner]
+#
+# CDDL HEADER END
+#
+
+#
+# Copyright (c) 2026, Oracle and/or its affiliates.
+#
+
+# Stand-in for pkg.actions (see pkg/__init__.py).
+
+import shlex
+
+from pkg.actions.generic import Action
+
+# actions with a payload, where the first value without '=' is its hash
+payload_types = ("file", "license")
+
+
+def fromstr(line):
+    """Returns Action described by a manifest line."""
+    tokens = shlex.split(line)
+    name = tokens[0]
+    hash = None
+    attrs = {}
+    for i, token in enumerate(tokens[1:]):
+        if "=" not in token:
+            if i == 0 and name in payload_types:
+                hash = token
+                continue
+            raise ValueError(f"malformed action: {line}")
+        key, value = token.split("=", 1)
+        if key in attrs:
+            if not isinstance(attrs[key], list):
+                attrs[key] = [attrs[key]]
+            attrs[key].append(value)
+        else:
+            attrs[key] = value
+    return Action(name, hash, attrs)
+
+# vim: expandtab sw=4 ts=4
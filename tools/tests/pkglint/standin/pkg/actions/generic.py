@@ -0,0 +1,61 @@
+#
+# CDDL HEADER START
+#
+# The contents of this file are subject to the terms of the
+# Common Development and Distribution License (the "License").
+# You may not use this file except in compliance with the License.
+#
+# You can obtain a copy of the license at usr/src/OPENSOLARIS.LICENSE
+# or http://www.opensolaris.org/os/licensing.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+#
+# When distributing Covered Code, include this CDDL HEADER in each
+# file and include the License file at usr/src/OPENSOLARIS.LICENSE.
+# If applicable, add the following below this CDDL HEADER, with the
+# fields enclosed by brackets "[]" replaced with your own identifying
+# information: Portions Copyright [yyyy] [name of copyright owner]
+#
+# CDDL HEADER END
+#
+
+#
+# Copyright (c) 2026, Oracle and/or its affiliates.
+#
+
+# Stand-in for pkg.actions.generic (see pkg/__init__.py).
+
+from pkg.variant import VariantCombinationTemplate
+
+
+class Action:
+    """Manifest action with a name, optional payload hash and attributes."""
+
+    def __init__(self, name, hash=None, attrs=None):
+        self.name = name
+        self.hash = hash
+        self.attrs = attrs if attrs is not None else {}
+
+    def get_variant_template(self):
+        return VariantCombinationTemplate(
+            (k, v) for k, v in self.attrs.items() if k.startswith("variant."))
+
+    def __str__(self):
+        out = [self.name]
+        if self.hash is not None:
+            out.append(self.hash)
+        for key in sorted(self.attrs):
+            values = self.attrs[key]
+            if not isinstance(values, list):
+                values = [values]
+            for value in values:
+                value = str(value)
+                if not value or " " in value or '"' in value:
+                    value = '"' + value.replace('"', '\\"') + '"'
+                out.append(f"{key}={value}")
+        return " ".join(out)
+
+    def __repr__(self):
+        return f"<Action {self}>"
+
+# vim: expandtab sw=4 ts=4
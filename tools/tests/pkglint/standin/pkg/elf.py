@@ -0,0 +1,55 @@
+#
+# CDDL HEADER START
+#
+# The contents of this file are subject to the terms of the
+# Common Development and Distribution License (the "License").
+# You may not use this file except in compliance with the License.
+#
+# You can obtain a copy of the license at usr/src/OPENSOLARIS.LICENSE
+# or http://www.opensolaris.org/os/licensing.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+#
+# When distributing Covered Code, include this CDDL HEADER in each
+# file and include the License file at usr/src/OPENSOLARIS.LICENSE.
+# If applicable, add the following below this CDDL HEADER, with the
+# fields enclosed by brackets "[]" replaced with your own identifying
+# information: Portions Copyright [yyyy] [name of copyright owner]
+#
+# CDDL HEADER END
+#
+
+#
+# Copyright (c) 2026, Oracle and/or its affiliates.
+#
+
+# Stand-in for pkg.elf (see pkg/__init__.py), built on the ELF reader of the
+# Userland pkglint extension.
+
+from pkglint.elfinfo import ElfError, read_elf
+
+
+def is_elf_object(path):
+    with open(path, "rb") as ifile:
+        return ifile.read(4) == b"\x7fELF"
+
+
+def get_info(path):
+    record = read_elf(path)
+    if record is None:
+        raise ElfError(f"{path} is not an ELF object")
+    return {"bits": record.bits, "type": record.type}
+
+
+def get_dynamic(path):
+    record = read_elf(path)
+    dynamic = {}
+    if record is None:
+        return dynamic
+    if record.runpath:
+        dynamic["runpath"] = record.runpath
+    if record.needed:
+        dynamic["deps"] = [[name, []] for name in record.needed]
+    return dynamic
+
+# vim: expandtab sw=4 ts=4
@@ -0,0 +1,79 @@
+#
+# CDDL HEADER START
+#
+# The contents of this file are subject to the terms of the
+# Common Development and Distribution License (the "License").
+# You may not use this file except in compliance with the License.
+#
+# You can obtain a copy of the license at usr/src/OPENSOLARIS.LICENSE
+# or http://www.opensolaris.org/os/licensing.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+#
+# When distributing Covered Code, include this CDDL HEADER in each
+# file and include the License file at usr/src/OPENSOLARIS.LICENSE.
+# If applicable, add the following below this CDDL HEADER, with the
+# fields enclosed by brackets "[]" replaced with your own identifying
+# information: Portions Copyright [yyyy] [name of copyright owner]
+#
+# CDDL HEADER END
+#
+
+#
+# Copyright (c) 2026, Oracle and/or its affiliates.
+#
+
+# Stand-in for pkg.fmri (see pkg/__init__.py).
+
+import re
+
+
+class PkgFmri:
+    """Package FMRI: pkg://publisher/name@release,build-branch:timestamp."""
+
+    _re = re.compile(r"^(?:pkg:/(?:/(?P<pub>[^/]+)/)?)?(?P<name>[^@]+)(?:@(?P<ver>.+))?$")
+
+    def __init__(self, fmri):
+        match = self._re.match(fmri)
+        if match is None:
+            raise ValueError(f"invalid FMRI {fmri}")
+        self.publisher = match.group("pub")
+        self.pkg_name = match.group("name").lstrip("/")
+        self.version = match.group("ver")
+
+    def get_name(self):
+        return self.pkg_name
+
+    def get_pkg_stem(self):
+        if self.publisher:
+            return f"pkg://{self.publisher}/{self.pkg_name}"
+        return f"pkg:/{self.pkg_name}"
+
+    def has_version(self):
+        return self.version is not None
+
+    def version_key(self):
+        """Returns comparable (release, branch) of the version, without
+        the timestamp."""
+        version = self.version.split(":")[0]
+        release, _, rest = version.partition(",")
+        branch = rest.partition("-")[2]
+
+        def numbers(text):
+            return tuple(int(n) for n in text.split(".") if n.isdigit())
+        return numbers(release), numbers(branch)
+
+    def __str__(self):
+        version = f"@{self.version}" if self.version else ""
+        return f"{self.get_pkg_stem()}{version}"
+
+    def __repr__(self):
+        return f"<PkgFmri {self}>"
+
+    def __eq__(self, other):
+        return isinstance(other, PkgFmri) and str(self) == str(other)
+
+    def __hash__(self):
+        return hash(str(self))
+
+# vim: expandtab sw=4 ts=4
@@ -0,0 +1,76 @@
+#
+# CDDL HEADER START
+#
+# The contents of this file are subject to the terms of the
+# Common Development and Distribution License (the "License").
+# You may not use this file except in compliance with the License.
+#
+# You can obtain a copy of the license at usr/src/OPENSOLARIS.LICENSE
+# or http://www.opensolaris.org/os/licensing.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+#
+# When distributing Covered Code, include this CDDL HEADER in each
+# file and include the License file at usr/src/OPENSOLARIS.LICENSE.
+# If applicable, add the following below this CDDL HEADER, with the
+# fields enclosed by brackets "[]" replaced with your own identifying
+# information: Portions Copyright [yyyy] [name of copyright owner]
+#
+# CDDL HEADER END
+#
+
+#
+# Copyright (c) 2026, Oracle and/or its affiliates.
+#
+
+# Stand-in for pkg.lint.base (see pkg/__init__.py).
+
+import inspect
+
+
+class Checker:
+    """Base of pkglint checkers; all methods with the pkglint_id argument
+    are checks."""
+
+    name = "unknown_checker"
+
+    def __init__(self, config):
+        self.config = config
+        excluded = []
+        if config is not None:
+            excluded = config.get("pkglint", "pkglint.exclude", fallback="").split()
+
+        self.included_checks = []
+        self.excluded_checks = []
+        for _, method in inspect.getmembers(self, inspect.ismethod):
+            spec = inspect.getfullargspec(method)
+            if "pkglint_id" not in spec.args:
+                continue
+            index = spec.args.index("pkglint_id") - len(spec.args)
+            pkglint_id = f"{self.name}{spec.defaults[index]}"
+            if any(pkglint_id.startswith(e) for e in excluded):
+                self.excluded_checks.append((method, pkglint_id))
+            else:
+                self.included_checks.append((method, pkglint_id))
+
+    def startup(self, engine):
+        pass
+
+    def shutdown(self, engine):
+        pass
+
+
+class ActionChecker(Checker):
+
+    def check(self, action, manifest, engine):
+        for func, _ in self.included_checks:
+            func(action, manifest, engine)
+
+
+class ManifestChecker(Checker):
+
+    def check(self, manifest, engine):
+        for func, _ in self.included_checks:
+            func(manifest, engine)
+
+# vim: expandtab sw=4 ts=4
@@ -0,0 +1,43 @@
+#
+# CDDL HEADER START
+#
+# The contents of this file are subject to the terms of the
+# Common Development and Distribution License (the "License").
+# You may not use this file except in compliance with the License.
+#
+# You can obtain a copy of the license at usr/src/OPENSOLARIS.LICENSE
+# or http://www.opensolaris.org/os/licensing.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+#
+# When distributing Covered Code, include this CDDL HEADER in each
+# file and include the License file at usr/src/OPENSOLARIS.LICENSE.
+# If applicable, add the following below this CDDL HEADER, with the
+# fields enclosed by brackets "[]" replaced with your own identifying
+# information: Portions Copyright [yyyy] [name of copyright owner]
+#
+# CDDL HEADER END
+#
+
+#
+# Copyright (c) 2026, Oracle and/or its affiliates.
+#
+
+# Stand-in for pkg.lint.engine (see pkg/__init__.py); the engine itself is
+# provided by synthrepo.SynthEngine.
+
+
+def lint_fmri_successor(new, old, ignore_pubs=True, ignore_timestamps=True):
+    """Returns True if new is the same package as old, at the same or a
+    newer version."""
+    if not ignore_pubs and new.publisher != old.publisher:
+        return False
+    if new.get_name() != old.get_name():
+        return False
+    if not new.has_version():
+        return True
+    if not old.has_version():
+        return False
+    return new.version_key() >= old.version_key()
+
+# vim: expandtab sw=4 ts=4
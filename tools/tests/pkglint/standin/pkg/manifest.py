@@ -0,0 +1,91 @@
+#
+# CDDL HEADER START
+#
+# The contents of this file are subject to the terms of the
+# Common Development and Distribution License (the "License").
+# You may not use this file except in compliance with the License.
+#
+# You can obtain a copy of the license at usr/src/OPENSOLARIS.LICENSE
+# or http://www.opensolaris.org/os/licensing.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+#
+# When distributing Covered Code, include this CDDL HEADER in each
+# file and include the License file at usr/src/OPENSOLARIS.LICENSE.
+# If applicable, add the following below this CDDL HEADER, with the
+# fields enclosed by brackets "[]" replaced with your own identifying
+# information: Portions Copyright [yyyy] [name of copyright owner]
+#
+# CDDL HEADER END
+#
+
+#
+# Copyright (c) 2026, Oracle and/or its affiliates.
+#
+
+# Stand-in for pkg.manifest (see pkg/__init__.py).
+
+import pkg.actions
+import pkg.fmri
+
+from pkg.variant import VariantCombinationTemplate
+
+
+class Manifest:
+    """Package manifest: list of actions, with values of set actions
+    accessible as attributes."""
+
+    def __init__(self, pfmri=None):
+        self.fmri = pfmri
+        self.actions = []
+        self.attributes = {}
+
+    def set_content(self, content=None, pathname=None):
+        """Parses manifest text, or the file at pathname."""
+        if pathname is not None:
+            with open(pathname) as ifile:
+                content = ifile.read()
+        self.actions = []
+        self.attributes = {}
+        for line in content.splitlines():
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            self.add_action(pkg.actions.fromstr(line))
+
+    def add_action(self, action):
+        self.actions.append(action)
+        if action.name == "set":
+            self.attributes[action.attrs["name"]] = action.attrs["value"]
+            if action.attrs["name"] == "pkg.fmri" and self.fmri is None:
+                self.fmri = pkg.fmri.PkgFmri(action.attrs["value"])
+
+    def gen_actions(self, excludes=()):
+        yield from self.actions
+
+    def gen_actions_by_type(self, atype):
+        return (a for a in self.actions if a.name == atype)
+
+    def gen_variants(self):
+        for name, value in self.attributes.items():
+            if name.startswith("variant."):
+                yield name, value if isinstance(value, list) else [value]
+
+    def get_all_variants(self):
+        return VariantCombinationTemplate(
+            (name, set(values)) for name, values in self.gen_variants())
+
+    def as_lines(self):
+        for action in self.actions:
+            yield f"{action}\n"
+
+    def __contains__(self, key):
+        return key in self.attributes
+
+    def __getitem__(self, key):
+        return self.attributes[key]
+
+    def get(self, key, default=None):
+        return self.attributes.get(key, default)
+
+# vim: expandtab sw=4 ts=4
@@ -0,0 +1,238 @@
+#!/usr/bin/python3.9
+#
+# CDDL HEADER START
+#
+# The contents of this file are subject to the terms of the
+# Common Development and Distribution License (the "License").
+# You may not use this file except in compliance with the License.
+#
+# You can obtain a copy of the license at usr/src/OPENSOLARIS.LICENSE
+# or http://www.opensolaris.org/os/licensing.
+# See the License for the specific language governing permissions
+# and limitations under the License.
+#
+# When distributing Covered Code, include this CDDL HEADER in each
+# file and include the License file at usr/src/OPENSOLARIS.LICENSE.
+# If applicable, add the following below this CDDL HEADER, with the
+# fields enclosed by brackets "[]" replaced with your own identifying
+# information: Portions Copyright [yyyy] [name of copyright owner]
+#
+# CDDL HEADER END
+#
+
+#
+# Copyright (c) 2026, Oracle and/or its affiliates.
+#
+
+# Synthetic package repositories for benchmarking the Userland pkglint
+# extension (see benchmark.py), with an engine providing everything the
+# extension needs from pkglint.
+#
+# When pkg(7) modules are not available (e.g. on Linux), use_standin() makes
+# the stand-in modules from the standin directory importable instead.
+
+import configparser
+import importlib.util
+import logging
+import pathlib
+import shutil
+import sys
+
+HERE = pathlib.Path(__file__).parent
+
+
+def use_standin():
+    """Makes pkglint extension importable, using the stand-in pkg modules
+    unless the real ones are available. Returns True if the stand-in is
+    used."""
+    python = str(HERE.parent.parent / "python")
+    if python not in sys.path:
+        sys.path.insert(0, python)
+    if importlib.util.find_spec("pkg") is not None:
+        return False
+    sys.path.insert(0, str(HERE / "standin"))
+    return True
+
+
+class SynthCatalog:
+    def __init__(self, count):
+        self.last_modified = "20260101T000000Z"
+        self.package_version_count = count
+
+
+class SynthPublisher:
+    def __init__(self, prefix, count):
+        self.prefix = prefix
+        self.catalog = SynthCatalog(count)
+
+
+class SynthImage:
+    """Stands for a pkg.client.api.ImageInterface of a repository."""
+
+    def __init__(self, manifests, publisher="solaris"):
+        self.manifests = manifests
+        self.publisher = publisher
+
+    def get_publishers(self):
+        return [SynthPublisher(self.publisher, len(self.manifests))]
+
+    def get_pkg_list(self, pkg_list, variants=False, return_fmris=False, **kwargs):
+        for manifest in self.manifests:
+            yield manifest.fmri, None, [], [], {}
+
+    def get_manifest(self, pfmri, all_variants=False):
+        for manifest in self.manifests:
+            if manifest.fmri == pfmri:
+                return manifest
+        raise KeyError(str(pfmri))
+
+
+class SynthEngine:
+    """Stands for pkg.lint.engine.LintEngine, collecting all findings."""
+
+    def __init__(self, ref_manifests, lint_manifests, basedir=None, params=None):
+        self.ref_api_inst = SynthImage(ref_manifests)
+        self.lint_api_inst = None
+        self.lint_manifests = lint_manifests
+        self.release = None
+        self.pattern = None
+        self.ignore_pubs = True
+        self.basedir = basedir
+        self.logger = logging.getLogger("synthrepo")
+        # pkglintrc
+        self.conf = config()
+        self.conf.set("pkglint", "userland.manifest002.allowed_pubs", "solaris userland")
+        for key, value in (params or {}).items():
+            self.conf.set("pkglint", key, value)
+        self.reported = []
+
+    def gen_manifests(self, api_inst, release=None, pattern=None):
+        if api_inst is not None:
+            yield from api_inst.manifests
+
+    def get_param(self, key):
+        return self.conf.get("pkglint", key, fallback=None)
+
+    def critical(self, message, msgid=None):
+        self.reported.append(("CRITICAL", msgid, message))
+
+    def error(self, message, msgid=None):
+        self.reported.append(("ERROR", msgid, message))
+
+    def warning(self, message, msgid=None):
+        self.reported.append(("WARNING", msgid, message))
+
+    def info(self, message, msgid=None):
+        self.reported.append(("INFO", msgid, message))
+
+    def run(self, action_checkers, manifest_checkers):
+        """Runs given checkers over all lint manifests, as pkglint does."""
+        checkers = manifest_checkers + action_checkers
+        for checker in checkers:
+            checker.startup(self)
+        for manifest in self.lint_manifests:
+            for checker in manifest_checkers:
+                checker.check(manifest, self)
+            for action in manifest.gen_actions():
+                for checker in action_checkers:
+                    checker.check(action, manifest, self)
+        for checker in checkers:
+            checker.shutdown(self)
+
+
+def config():
+    """Returns pkglint configuration for checkers."""
+    conf = configparser.ConfigParser()
+    conf.add_section("pkglint")
+    conf.set("pkglint", "pkglint.exclude", "")
+    return conf
+
+
+class SynthRepo:
+    """Reference repository of given number of packages, each delivering
+    given number of paths, and the newer versions of some of them to be
+    linted, with their files in a proto area.
+
+    Every tenth path is a link (every fiftieth one dangling) and every
+    twentieth file of linted packages is an ELF object copied from the
+    fixtures in the elf directory.
+    """
+
+    elf_fixtures = ["pie64-aslr-enabled", "exe32-aslr-disabled", "so32-msb"]
+
+    def __init__(self, root, packages=200, paths=50, lint_packages=10):
+        # see use_standin()
+        import pkg.manifest
+
+        self.root = pathlib.Path(root)
+        self.proto = self.root / "proto"
+        self.ref_manifests = []
+        self.lint_manifests = []
+
+        base = ["set name=pkg.fmri value=pkg://solaris/synth/base@1.0,11.4-11.4.0.0.1.0.0",
+                "dir path=usr owner=root group=sys mode=0755",
+                "dir path=usr/lib owner=root group=bin mode=0755",
+                "dir path=usr/lib/64 owner=root group=bin mode=0755",
+                "dir path=usr/bin owner=root group=bin mode=0755"]
+        self.ref_manifests.append(self.__manifest(pkg.manifest, base))
+
+        for i in range(packages):
+            lines = self.__package(i, paths)
+            self.ref_manifests.append(self.__manifest(pkg.manifest, [
+                f"set name=pkg.fmri value=pkg://solaris/synth/pkg{i}"
+                "@1.0,11.4-11.4.0.0.1.0.0"] + lines))
+            if i < lint_packages:
+                self.lint_manifests.append(self.__manifest(pkg.manifest, [
+                    f"set name=pkg.fmri value=pkg:/synth/pkg{i}"
+                    "@1.1,11.4-11.4.0.0.1.0.0",
+                    "set name=org.opensolaris.arc-caseid value=PSARC/2026/001",
+                    "license synth.license license=MIT"] + lines))
+                self.__populate(lines)
+
+    @staticmethod
+    def __manifest(module, lines):
+        manifest = module.Manifest()
+        manifest.set_content("\n".join(lines) + "\n")
+        return manifest
+
+    def __package(self, i, paths):
+        directory = f"usr/lib/synth/pkg{i}"
+        lines = [f"dir path={directory} owner=root group=bin mode=0755"]
+        for j in range(paths):
+            if j % 10 == 9:
+                target = f"../lib/synth/pkg{i}/file{j - 1}"
+                if j % 50 == 49:
+                    target = f"../lib/synth/pkg{i}/missing{j}"
+                lines.append(f"link path=usr/bin/synth{i}-{j} target={target}")
+            elif j % 20 == 0:
+                lines.append(f"file NOHASH path={directory}/64/lib{j}.so.1 "
+                             "owner=root group=bin mode=0555")
+            else:
+                lines.append(f"file NOHASH path={directory}/file{j} "
+                             "owner=root group=bin mode=0444")
+        return lines
+
+    def __populate(self, lines):
+        """Creates files delivered by given manifest lines in the proto area."""
+        for n, line in enumerate(lines):
+            if not line.startswith("file "):
+                continue
+            path = line.split("path=")[1].split()[0]
+            fullpath = self.proto / path
+            fullpath.parent.mkdir(parents=True, exist_ok=True)
+            if path.endswith(".so.1"):
+                fixture = self.elf_fixtures[n % len(self.elf_fixtures)]
+                shutil.copyfile(HERE / "elf" / fixture, fullpath)
+            else:
+                fullpath.write_text(path)
+
+    def engine(self, basedir=None, params=None):
+        """Returns new engine linting the lint manifests against the
+        reference repository, with given pkglintrc parameters."""
+        return SynthEngine(self.ref_manifests, self.lint_manifests, basedir, params)
+
+    def environment(self):
+        """Returns environment variables the extension needs."""
+        return {"PROTO_PATH": str(self.proto), "SOLARIS_VERSION": "2.11"}
+
+# vim: expandtab sw=4 ts=4